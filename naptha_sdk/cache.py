@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from naptha_sdk.schemas import ChatCompletionRequest, ModelResponse
+from naptha_sdk.utils import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_MEMORY_MAX_ENTRIES = 1024
+CACHE_DISK_TTL = 7 * 24 * 60 * 60
+CACHE_DISK_MAX_BYTES = 256 * 1024 * 1024
+CACHE_DISK_PATH = Path.home() / ".naptha" / "inference_cache.sqlite"
+# Fields that change how a response is delivered but not what it says
+CACHE_KEY_EXCLUDE = {"stream", "stream_options"}
+
+
+class CacheStats:
+    """Hit and miss counters for a cache"""
+
+    def __init__(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, Union[int, float]]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+
+class LRUCache:
+    """Bounded in-memory cache that evicts the least recently used entry.
+
+    Bounded by entry count and, if max_bytes is set, by the total of the sizes passed to set.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MEMORY_MAX_ENTRIES, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def set(self, key: str, value: Any, size: int = 0) -> int:
+        """Store a value of the given size in bytes and return how many entries were evicted to make room."""
+        self.total_bytes += size - self._sizes.get(key, 0)
+        self._entries[key] = value
+        self._sizes[key] = size
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self.max_entries or (self.max_bytes is not None and self.total_bytes > self.max_bytes):
+            evicted_key, _ = self._entries.popitem(last=False)
+            self.total_bytes -= self._sizes.pop(evicted_key)
+            evicted += 1
+        return evicted
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+        self.total_bytes -= self._sizes.pop(key, 0)
+
+    def delete_prefix(self, prefix: str):
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            self.delete(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._sizes.clear()
+        self.total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk cache of text values with a time to live and a total size limit.
+
+    Expired entries are dropped when read. When the stored values grow past
+    max_bytes the least recently accessed entries are deleted.
+    """
+
+    def __init__(self, path: Union[str, Path] = CACHE_DISK_PATH, ttl: float = CACHE_DISK_TTL, max_bytes: int = CACHE_DISK_MAX_BYTES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if now - created > self.ttl:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: str) -> int:
+        """Store a value and return how many entries were evicted to stay under max_bytes."""
+        now = time.time()
+        size = len(value.encode())
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            return self._evict()
+
+    def _evict(self) -> int:
+        self._conn.execute("DELETE FROM entries WHERE created < ?", (time.time() - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        return len(victims)
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def request_cache_key(request: ChatCompletionRequest) -> str:
+    """Canonical hash of a chat completion request, ignoring fields that only affect delivery"""
+    payload = request.model_dump(exclude=CACHE_KEY_EXCLUDE, exclude_none=True)
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class InferenceCache:
+    """Two-tier cache of chat completions for deterministic requests.
+
+    Only requests that should always produce the same answer are cached: those with
+    temperature=0 or a fixed seed. Lookups check the in-memory LRU first and then
+    the SQLite tier if one is given, promoting disk hits into memory.
+    """
+
+    def __init__(self, memory: Optional[LRUCache] = None, disk: Optional[SQLiteCache] = None):
+        self.memory = memory if memory is not None else LRUCache()
+        self.disk = disk
+        self.stats = CacheStats()
+
+    @staticmethod
+    def is_cacheable(request: ChatCompletionRequest) -> bool:
+        if request.stream:
+            return False
+        return request.temperature == 0 or request.seed is not None
+
+    async def get(self, request: ChatCompletionRequest) -> Optional[ModelResponse]:
+        key = request_cache_key(request)
+        response = self.memory.get(key)
+        if response is not None:
+            self.stats.memory_hits += 1
+            return response.model_copy(deep=True)
+        if self.disk is not None:
+            try:
+                value = await asyncio.to_thread(self.disk.get, key)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to read inference cache entry from disk: {e}")
+                value = None
+            if value is not None:
+                self.stats.disk_hits += 1
+                response = ModelResponse.model_validate_json(value)
+                self.stats.evictions += self.memory.set(key, response)
+                return response.model_copy(deep=True)
+        self.stats.misses += 1
+        return None
+
+    async def set(self, request: ChatCompletionRequest, response: ModelResponse):
+        key = request_cache_key(request)
+        self.stats.evictions += self.memory.set(key, response.model_copy(deep=True))
+        if self.disk is not None:
+            try:
+                self.stats.evictions += await asyncio.to_thread(self.disk.set, key, response.model_dump_json())
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to write inference cache entry to disk: {e}")
+
+    async def invalidate(self, request: ChatCompletionRequest):
+        key = request_cache_key(request)
+        self.memory.delete(key)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.delete, key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
@@ -766,7 +766,7 @@ async def run(
         )
         kb_run = await naptha.node.run_kb_and_poll(kb_run_input)
 
-async def storage_interaction(naptha, storage_type, operation, path, data=None, schema=None, options=None, file=None):
+async def storage_interaction(naptha, storage_type, operation, path, data=None, schema=None, options=None, file=None, output="./downloads"):
     """Handle storage interactions using StorageProvider"""
     storage_provider = StorageProvider(naptha.node.node)
     print(f"Storage interaction: {storage_type}, {operation}, {path}, {data}, {schema}, {options}, {file}")
@@ -794,16 +794,11 @@ async def storage_interaction(naptha, storage_type, operation, path, data=None,
                     path=path,
                     options=json.loads(options) if options else {}
                 )
-                result = await storage_provider.execute(request)
-                
-                # Handle downloaded file
-                if isinstance(result.data, bytes):
-                    output_dir = "./downloads"
-                    os.makedirs(output_dir, exist_ok=True)
-                    output_path = os.path.join(output_dir, os.path.basename(path))
-                    with open(output_path, 'wb') as f:
-                        f.write(result.data)
-                    print(f"File downloaded to: {output_path}")
+                # Stream straight to disk, resuming any earlier partial download of the same file
+                os.makedirs(output, exist_ok=True)
+                output_path = os.path.join(output, os.path.basename(path))
+                result = await storage_provider.download(request, output_path)
+                print(f"File downloaded to: {output_path}")
                 return result
 
         # Handle database and other operations
@@ -1315,7 +1310,8 @@ async def main():
                     data=args.data, 
                     schema=args.schema, 
                     options=args.options, 
-                    file=args.file
+                    file=args.file,
+                    output=args.output
                 )
             elif args.command == "publish":
                 await naptha.publish_modules(args.decorator, args.register, args.subdeployments)
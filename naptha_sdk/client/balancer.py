@@ -0,0 +1,157 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from naptha_sdk.utils import get_logger
+
+logger = get_logger(__name__)
+
+BALANCER_LATENCY_ALPHA = 0.3
+BALANCER_DEFAULT_LATENCY = 0.1
+BALANCER_FAILURE_THRESHOLD = 3
+BALANCER_EJECT_SECONDS = 30
+HEALTH_CHECK_INTERVAL = 10
+
+
+class PortStats:
+    """Load and health bookkeeping for one server port of a node"""
+
+    def __init__(self):
+        self.outstanding = 0
+        self.latency = None
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+    def is_ejected(self, now: float) -> bool:
+        return self.ejected_until > now
+
+
+class PortBalancer:
+    """Route requests across the server ports of a node.
+
+    Each request goes to the healthy port with the lowest expected wait, estimated
+    from the number of outstanding requests and an exponentially weighted moving
+    average of recent latency. A port is ejected for eject_seconds after
+    failure_threshold consecutive failures or a failed health check, and is tried
+    again once the ejection expires. If every port is ejected, the one that comes
+    back soonest is used rather than failing outright.
+    """
+
+    def __init__(
+        self,
+        ports: List[int],
+        latency_alpha: float = BALANCER_LATENCY_ALPHA,
+        failure_threshold: int = BALANCER_FAILURE_THRESHOLD,
+        eject_seconds: float = BALANCER_EJECT_SECONDS,
+    ):
+        if len(ports) == 0:
+            raise ValueError("No ports found for node")
+        self.ports = list(ports)
+        self.latency_alpha = latency_alpha
+        self.failure_threshold = failure_threshold
+        self.eject_seconds = eject_seconds
+        self.stats: Dict[int, PortStats] = {port: PortStats() for port in self.ports}
+        self._health_task: Optional[asyncio.Task] = None
+
+    def pick(self, ports: Optional[List[int]] = None) -> int:
+        """Choose the port the next request should go to, optionally from a subset of the ports."""
+        ports = self.ports if ports is None else ports
+        now = time.monotonic()
+        healthy = [port for port in ports if not self.stats[port].is_ejected(now)]
+        if not healthy:
+            return min(ports, key=lambda port: self.stats[port].ejected_until)
+
+        def expected_wait(port: int) -> float:
+            stats = self.stats[port]
+            latency = stats.latency if stats.latency is not None else BALANCER_DEFAULT_LATENCY
+            return (stats.outstanding + 1) * latency
+
+        best = min(expected_wait(port) for port in healthy)
+        return random.choice([port for port in healthy if expected_wait(port) == best])
+
+    @asynccontextmanager
+    async def track(self, port: int):
+        """Count a request against a port while it runs and record its outcome."""
+        stats = self.stats[port]
+        stats.outstanding += 1
+        start = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self.record_failure(port)
+            raise
+        else:
+            self.record_success(port, time.monotonic() - start)
+        finally:
+            stats.outstanding -= 1
+
+    def record_success(self, port: int, latency: float):
+        stats = self.stats[port]
+        stats.consecutive_failures = 0
+        stats.ejected_until = 0.0
+        if stats.latency is None:
+            stats.latency = latency
+        else:
+            stats.latency = self.latency_alpha * latency + (1 - self.latency_alpha) * stats.latency
+
+    def record_failure(self, port: int):
+        stats = self.stats[port]
+        stats.consecutive_failures += 1
+        if stats.consecutive_failures >= self.failure_threshold:
+            self.eject(port)
+
+    def eject(self, port: int):
+        logger.warning(f"Ejecting port {port} for {self.eject_seconds} seconds")
+        self.stats[port].ejected_until = time.monotonic() + self.eject_seconds
+
+    def restore(self, port: int):
+        stats = self.stats[port]
+        if stats.ejected_until:
+            logger.info(f"Port {port} is healthy again")
+        stats.consecutive_failures = 0
+        stats.ejected_until = 0.0
+
+    async def check_health(self, check: Callable[[int], Awaitable[bool]]):
+        """Run a health check against every port, ejecting the ones that fail."""
+        async def check_port(port: int):
+            try:
+                healthy = await check(port)
+            except Exception as e:
+                logger.info(f"Health check failed for port {port}: {e}")
+                healthy = False
+            if healthy:
+                self.restore(port)
+            else:
+                self.eject(port)
+
+        await asyncio.gather(*[check_port(port) for port in self.ports])
+
+    def start_health_checks(self, check: Callable[[int], Awaitable[bool]], interval: float = HEALTH_CHECK_INTERVAL) -> asyncio.Task:
+        """Run check_health every interval seconds in the background until stop_health_checks."""
+        if self._health_task is None or self._health_task.done():
+            async def run():
+                while True:
+                    await self.check_health(check)
+                    await asyncio.sleep(interval)
+
+            self._health_task = asyncio.create_task(run())
+        return self._health_task
+
+    async def stop_health_checks(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+
+_balancers: Dict[Tuple[str, str, Tuple[int, ...]], PortBalancer] = {}
+
+
+def get_port_balancer(ip: str, server_type: str, ports: List[int]) -> PortBalancer:
+    """Get the process-wide balancer for a node, so every client of the node shares its stats."""
+    key = (ip, server_type, tuple(sorted(ports)))
+    if key not in _balancers:
+        _balancers[key] = PortBalancer(ports)
+    return _balancers[key]
@@ -0,0 +1,274 @@
+import asyncio
+import json
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+import grpc
+import websockets
+
+from naptha_sdk.client import grpc_server_pb2_grpc
+from naptha_sdk.utils import get_logger
+
+logger = get_logger(__name__)
+
+GRPC_KEEPALIVE_TIME_MS = 30000
+GRPC_KEEPALIVE_TIMEOUT_MS = 10000
+GRPC_MAX_MESSAGE_LENGTH = 100 * 1024 * 1024
+WS_MAX_IN_FLIGHT = 64
+WS_CONNECT_RETRIES = 3
+WS_CONNECT_BACKOFF = 0.5
+GRPC_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", GRPC_KEEPALIVE_TIME_MS),
+    ("grpc.keepalive_timeout_ms", GRPC_KEEPALIVE_TIMEOUT_MS),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.max_send_message_length", GRPC_MAX_MESSAGE_LENGTH),
+    ("grpc.max_receive_message_length", GRPC_MAX_MESSAGE_LENGTH),
+]
+
+
+class GrpcChannelPool:
+    """Process-wide cache of gRPC channels and stubs, keyed by node address.
+
+    Every caller talking to the same node shares one HTTP/2 channel, so concurrent
+    calls are multiplexed over a single connection instead of each paying for a
+    handshake. grpc.aio channels are bound to the event loop they were created on,
+    so a channel is replaced when it is requested from a different loop or after
+    it has been shut down. A replaced channel is closed in the background, on its
+    own loop if that is still running in another thread and on the current one
+    otherwise.
+    """
+
+    def __init__(self, options: Optional[List[Tuple[str, int]]] = None):
+        self.options = options if options is not None else GRPC_CHANNEL_OPTIONS
+        self._channels: Dict[str, Tuple[grpc.aio.Channel, grpc_server_pb2_grpc.GrpcServerStub, asyncio.AbstractEventLoop]] = {}
+        self._closing: Set[asyncio.Task] = set()
+
+    def get_stub(self, address: str) -> grpc_server_pb2_grpc.GrpcServerStub:
+        """Get the shared stub for a node address, opening a channel if needed."""
+        loop = asyncio.get_running_loop()
+        entry = self._channels.get(address)
+        if entry is not None:
+            channel, stub, channel_loop = entry
+            if channel_loop is loop and channel.get_state() != grpc.ChannelConnectivity.SHUTDOWN:
+                return stub
+            self._close_channel(channel, channel_loop)
+
+        logger.info(f"Opening gRPC channel to {address}")
+        channel = grpc.aio.insecure_channel(address, options=self.options)
+        stub = grpc_server_pb2_grpc.GrpcServerStub(channel)
+        self._channels[address] = (channel, stub, loop)
+        return stub
+
+    async def close(self, address: Optional[str] = None, grace: Optional[float] = None):
+        """Close the channel for one address, or every channel when no address is given."""
+        addresses = [address] if address is not None else list(self._channels)
+        loop = asyncio.get_running_loop()
+        for address in addresses:
+            entry = self._channels.pop(address, None)
+            if entry is None:
+                continue
+            channel, _, channel_loop = entry
+            if channel_loop is not loop and channel_loop.is_running():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(channel.close(grace), channel_loop))
+            else:
+                await channel.close(grace)
+
+    def _close_channel(self, channel: grpc.aio.Channel, channel_loop: asyncio.AbstractEventLoop):
+        loop = asyncio.get_running_loop()
+        if channel_loop is not loop and channel_loop.is_running():
+            asyncio.run_coroutine_threadsafe(channel.close(), channel_loop)
+            return
+        task = loop.create_task(channel.close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+
+grpc_channel_pool = GrpcChannelPool()
+
+
+class WebSocketConnection:
+    """One long-lived WebSocket connection to a node endpoint, shared by concurrent requests.
+
+    Each request is tagged with a request_id and replies that echo it are matched by id,
+    so replies for requests that were cancelled or timed out can be dropped. Until the
+    node has echoed an id, requests are sent one at a time and a reply without an id
+    answers the request in flight; if that request is cancelled before its reply
+    arrives, the connection is reset so the late reply cannot answer the next one.
+    Once the node echoes ids, up to max_in_flight requests are outstanding at once and
+    further callers wait for a slot. Frames that are not JSON are logged and skipped.
+    If the connection drops, the outstanding requests fail with ConnectionError and
+    the next request reconnects.
+    """
+
+    def __init__(self, url: str, max_in_flight: int = WS_MAX_IN_FLIGHT, connect: Callable = websockets.connect):
+        self.url = url
+        self._connect = connect
+        self._ws = None
+        self._reader = None
+        self._connect_lock = asyncio.Lock()
+        self._send_lock = asyncio.Lock()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._order: Deque[str] = deque()
+        self._echoes_ids = False
+        self._unmatched_lock = asyncio.Lock()
+        self._closing: Set[asyncio.Task] = set()
+
+    async def request(self, message: Dict[str, Any]) -> Any:
+        """Send a JSON message and wait for its reply."""
+        async with self._in_flight:
+            if self._echoes_ids:
+                return await self._exchange(message)
+            async with self._unmatched_lock:
+                return await self._exchange(message)
+
+    async def _exchange(self, message: Dict[str, Any]) -> Any:
+        ws = await self._ensure_connected()
+        request_id = str(uuid.uuid4())
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            async with self._send_lock:
+                self._order.append(request_id)
+                await ws.send(json.dumps({**message, "request_id": request_id}))
+            return await future
+        except asyncio.CancelledError:
+            # Cancelling the request cancels the future too, so a reply arrived only if it has a result
+            if (future.cancelled() or not future.done()) and not self._echoes_ids:
+                self._reset(ws)
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+            if request_id in self._order:
+                self._order.remove(request_id)
+
+    def _reset(self, ws):
+        """Drop a connection whose next reply may belong to a request that is no longer waiting."""
+        if self._ws is not ws:
+            return
+        logger.warning(f"Resetting WebSocket connection to {self.url} after a request without a matching reply was cancelled")
+        self._ws = None
+        task = asyncio.create_task(ws.close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _ensure_connected(self):
+        async with self._connect_lock:
+            if self._ws is not None:
+                return self._ws
+            if self._reader is not None:
+                # Let the reader of a reset connection fail its requests before the next one is registered
+                await asyncio.gather(self._reader, return_exceptions=True)
+                self._reader = None
+            for attempt in range(WS_CONNECT_RETRIES):
+                try:
+                    logger.info(f"Connecting to WebSocket: {self.url}")
+                    self._ws = await self._connect(self.url)
+                    break
+                except (OSError, websockets.exceptions.WebSocketException) as e:
+                    if attempt == WS_CONNECT_RETRIES - 1:
+                        raise ConnectionError(f"Failed to connect to WebSocket {self.url}: {e}") from e
+                    await asyncio.sleep(WS_CONNECT_BACKOFF * 2 ** attempt)
+            self._reader = asyncio.create_task(self._read_replies(self._ws))
+            return self._ws
+
+    async def _read_replies(self, ws):
+        error = ConnectionError(f"WebSocket connection to {self.url} closed")
+        try:
+            async for raw in ws:
+                try:
+                    reply = json.loads(raw)
+                except ValueError as e:
+                    logger.warning(f"Skipping WebSocket frame from {self.url} that is not JSON: {e}")
+                    continue
+                request_id = reply.pop("request_id", None) if isinstance(reply, dict) else None
+                if request_id is None:
+                    # Only a node that never echoes ids answers in order, one request at a time
+                    request_id = self._order[0] if self._order and not self._echoes_ids else None
+                elif request_id in self._pending:
+                    self._echoes_ids = True
+                else:
+                    # The request was cancelled or timed out before its reply arrived
+                    logger.warning(f"Dropping WebSocket reply for unknown request {request_id} from {self.url}")
+                    continue
+                if request_id is None:
+                    logger.warning(f"Dropping unsolicited WebSocket message from {self.url}")
+                    continue
+                self._order.remove(request_id)
+                future = self._pending.pop(request_id)
+                if not future.done():
+                    future.set_result(reply)
+        except asyncio.CancelledError:
+            # The event loop is shutting down, so close the socket while it still can be
+            await ws.close()
+            raise
+        except websockets.exceptions.ConnectionClosed as e:
+            error = ConnectionError(f"WebSocket connection to {self.url} closed: {e}")
+        except Exception as e:
+            error = ConnectionError(f"WebSocket connection to {self.url} failed: {e}")
+        finally:
+            if self._ws is ws:
+                self._ws = None
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+            self._order.clear()
+
+    async def close(self):
+        """Close the connection and fail any outstanding requests."""
+        ws, self._ws = self._ws, None
+        if ws is not None:
+            await ws.close()
+        await asyncio.gather(*self._closing, return_exceptions=True)
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+
+
+class WebSocketPool:
+    """Process-wide cache of WebSocketConnections, one per node and action.
+
+    Node WebSocket endpoints are addressed as {node_url}/ws/{action}/{client_id}, so a
+    connection is kept per node and action, and the whole process uses a single client id.
+    A connection is bound to the event loop it was opened on; requested from another loop
+    it is replaced, and the old one is closed on its own loop if that loop is still running.
+    A connection whose loop has finished was closed when the loop cancelled its reader.
+    """
+
+    def __init__(self, max_in_flight: int = WS_MAX_IN_FLIGHT):
+        self.max_in_flight = max_in_flight
+        self.client_id = str(uuid.uuid4())
+        self._connections: Dict[Tuple[str, str], Tuple[WebSocketConnection, asyncio.AbstractEventLoop]] = {}
+
+    def get_connection(self, node_url: str, action: str) -> WebSocketConnection:
+        """Get the shared connection for a node action. It connects lazily on the first request."""
+        loop = asyncio.get_running_loop()
+        key = (node_url, action)
+        entry = self._connections.get(key)
+        if entry is not None:
+            if entry[1] is loop:
+                return entry[0]
+            connection, connection_loop = entry
+            if connection_loop.is_running():
+                asyncio.run_coroutine_threadsafe(connection.close(), connection_loop)
+        connection = WebSocketConnection(f"{node_url}/ws/{action}/{self.client_id}", max_in_flight=self.max_in_flight)
+        self._connections[key] = (connection, loop)
+        return connection
+
+    async def close(self, node_url: Optional[str] = None):
+        """Close the connections to one node, or every connection when no node URL is given."""
+        loop = asyncio.get_running_loop()
+        for key in list(self._connections):
+            if node_url is not None and key[0] != node_url:
+                continue
+            connection, connection_loop = self._connections.pop(key)
+            if connection_loop is loop:
+                await connection.close()
+            elif connection_loop.is_running():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(connection.close(), connection_loop))
+
+
+ws_connection_pool = WebSocketPool()
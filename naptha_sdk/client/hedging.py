@@ -0,0 +1,119 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Optional, TypeVar
+
+from naptha_sdk.utils import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_DELAY = 0.02
+HEDGE_BUDGET_RATIO = 0.05
+HEDGE_MAX_TOKENS = 10
+HEDGE_LATENCY_WINDOW = 500
+HEDGE_MIN_SAMPLES = 20
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies in seconds"""
+
+    def __init__(self, window: int = HEDGE_LATENCY_WINDOW):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float):
+        self.samples.append(latency)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+
+class HedgePolicy:
+    """Send a duplicate of a slow read-only call and take whichever answer comes first.
+
+    The hedge is sent once the primary call has been outstanding longer than the given
+    percentile of recent latencies. Hedges draw from a token bucket that gains
+    budget_ratio tokens per call, so at most that fraction of calls (plus a small burst
+    of max_tokens) is ever duplicated and a slow node does not get its load multiplied.
+    No hedges are sent until min_samples latencies have been seen.
+    """
+
+    def __init__(
+        self,
+        percentile: float = HEDGE_PERCENTILE,
+        budget_ratio: float = HEDGE_BUDGET_RATIO,
+        max_tokens: float = HEDGE_MAX_TOKENS,
+        min_delay: float = HEDGE_MIN_DELAY,
+        window: int = HEDGE_LATENCY_WINDOW,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+    ):
+        self.percentile = percentile
+        self.budget_ratio = budget_ratio
+        self.max_tokens = max_tokens
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.latencies = LatencyTracker(window)
+        self.tokens = 0.0
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """How long to wait for the primary call before hedging, or None if there is not enough data yet."""
+        if len(self.latencies.samples) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latencies.percentile(self.percentile))
+
+    def _take_token(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def run(self, attempts: List[Callable[[], Awaitable[T]]]) -> T:
+        """Run attempts[0], hedging with attempts[1] if it is slow. Returns the first successful result.
+
+        The attempt that loses is cancelled. If both attempts fail, the primary's error is raised.
+        """
+        self.calls += 1
+        self.tokens = min(self.max_tokens, self.tokens + self.budget_ratio)
+
+        async def timed(attempt: Callable[[], Awaitable[T]]) -> T:
+            start = time.monotonic()
+            result = await attempt()
+            self.latencies.record(time.monotonic() - start)
+            return result
+
+        primary = asyncio.ensure_future(timed(attempts[0]))
+        delay = self.hedge_delay()
+        if len(attempts) < 2 or delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not self._take_token():
+            return await primary
+
+        self.hedges += 1
+        logger.info(f"Hedging call still outstanding after {delay:.3f}s")
+        hedge = asyncio.ensure_future(timed(attempts[1]))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
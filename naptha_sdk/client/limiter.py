@@ -0,0 +1,274 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from naptha_sdk.schemas import ChatCompletionRequest, RateLimits
+from naptha_sdk.utils import get_logger
+
+logger = get_logger(__name__)
+
+AIMD_INITIAL_LIMIT = 8
+AIMD_MIN_LIMIT = 1
+AIMD_MAX_LIMIT = 256
+AIMD_BACKOFF_RATIO = 0.5
+AIMD_LATENCY_TOLERANCE = 2.0
+AIMD_LATENCY_ALPHA = 0.2
+# Weight of each sample in the long-run baseline, slow enough that a spike stands out against it
+AIMD_BASELINE_ALPHA = 0.01
+
+
+class AIMDLimiter:
+    """Concurrency limit that adapts to the node, like TCP congestion control.
+
+    Every successful call grows the limit by 1/limit, so roughly one extra slot per
+    round of calls (additive increase). An overload signal halves it (multiplicative
+    decrease). Overload signals are a 429/5xx/timeout reported through record_overload,
+    or a short-term latency average above latency_tolerance times the long-run average.
+    Comparing two averages rather than the best latency seen keeps prompts of different
+    sizes from reading as overload, while a node that starts queueing shows up as the
+    short-term average pulling away. Only calls started after the last decrease can
+    trigger another one, so a burst of failures from a single round shrinks the limit
+    once; the other calls of that round grow it as usual.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = AIMD_INITIAL_LIMIT,
+        min_limit: int = AIMD_MIN_LIMIT,
+        max_limit: int = AIMD_MAX_LIMIT,
+        backoff_ratio: float = AIMD_BACKOFF_RATIO,
+        latency_tolerance: float = AIMD_LATENCY_TOLERANCE,
+        latency_alpha: float = AIMD_LATENCY_ALPHA,
+        baseline_alpha: float = AIMD_BASELINE_ALPHA,
+    ):
+        if not min_limit <= initial_limit <= max_limit:
+            raise ValueError("Initial limit must be between min_limit and max_limit")
+        self._limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.latency_alpha = latency_alpha
+        self.baseline_alpha = baseline_alpha
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.baseline_latency: Optional[float] = None
+        self._samples = 0
+        self._last_decrease = float("-inf")
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    async def acquire(self) -> float:
+        """Wait for a free slot and take it. Returns the start time to pass back on release."""
+        while self.in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+        return time.monotonic()
+
+    def record_success(self, start: float):
+        """Release a slot after a successful call, growing the limit unless latency says the node is saturated."""
+        latency = time.monotonic() - start
+        self._samples += 1
+        self.latency = latency if self.latency is None else self.latency_alpha * latency + (1 - self.latency_alpha) * self.latency
+        # A plain mean over the first samples, so the baseline starts from the typical latency rather than the first one
+        alpha = max(self.baseline_alpha, 1 / self._samples)
+        self.baseline_latency = latency if self.baseline_latency is None else alpha * latency + (1 - alpha) * self.baseline_latency
+
+        saturated = self.latency > self.latency_tolerance * self.baseline_latency
+        if not saturated or not self._decrease(start, f"latency {self.latency:.3f}s is above {self.latency_tolerance}x baseline {self.baseline_latency:.3f}s"):
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+        self.release()
+
+    def record_overload(self, start: float):
+        """Release a slot after the node signalled overload (429, 5xx or timeout)."""
+        self._decrease(start, "node is overloaded")
+        self.release()
+
+    def release(self):
+        """Release a slot without changing the limit, e.g. after a client error."""
+        self.in_flight -= 1
+        free = self.limit - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def _decrease(self, start: float, reason: str) -> bool:
+        """Shrink the limit, unless the call started before the last decrease. Returns whether it shrank."""
+        if start < self._last_decrease:
+            return False
+        self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+        self._last_decrease = time.monotonic()
+        logger.info(f"Reducing concurrency limit to {self.limit}: {reason}")
+        return True
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+SCHEDULER_MAX_WAIT = 30
+# Rough characters per token, used to estimate prompt size before the node has counted it
+CHARS_PER_TOKEN = 4
+DEFAULT_COMPLETION_TOKENS = 256
+
+
+def estimate_tokens(request: ChatCompletionRequest) -> int:
+    """Estimate the tokens a request will use: its prompt plus the completion it may generate."""
+    prompt_chars = sum(len(message.content or "") for message in request.messages)
+    completion_tokens = request.max_tokens if request.max_tokens is not None else DEFAULT_COMPLETION_TOKENS
+    return prompt_chars // CHARS_PER_TOKEN + completion_tokens * (request.n or 1)
+
+
+class TokenBucket:
+    """Budget that refills continuously at rate_per_minute, up to a burst of capacity.
+
+    A take larger than the capacity is allowed once the bucket is full and leaves it in
+    debt, so oversized requests are slowed down rather than blocked forever.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until amount can be taken, 0 if it can be taken now."""
+        self._refill()
+        shortfall = min(amount, self.capacity) - self.level
+        return max(0.0, shortfall / self.rate)
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+
+class _Waiter:
+    def __init__(self, priority: int, seq: int, tokens: int, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.future = future
+        self.enqueued = time.monotonic()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class _ModelQueue:
+    """Rate budgets and waiting requests for one model"""
+
+    def __init__(self, limits: RateLimits):
+        self.requests = TokenBucket(limits.requests_per_minute) if limits.requests_per_minute else None
+        self.tokens = TokenBucket(limits.tokens_per_minute) if limits.tokens_per_minute else None
+        self.by_priority: List[_Waiter] = []
+        self.by_arrival: Deque[_Waiter] = deque()
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def time_until(self, tokens: int) -> float:
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.time_until(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.time_until(tokens))
+        return wait
+
+    def take(self, tokens: int):
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(tokens)
+
+    def next_waiter(self, max_wait: float) -> Optional[_Waiter]:
+        # Granted and cancelled waiters are removed lazily from both queues
+        while self.by_priority and self.by_priority[0].future.done():
+            heapq.heappop(self.by_priority)
+        while self.by_arrival and self.by_arrival[0].future.done():
+            self.by_arrival.popleft()
+        if self.by_arrival and time.monotonic() - self.by_arrival[0].enqueued >= max_wait:
+            return self.by_arrival[0]
+        return self.by_priority[0] if self.by_priority else None
+
+
+class InferenceScheduler:
+    """Client-side requests-per-minute and tokens-per-minute budgets per model.
+
+    Requests wait in a priority queue until their model's budgets allow them; a lower
+    priority number goes first, so PRIORITY_INTERACTIVE traffic overtakes queued
+    PRIORITY_BATCH traffic. To avoid starvation, a request that has waited max_wait
+    seconds is served next regardless of priority. Token usage is estimated up front
+    with estimate_tokens. Models without limits are not delayed.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, RateLimits]] = None,
+        default_limits: Optional[RateLimits] = None,
+        max_wait: float = SCHEDULER_MAX_WAIT,
+    ):
+        self.limits = limits or {}
+        self.default_limits = default_limits or RateLimits()
+        self.max_wait = max_wait
+        self._queues: Dict[str, _ModelQueue] = {}
+        self._seq = itertools.count()
+
+    def _queue(self, model: str) -> _ModelQueue:
+        if model not in self._queues:
+            self._queues[model] = _ModelQueue(self.limits.get(model, self.default_limits))
+        return self._queues[model]
+
+    async def acquire(self, model: str, tokens: int = 0, priority: int = PRIORITY_INTERACTIVE):
+        """Wait until a request for model, using an estimated number of tokens, fits in the budgets."""
+        queue = self._queue(model)
+        if queue.next_waiter(self.max_wait) is None and queue.time_until(tokens) == 0:
+            queue.take(tokens)
+            return
+
+        waiter = _Waiter(priority, next(self._seq), tokens, asyncio.get_running_loop().create_future())
+        heapq.heappush(queue.by_priority, waiter)
+        queue.by_arrival.append(waiter)
+        self._dispatch(queue)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            waiter.future.cancel()
+            self._dispatch(queue)
+            raise
+
+    async def schedule(self, request: ChatCompletionRequest, priority: int = PRIORITY_INTERACTIVE):
+        """Wait until a chat completion request fits in its model's budgets."""
+        await self.acquire(request.model, estimate_tokens(request), priority)
+
+    def _dispatch(self, queue: _ModelQueue):
+        if queue.timer is not None:
+            queue.timer.cancel()
+            queue.timer = None
+        while True:
+            waiter = queue.next_waiter(self.max_wait)
+            if waiter is None:
+                return
+            wait = queue.time_until(waiter.tokens)
+            if wait > 0:
+                queue.timer = asyncio.get_running_loop().call_later(wait, self._dispatch, queue)
+                return
+            queue.take(waiter.tokens)
+            waiter.future.set_result(None)
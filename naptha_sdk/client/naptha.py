@@ -47,6 +47,8 @@ class Naptha:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async exit method for context manager"""
         await self.hub.close()
+        await self.node.aclose()
+        await self.inference_client.aclose()
 
     async def create_agent(self, name):
         async with self.hub:
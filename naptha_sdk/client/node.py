@@ -1,59 +1,106 @@
+import asyncio
 import json
 import os
 import shutil
 import tempfile
-import time
 import traceback
 import uuid
 import zipfile
 import random
+from contextlib import aclosing, asynccontextmanager
 from pathlib import Path
-from typing import Dict, Optional, Any, List, Tuple, Union
+from typing import AsyncIterator, Dict, Optional, Any, Iterable, Iterator, List, Tuple, Union
 
-import grpc
 import httpx
 import websockets
-from google.protobuf import struct_pb2
+from google.protobuf import empty_pb2, struct_pb2
 from google.protobuf.json_format import MessageToDict
 from httpx import HTTPStatusError, RemoteProtocolError
+from pydantic import ValidationError
 
 from naptha_sdk.client import grpc_server_pb2
-from naptha_sdk.client import grpc_server_pb2_grpc
-from naptha_sdk.schemas import AgentRun, AgentRunInput, ChatCompletionRequest, EnvironmentRun, EnvironmentRunInput, OrchestratorRun, \
-    OrchestratorRunInput, AgentDeployment, EnvironmentDeployment, OrchestratorDeployment, KBDeployment, KBRunInput, KBRun, ToolRunInput, ToolRun, NodeConfig, NodeConfigUser, ModelResponse, ToolDeployment
-from naptha_sdk.utils import get_logger, node_to_url
+from naptha_sdk.client.balancer import HEALTH_CHECK_INTERVAL, get_port_balancer
+from naptha_sdk.client.connections import grpc_channel_pool, ws_connection_pool
+from naptha_sdk.client.hedging import HedgePolicy
+from naptha_sdk.client.resilience import NO_RETRY, RetryPolicy, call_with_resilience, get_circuit_breaker, is_transient_error
+from naptha_sdk.inference import HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS, stream_chat_completion
+from naptha_sdk.schemas import AgentRun, AgentRunInput, BatchRunResult, ChatCompletionRequest, EnvironmentRun, EnvironmentRunInput, OrchestratorRun, \
+    OrchestratorRunInput, AgentDeployment, EnvironmentDeployment, OrchestratorDeployment, KBDeployment, KBRunInput, KBRun, ToolRunInput, ToolRun, NodeConfig, NodeConfigUser, ModelResponse, ModelResponseChunk, ToolDeployment
+from naptha_sdk.utils import aiter_sse_data, get_logger, node_to_url
 
 logger = get_logger(__name__)
 HTTP_TIMEOUT = 300
+HTTP_KEEPALIVE_EXPIRY = 30
+POLL_MIN_INTERVAL = 0.05
+POLL_MAX_INTERVAL = 3
+POLL_BACKOFF = 2
+POLL_JITTER = 0.1
+RUN_MANY_CONCURRENCY = 10
+HEALTH_CHECK_TIMEOUT = 5
+
+class RunEventsNotSupported(Exception):
+    """Raised when a node does not serve pushed run events"""
 
 class NodeClient:
-    def __init__(self, node: NodeConfig):
+    def __init__(self, node: NodeConfig, retry_policy: Optional[RetryPolicy] = None):
         self.node = node
         self.server_type = node.server_type
         self.node_url = self.node_to_url(node)
+        self.balancer = get_port_balancer(node.ip, node.server_type, node.ports)
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.circuit_breaker = get_circuit_breaker(f"{node.server_type}://{node.ip}")
         self.connections = {}
 
         self.access_token = None
         logger.info(f"Node URL: {self.node_url}")
 
-    def node_to_url(self, node: NodeConfig):
+    def node_to_url(self, node: NodeConfig, port: Optional[int] = None):
         ports = node.ports
         if len(ports) == 0:
             raise ValueError("No ports found for node")
+        if port is None:
+            port = random.choice(ports)
         if node.server_type == 'ws':
-            return f"ws://{node.ip}:{random.choice(ports)}"
+            return f"ws://{node.ip}:{port}"
         elif node.server_type == 'grpc':
-            return f"{node.ip}:{random.choice(ports)}"
+            return f"{node.ip}:{port}"
         else:
             raise ValueError("Invalid server type. Server type must be either 'ws' or 'grpc'.")
 
+    @asynccontextmanager
+    async def _balanced_url(self):
+        """Pick the least-loaded healthy port for one request and track the request against it."""
+        port = self.balancer.pick()
+        async with self.balancer.track(port):
+            yield self.node_to_url(self.node, port)
+
+    async def check_health(self):
+        """Check every port with the gRPC is_alive call, ejecting the ones that do not answer.
+
+        ws servers have no health endpoint, so their ports are only ejected after repeated failures.
+        """
+        if self.server_type == 'grpc':
+            await self.balancer.check_health(self._is_alive)
+
+    def start_health_checks(self, interval: float = HEALTH_CHECK_INTERVAL) -> Optional[asyncio.Task]:
+        """Run check_health periodically in the background, shared by every client of this node."""
+        if self.server_type == 'grpc':
+            return self.balancer.start_health_checks(self._is_alive, interval)
+        return None
+
+    async def _is_alive(self, port: int) -> bool:
+        stub = grpc_channel_pool.get_stub(self.node_to_url(self.node, port))
+        response = await stub.is_alive(empty_pb2.Empty(), timeout=HEALTH_CHECK_TIMEOUT)
+        return response.ok
+
     async def check_user(self, user_input: Dict[str, str]) -> Dict[str, Any]:
         if self.node.server_type == 'ws':
-            return await self.check_user_ws(user_input)
+            check = lambda: self.check_user_ws(user_input)
         elif self.node.server_type == 'grpc':
-            return await self.check_user_grpc(user_input)
+            check = lambda: self.check_user_grpc(user_input)
         else:
             raise ValueError("Invalid server type. Server type must be either 'ws' or 'grpc'.")
+        return await call_with_resilience(check, self.retry_policy, self.circuit_breaker, "Check user")
 
     async def check_user_ws(self, user_input: Dict[str, str]):
         response = await self.send_receive_ws(user_input, "user/check")
@@ -61,23 +108,23 @@ class NodeClient:
         return response
 
     async def check_user_grpc(self, user_input: Dict[str, str]):
-        async with grpc.aio.insecure_channel(self.node_url) as channel:
-            stub = grpc_server_pb2_grpc.GrpcServerStub(channel)
-            request = grpc_server_pb2.CheckUserRequest(
-                user_id=user_input.get('user_id', ''),
-                public_key=user_input.get('public_key', '')
-            )
-            response = await stub.CheckUser(request)
-            logger.info(f"Check user response: {response}")
-            return MessageToDict(response, preserving_proto_field_name=True)
+        request = grpc_server_pb2.CheckUserRequest(
+            user_id=user_input.get('user_id', ''),
+            public_key=user_input.get('public_key', '')
+        )
+        async with self._balanced_url() as node_url:
+            response = await grpc_channel_pool.get_stub(node_url).CheckUser(request)
+        logger.info(f"Check user response: {response}")
+        return MessageToDict(response, preserving_proto_field_name=True)
 
     async def register_user(self, user_input: Dict[str, str]) -> Dict[str, Any]:
         if self.node.server_type == 'ws':
-            return await self.register_user_ws(user_input)
+            register = lambda: self.register_user_ws(user_input)
         elif self.node.server_type == 'grpc':
-            return await self.register_user_grpc(user_input)
+            register = lambda: self.register_user_grpc(user_input)
         else:
             raise ValueError("Invalid server type. Server type must be either 'ws' or 'grpc'.")
+        return await call_with_resilience(register, NO_RETRY, self.circuit_breaker, "Register user")
         
     async def register_user_ws(self, user_input: Dict[str, str]):
         response = await self.send_receive_ws(user_input, "user/register")
@@ -85,26 +132,31 @@ class NodeClient:
         return response
 
     async def register_user_grpc(self, user_input: Dict[str, str]):
-        async with grpc.aio.insecure_channel(self.node_url) as channel:
-            stub = grpc_server_pb2_grpc.GrpcServerStub(channel)
-            request = grpc_server_pb2.RegisterUserRequest(
-                public_key=user_input.get('public_key', '')
-            )
-            response = await stub.RegisterUser(request)
-            return {
-                'id': response.id,
-                'public_key': response.public_key,
-            }
+        request = grpc_server_pb2.RegisterUserRequest(
+            public_key=user_input.get('public_key', '')
+        )
+        async with self._balanced_url() as node_url:
+            response = await grpc_channel_pool.get_stub(node_url).RegisterUser(request)
+        return {
+            'id': response.id,
+            'public_key': response.public_key,
+        }
 
     async def run_module(self, module_type: str, run_input: Union[AgentRunInput, KBRunInput, ToolRunInput, EnvironmentRunInput]):
+        # The same key is sent on every retry, so the node starts the run at most once
+        idempotency_key = str(uuid.uuid4())
         if self.node.server_type == 'ws':
-            return await self.run_module_ws(module_type, run_input)
+            run = lambda: self.run_module_ws(module_type, run_input, idempotency_key)
         elif self.node.server_type == 'grpc':
-            return await self.run_module_grpc(module_type, run_input)
+            run = lambda: self.run_module_grpc(module_type, run_input, idempotency_key)
         else:
             raise ValueError("Invalid server type. Server type must be either 'ws' or 'grpc'.")
+        return await call_with_resilience(run, self.retry_policy, self.circuit_breaker, f"Run {module_type}")
 
-    async def run_module_ws(self, module_type: str, run_input):
+    async def run_module_ws(self, module_type: str, run_input, idempotency_key: Optional[str] = None):
+        if idempotency_key is not None:
+            message = run_input.model_dump() if hasattr(run_input, 'model_dump') else dict(run_input)
+            run_input = {**message, 'idempotency_key': idempotency_key}
         response = await self.send_receive_ws(run_input, f"{module_type}/run")
         
         output_types = {
@@ -121,98 +173,147 @@ class NodeClient:
             logger.error(f"Full traceback: {traceback.format_exc()}")
             raise Exception(response['message'])
 
-    async def run_module_grpc(self, module_type: str, run_input):
-        async with grpc.aio.insecure_channel(self.node_url) as channel:
-            stub = grpc_server_pb2_grpc.GrpcServerStub(channel)
-
-            # Convert inputs to Struct
-            input_struct = struct_pb2.Struct()
-            if run_input.inputs:
-                if isinstance(run_input.inputs, dict):
-                    input_data = run_input.inputs.dict() if hasattr(run_input.inputs, 'dict') else run_input.inputs
-                    input_struct.update(input_data)
-
-            # Create node config
-            node_config = grpc_server_pb2.NodeConfigUser(
-                ip=run_input.deployment.node.ip,
-                http_port=run_input.deployment.node.http_port,
-                server_type=run_input.deployment.node.server_type
-            )
+    async def run_module_stream(self, module_type: str, run_input: Union[AgentRunInput, KBRunInput, ToolRunInput, EnvironmentRunInput]) -> AsyncIterator[Union[AgentRun, KBRun, ToolRun, EnvironmentRun]]:
+        """Run a module and yield each update of the run as the node sends it.
 
-            # Create module
-            module = grpc_server_pb2.Module(
-                id=run_input.deployment.module.get('id', ''),
-                name=run_input.deployment.module.get('name', ''),
-                description=run_input.deployment.module.get('description', ''),
-                author=run_input.deployment.module.get('author', ''),
-                module_url=run_input.deployment.module.get('module_url', ''),
-                module_type=module_type,
-                module_version=run_input.deployment.module.get('module_version', ''),
-                module_entrypoint=run_input.deployment.module.get('module_entrypoint', '')
-            )
+        Over gRPC every streamed update is yielded, including partial results. A ws
+        node only answers once, so the finished run is yielded on its own. Like run_module,
+        the run goes through the node's circuit breaker and is retried with the same
+        idempotency key until the node sends its first update; a stream that fails after
+        that is not retried, since updates have already been yielded.
+        """
+        if self.node.server_type == 'ws':
+            yield await self.run_module(module_type, run_input)
+        elif self.node.server_type == 'grpc':
+            idempotency_key = str(uuid.uuid4())
+
+            async def open_stream():
+                updates = self.run_module_grpc_stream(module_type, run_input, idempotency_key)
+                try:
+                    first = await anext(updates, None)
+                except BaseException:
+                    await updates.aclose()
+                    raise
+                if first is None:
+                    raise Exception(f"No response received from {self.node_url} for {module_type} run")
+                return updates, first
+
+            updates, module_run = await call_with_resilience(open_stream, self.retry_policy, self.circuit_breaker, f"Run {module_type}")
+            async with aclosing(updates):
+                yield module_run
+                async for module_run in updates:
+                    yield module_run
+        else:
+            raise ValueError("Invalid server type. Server type must be either 'ws' or 'grpc'.")
 
-            # Create config struct
-            config_struct = struct_pb2.Struct()
-            if run_input.deployment.config:
-                if isinstance(run_input.deployment.config, dict):
-                    config_struct.update(run_input.deployment.config)
-                else:
-                    config_struct.update(run_input.deployment.config.dict())
-
-            # Create deployment based on module type
-            deployment_classes = {
-                "agent": grpc_server_pb2.AgentDeployment,
-                "kb": grpc_server_pb2.BaseDeployment,
-                "tool": grpc_server_pb2.ToolDeployment,
-                "environment": grpc_server_pb2.BaseDeployment
-            }
-            
-            DeploymentClass = deployment_classes[module_type]
-            deployment = DeploymentClass(
-                node_input=node_config,
-                name=run_input.deployment.name,
-                module=module,
-                config=config_struct,
-                initialized=False
-            )
+    async def run_module_grpc(self, module_type: str, run_input, idempotency_key: Optional[str] = None):
+        module_run = None
+        async for module_run in self.run_module_grpc_stream(module_type, run_input, idempotency_key):
+            pass
+        if module_run is None:
+            raise Exception(f"No response received from {self.node_url} for {module_type} run")
+        return module_run
 
-            # Create request with appropriate deployment field
-            request_args = {
-                "module_type": module_type,
-                "consumer_id": run_input.consumer_id,
-                "inputs": input_struct,
-                f"{module_type}_deployment": deployment
+    async def run_module_grpc_stream(self, module_type: str, run_input, idempotency_key: Optional[str] = None) -> AsyncIterator[Union[AgentRun, KBRun, ToolRun, EnvironmentRun]]:
+        """Run a module over gRPC and yield the run for every ModuleRun update the node streams back."""
+        if isinstance(run_input, dict):
+            input_types = {
+                "agent": AgentRunInput,
+                "kb": KBRunInput,
+                "tool": ToolRunInput,
+                "environment": EnvironmentRunInput
             }
+            run_input = input_types[module_type](**run_input)
+
+        # Convert inputs to Struct
+        input_struct = struct_pb2.Struct()
+        if run_input.inputs:
+            if isinstance(run_input.inputs, dict):
+                input_data = run_input.inputs.dict() if hasattr(run_input.inputs, 'dict') else run_input.inputs
+                input_struct.update(input_data)
+
+        # Create node config
+        node_config = grpc_server_pb2.NodeConfigInput(
+            ip=run_input.deployment.node.ip,
+            http_port=run_input.deployment.node.http_port,
+            server_type=run_input.deployment.node.server_type
+        )
+
+        # Create module
+        module = grpc_server_pb2.Module(
+            id=run_input.deployment.module.get('id', ''),
+            name=run_input.deployment.module.get('name', ''),
+            description=run_input.deployment.module.get('description', ''),
+            author=run_input.deployment.module.get('author', ''),
+            module_url=run_input.deployment.module.get('module_url', ''),
+            module_type=module_type,
+            module_version=run_input.deployment.module.get('module_version', ''),
+            module_entrypoint=run_input.deployment.module.get('module_entrypoint', '')
+        )
+
+        # Create config struct
+        config_struct = struct_pb2.Struct()
+        if run_input.deployment.config:
+            if isinstance(run_input.deployment.config, dict):
+                config_struct.update(run_input.deployment.config)
+            else:
+                config_struct.update(run_input.deployment.config.dict())
+
+        # Create deployment based on module type
+        deployment_classes = {
+            "agent": grpc_server_pb2.AgentDeployment,
+            "kb": grpc_server_pb2.BaseDeployment,
+            "tool": grpc_server_pb2.ToolDeployment,
+            "environment": grpc_server_pb2.BaseDeployment
+        }
             
-            request = grpc_server_pb2.ModuleRunRequest(**request_args)
-
-            final_response = None
-            async for response in stub.RunModule(request):
-                final_response = response
-                logger.info(f"Got response: {response}")
+        DeploymentClass = deployment_classes[module_type]
+        deployment = DeploymentClass(
+            node_input=node_config,
+            name=run_input.deployment.name,
+            module=module,
+            config=config_struct,
+            initialized=False
+        )
+
+        # Create request with appropriate deployment field
+        request_args = {
+            "module_type": module_type,
+            "consumer_id": run_input.consumer_id,
+            "inputs": input_struct,
+            f"{module_type}_deployment": deployment
+        }
+            
+        request = grpc_server_pb2.ModuleRunRequest(**request_args)
 
-            output_types = {
-                "agent": AgentRun,
-                "kb": KBRun,
-                "tool": ToolRun,
-                "environment": EnvironmentRun
-            }
+        output_types = {
+            "agent": AgentRun,
+            "kb": KBRun,
+            "tool": ToolRun,
+            "environment": EnvironmentRun
+        }
 
-            return output_types[module_type](
-                consumer_id=run_input.consumer_id,
-                inputs=run_input.inputs,
-                deployment=run_input.deployment,
-                orchestrator_runs=[],
-                status=final_response.status,
-                error=final_response.error,
-                id=final_response.id,
-                results=list(final_response.results),
-                error_message=final_response.error_message,
-                created_time=final_response.created_time,
-                start_processing_time=final_response.start_processing_time,
-                completed_time=final_response.completed_time,
-                duration=final_response.duration
-            )
+        async with self._balanced_url() as node_url:
+            stub = grpc_channel_pool.get_stub(node_url)
+            metadata = (("idempotency-key", idempotency_key),) if idempotency_key is not None else None
+            async for response in stub.RunModule(request, metadata=metadata):
+                logger.info(f"Got response: {response}")
+                yield output_types[module_type](
+                    consumer_id=run_input.consumer_id,
+                    inputs=run_input.inputs,
+                    deployment=run_input.deployment,
+                    orchestrator_runs=[],
+                    status=response.status,
+                    error=response.error,
+                    id=response.id,
+                    results=list(response.results),
+                    error_message=response.error_message,
+                    created_time=response.created_time,
+                    start_processing_time=response.start_processing_time,
+                    completed_time=response.completed_time,
+                    duration=response.duration,
+                    signature=run_input.signature
+                )
     
     async def connect_ws(self, action: str):
         client_id = str(uuid.uuid4())
@@ -231,29 +332,106 @@ class NodeClient:
             self.current_client_id = None
 
     async def send_receive_ws(self, data, action: str):
-        client_id = await self.connect_ws(action)
-        
-        try:
-            if isinstance(data, AgentRunInput) or isinstance(data, OrchestratorRunInput):
-                message = data.model_dump()
-            else:
-                message = data
-            await self.connections[client_id].send(json.dumps(message))
-            
-            response = await self.connections[client_id].recv()
-            return json.loads(response)
-        finally:
-            await self.disconnect_ws(client_id)
+        """Send a message over the shared WebSocket connection for an action and wait for the reply.
+
+        Connections are kept open and reused by every NodeClient talking to the same node,
+        so concurrent calls are multiplexed instead of each paying for a handshake.
+        connect_ws and disconnect_ws remain for callers that manage their own connections.
+        """
+        if isinstance(data, AgentRunInput) or isinstance(data, OrchestratorRunInput):
+            message = data.model_dump()
+        else:
+            message = data
+
+        async with self._balanced_url() as node_url:
+            connection = ws_connection_pool.get_connection(node_url, action)
+            return await connection.request(message)
 
 class UserClient:
-    def __init__(self, node: NodeConfigUser):
+    def __init__(
+        self,
+        node: NodeConfigUser,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        hedge_nodes: Optional[List[NodeConfigUser]] = None,
+    ):
         self.node = node
         self.node_url = node_to_url(node)
         self.connections = {}
-        
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.circuit_breaker = get_circuit_breaker(self.node_url)
+        # Hedging is opt-in: pass a HedgePolicy to duplicate slow check_run and inference calls
+        self.hedge_policy = hedge_policy
+        self.hedge_urls = [node_to_url(hedge_node) for hedge_node in hedge_nodes or []]
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._client = None
+        # None until the node has been asked for run events, False if it does not serve them
+        self._run_events_supported = None
+
         self.access_token = None
         logger.info(f"Node URL: {self.node_url}")
 
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client shared by every request to this node.
+
+        Connections are kept alive between calls, so run submissions and status
+        checks reuse warm connections instead of opening a new one each time.
+        The client is recreated lazily if it has been closed.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=self.limits)
+        return self._client
+
+    async def _request(self, method: str, url: str, idempotent: bool = False, hedge: bool = False, **kwargs) -> httpx.Response:
+        """Send a request through the node's circuit breaker.
+
+        Transient failures (network errors and 408/429/5xx responses) are retried per
+        retry_policy when the request is idempotent, i.e. safe to send more than once.
+        Read-only requests marked hedge are hedged per hedge_policy, if one is set, with
+        the duplicate going to the next of hedge_nodes (or to this node if there are none).
+        Other responses, and the last 408/429/5xx response once retries are used up, are
+        returned as they are for the caller to handle, so it can read the node's error detail.
+        """
+        async def send(target_url: str) -> httpx.Response:
+            response = await self.client.request(method, target_url, **kwargs)
+            if response.status_code in self.retry_policy.retryable_status_codes:
+                response.raise_for_status()
+            return response
+
+        if hedge and self.hedge_policy is not None:
+            hedge_url = url
+            if self.hedge_urls:
+                hedge_url = self.hedge_urls[self.hedge_policy.calls % len(self.hedge_urls)] + url[len(self.node_url):]
+            call = lambda: self.hedge_policy.run([lambda: send(url), lambda: send(hedge_url)])
+        else:
+            call = lambda: send(url)
+
+        retry_policy = self.retry_policy if idempotent else NO_RETRY
+        try:
+            return await call_with_resilience(call, retry_policy, self.circuit_breaker, f"{method} {url}")
+        except HTTPStatusError as e:
+            return e.response
+
+    async def aclose(self):
+        """Close the pooled HTTP client and release its connections."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
     async def create(self, module_type: str,
                      module_request: Union[AgentDeployment, EnvironmentDeployment, KBDeployment, OrchestratorDeployment, ToolDeployment]):
         """Generic method to create either an agent, orchestrator, environment, tool, kb or memory.
@@ -267,20 +445,20 @@ class UserClient:
 
         endpoint = f"{self.node_url}/{module_type}/create"
         try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-                headers = {
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer {self.access_token}',
-                }
-                response = await client.post(
-                    endpoint,
-                    json=module_request.model_dump(),
-                    headers=headers
-                )
-                response.raise_for_status()
+            headers = {
+                'Content-Type': 'application/json',
+                'Authorization': f'Bearer {self.access_token}',
+            }
+            response = await self._request(
+                "POST",
+                endpoint,
+                json=module_request.model_dump(),
+                headers=headers
+            )
+            response.raise_for_status()
 
-                # Convert response to appropriate return type
-                return response.json()
+            # Convert response to appropriate return type
+            return response.json()
         except HTTPStatusError as e:
             logger.info(f"HTTP error occurred: {e}")
             raise
@@ -292,65 +470,248 @@ class UserClient:
             print(f"An unexpected error occurred: {e}")
             raise
 
-    async def _run_and_poll(self, run_input: Union[AgentRunInput, EnvironmentRunInput, OrchestratorRunInput, KBRunInput, ToolRunInput, Dict], module_type: str) -> Union[AgentRun, EnvironmentRun, OrchestratorRun, KBRun, ToolRun, Dict]:
+    async def _run_and_poll(
+        self,
+        run_input: Union[AgentRunInput, EnvironmentRunInput, OrchestratorRunInput, KBRunInput, ToolRunInput, Dict],
+        module_type: str,
+        poll_min_interval: float = POLL_MIN_INTERVAL,
+        poll_max_interval: float = POLL_MAX_INTERVAL,
+        poll_backoff: float = POLL_BACKOFF,
+        poll_jitter: float = POLL_JITTER,
+        timeout: Optional[float] = None,
+        subscribe: bool = True,
+    ) -> Union[AgentRun, EnvironmentRun, OrchestratorRun, KBRun, ToolRun, Dict]:
         """Generic method to run and poll either an agent, orchestrator, environment, tool or KB.
         
+        When subscribe is set, the run is followed through events pushed by the node (see
+        subscribe_run). If the node does not support run events, the event stream fails or
+        sends an event that cannot be parsed, or it ends before the run finishes, the run is
+        polled instead.
+
+        The first status check happens straight after the run is submitted. Later checks
+        back off exponentially (with jitter) from poll_min_interval up to poll_max_interval,
+        and drop back to poll_min_interval whenever the run produces new results.
+
         Args:
             run_input: Either AgentRunInput, OrchestratorRunInput, EnvironmentRunInput, KBRunInput, ToolRunInput or Dict
             module_type: Either 'agent', 'orchestrator', 'environment', 'tool' or 'kb'
+            poll_min_interval: Shortest wait in seconds between two status checks
+            poll_max_interval: Longest wait in seconds between two status checks
+            poll_backoff: Factor the wait grows by after each check without progress
+            poll_jitter: Relative random jitter applied to each wait
+            timeout: Overall deadline in seconds for the run, or None to wait indefinitely
+            subscribe: Whether to listen for pushed run events before falling back to polling
+
+        Raises:
+            asyncio.TimeoutError: If the run has not finished before the deadline
         """
         print(f"Run input: {run_input}")
         print(f"Module type: {module_type}")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+
+        def remaining_time() -> Optional[float]:
+            if deadline is None:
+                return None
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError(f"{module_type.title()} run {run.id} did not finish within {timeout} seconds")
+            return remaining
+
         # Start the run
         run = await getattr(self, f'run_{module_type}')(run_input)
         print(f"{module_type.title()} run started: {run}")
 
         current_results_len = 0
-        while True:
+        if subscribe and self._run_events_supported is not False:
+            async def follow_events():
+                nonlocal run, current_results_len
+                async with aclosing(self.subscribe_run(run, module_type)) as events:
+                    async for run in events:
+                        current_results_len = self._print_run_progress(run, current_results_len)
+                        if run.status in ['completed', 'error']:
+                            break
+
+            try:
+                await asyncio.wait_for(follow_events(), remaining_time())
+            except RunEventsNotSupported as e:
+                logger.info(f"{e}. Falling back to polling.")
+                self._run_events_supported = False
+            except asyncio.TimeoutError:
+                raise asyncio.TimeoutError(f"{module_type.title()} run {run.id} did not finish within {timeout} seconds")
+            except (httpx.TransportError, HTTPStatusError, json.JSONDecodeError, ValidationError) as e:
+                # A broken stream or an event that cannot be read says nothing about the run itself
+                logger.info(f"Run event stream failed: {e}. Falling back to polling.")
+
+        intervals = poll_intervals(poll_min_interval, poll_max_interval, poll_backoff, poll_jitter)
+        while run.status not in ['completed', 'error']:
             run = await getattr(self, f'check_{module_type}_run')(run)
 
-            output = f"{run.status} {getattr(run, f'deployment').module['module_type']} {getattr(run, f'deployment').module['name']}"
-            print(output)
-
-            results = run.results
-            status = run.status
+            results_len = self._print_run_progress(run, current_results_len)
+            if results_len > current_results_len:
+                current_results_len = results_len
+                # The run is making progress, so check again soon
+                intervals = poll_intervals(poll_min_interval, poll_max_interval, poll_backoff, poll_jitter)
 
-            if len(results) > current_results_len:
-                print("Output: ", results[-1])
-                current_results_len += 1
-
-            if status in ['completed', 'error']:
+            if run.status in ['completed', 'error']:
                 break
 
-            time.sleep(3)
+            remaining = remaining_time()
+            delay = next(intervals)
+            await asyncio.sleep(delay if remaining is None else min(delay, remaining))
 
-        if status == 'completed':
-            print(results)
+        if run.status == 'completed':
+            print(run.results)
         else:
             error_msg = run.error_message
             print(error_msg)
         return run
 
-    async def run_agent_and_poll(self, agent_run_input: AgentRunInput) -> AgentRun:
-        """Run an agent and poll for results until completion."""
-        return await self._run_and_poll(agent_run_input, 'agent')
+    async def run_many(
+        self,
+        run_inputs: Iterable[Union[AgentRunInput, EnvironmentRunInput, OrchestratorRunInput, KBRunInput, ToolRunInput, Dict]],
+        module_type: str,
+        concurrency: int = RUN_MANY_CONCURRENCY,
+        timeout: Optional[float] = None,
+        ordered: bool = False,
+        **poll_kwargs
+    ) -> AsyncIterator[BatchRunResult]:
+        """Run many modules of the same type with at most `concurrency` runs in flight.
+
+        Inputs are consumed lazily, so run_inputs can be a generator over a large batch.
+        A run that fails or times out is reported as an errored BatchRunResult and does
+        not stop the rest of the batch.
+
+        Args:
+            run_inputs: The run inputs, e.g. a list of AgentRunInput
+            module_type: Either 'agent', 'orchestrator', 'environment', 'tool' or 'kb'
+            concurrency: Maximum number of runs submitted and not yet finished
+            timeout: Deadline in seconds for each individual run, or None to wait indefinitely
+            ordered: Yield results in input order instead of as they complete
+            poll_kwargs: Polling options passed on to _run_and_poll
+
+        Yields:
+            BatchRunResult with the index of the input, and either the finished run or the error
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
+        async def run_one(index, run_input) -> BatchRunResult:
+            try:
+                run = await asyncio.wait_for(self._run_and_poll(run_input, module_type, **poll_kwargs), timeout)
+                return BatchRunResult(index=index, run=run, error=run.status == 'error', error_message=run.error_message)
+            except asyncio.TimeoutError:
+                logger.error(f"{module_type.title()} run {index} did not finish within {timeout} seconds")
+                return BatchRunResult(index=index, error=True, error_message=f"Run did not finish within {timeout} seconds")
+            except Exception as e:
+                logger.error(f"{module_type.title()} run {index} failed: {e}")
+                return BatchRunResult(index=index, error=True, error_message=f"{type(e).__name__}: {e}")
+
+        inputs = enumerate(run_inputs)
+        in_flight = set()
+        buffered = {}
+        next_index = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(in_flight) < concurrency:
+                    item = next(inputs, None)
+                    if item is None:
+                        exhausted = True
+                    else:
+                        in_flight.add(asyncio.create_task(run_one(*item)))
+                if not in_flight:
+                    break
+
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if not ordered:
+                        yield result
+                    else:
+                        buffered[result.index] = result
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+        finally:
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+    def _print_run_progress(self, run: Union[AgentRun, EnvironmentRun, OrchestratorRun, KBRun, ToolRun], current_results_len: int) -> int:
+        """Print the run status and any new output. Returns the number of results seen so far."""
+        output = f"{run.status} {getattr(run, f'deployment').module['module_type']} {getattr(run, f'deployment').module['name']}"
+        print(output)
+
+        if len(run.results) > current_results_len:
+            print("Output: ", run.results[-1])
+            current_results_len = len(run.results)
+        return current_results_len
+
+    async def subscribe_run(
+        self,
+        module_run: Union[AgentRun, OrchestratorRun, EnvironmentRun, KBRun, ToolRun],
+        module_type: str
+    ) -> AsyncIterator[Union[AgentRun, OrchestratorRun, EnvironmentRun, KBRun, ToolRun]]:
+        """Follow a module run through status and result events pushed by the node.
+
+        Listens on the node's server-sent events stream at /{module_type}/events/{run_id}.
+        Each event carries the run (or the fields that changed) as JSON, and the updated
+        run is yielded as soon as it arrives.
+
+        Args:
+            module_run: Either AgentRun, OrchestratorRun, EnvironmentRun, ToolRun or KBRun object
+            module_type: Either 'agent', 'orchestrator', 'environment', 'tool' or 'kb'
+
+        Raises:
+            RunEventsNotSupported: If the node does not serve run events
+        """
+        return_class = {
+            'agent': AgentRun,
+            'orchestrator': OrchestratorRun,
+            'environment': EnvironmentRun,
+            'kb': KBRun,
+            'tool': ToolRun
+        }[module_type]
+        endpoint = f"{self.node_url}/{module_type}/events/{module_run.id}"
+        headers = {
+            'Accept': 'text/event-stream',
+            'Authorization': f'Bearer {self.access_token}',
+        }
+        # Events can be far apart for long runs, so only bound the time to connect
+        timeout = httpx.Timeout(HTTP_TIMEOUT, read=None)
+        async with self.client.stream("GET", endpoint, headers=headers, timeout=timeout) as response:
+            content_type = response.headers.get('content-type', '')
+            if response.status_code in (404, 405, 501) or (response.is_success and 'text/event-stream' not in content_type):
+                raise RunEventsNotSupported(f"Node at {self.node_url} does not support run events")
+            response.raise_for_status()
 
-    async def run_tool_and_poll(self, tool_run_input: ToolRunInput) -> ToolRun:
-        """Run a tool and poll for results until completion."""
+            async for data in aiter_sse_data(response):
+                update = json.loads(data)
+                module_run = return_class(**{**module_run.model_dump(), **update})
+                yield module_run
 
-        return await self._run_and_poll(tool_run_input, 'tool')
+    async def run_agent_and_poll(self, agent_run_input: AgentRunInput, **poll_kwargs) -> AgentRun:
+        """Run an agent and poll for results until completion. See _run_and_poll for polling options."""
+        return await self._run_and_poll(agent_run_input, 'agent', **poll_kwargs)
 
-    async def run_orchestrator_and_poll(self, orchestrator_run_input: OrchestratorRunInput) -> OrchestratorRun:
-        """Run an orchestrator and poll for results until completion."""
-        return await self._run_and_poll(orchestrator_run_input, 'orchestrator')
+    async def run_tool_and_poll(self, tool_run_input: ToolRunInput, **poll_kwargs) -> ToolRun:
+        """Run a tool and poll for results until completion. See _run_and_poll for polling options."""
 
-    async def run_environment_and_poll(self, environment_input: EnvironmentRunInput) -> EnvironmentRun:
-        """Run an environment and poll for results until completion."""
-        return await self._run_and_poll(environment_input, 'environment')
+        return await self._run_and_poll(tool_run_input, 'tool', **poll_kwargs)
+
+    async def run_orchestrator_and_poll(self, orchestrator_run_input: OrchestratorRunInput, **poll_kwargs) -> OrchestratorRun:
+        """Run an orchestrator and poll for results until completion. See _run_and_poll for polling options."""
+        return await self._run_and_poll(orchestrator_run_input, 'orchestrator', **poll_kwargs)
+
+    async def run_environment_and_poll(self, environment_input: EnvironmentRunInput, **poll_kwargs) -> EnvironmentRun:
+        """Run an environment and poll for results until completion. See _run_and_poll for polling options."""
+        return await self._run_and_poll(environment_input, 'environment', **poll_kwargs)
     
-    async def run_kb_and_poll(self, kb_input: KBDeployment) -> KBDeployment:
-        """Run a knowledge base and poll for results until completion."""
-        return await self._run_and_poll(kb_input, 'kb')
+    async def run_kb_and_poll(self, kb_input: KBDeployment, **poll_kwargs) -> KBDeployment:
+        """Run a knowledge base and poll for results until completion. See _run_and_poll for polling options."""
+        return await self._run_and_poll(kb_input, 'kb', **poll_kwargs)
 
     async def check_user(self, user_input: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -358,16 +719,17 @@ class UserClient:
         """
         endpoint = self.node_url + "/user/check"
         try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-                headers = {
-                    'Content-Type': 'application/json', 
-                }
-                response = await client.post(
-                    endpoint, 
-                    json=user_input,
-                    headers=headers
-                )
-                response.raise_for_status()
+            headers = {
+                'Content-Type': 'application/json', 
+            }
+            response = await self._request(
+                "POST",
+                endpoint, 
+                json=user_input,
+                headers=headers,
+                idempotent=True
+            )
+            response.raise_for_status()
             return json.loads(response.text)
         except HTTPStatusError as e:
             logger.info(f"HTTP error occurred: {e}")
@@ -386,16 +748,16 @@ class UserClient:
         """
         endpoint = self.node_url + "/user/register"
         try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-                headers = {
-                    'Content-Type': 'application/json', 
-                }
-                response = await client.post(
-                    endpoint, 
-                    json=user_input,
-                    headers=headers
-                )
-                response.raise_for_status()
+            headers = {
+                'Content-Type': 'application/json', 
+            }
+            response = await self._request(
+                "POST",
+                endpoint, 
+                json=user_input,
+                headers=headers
+            )
+            response.raise_for_status()
             return json.loads(response.text)
         except HTTPStatusError as e:
             logger.info(f"HTTP error occurred: {e}")
@@ -435,34 +797,40 @@ class UserClient:
             run_input = input_class(**run_input)
 
         try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-                headers = {
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer {self.access_token}',
-                }
-                response = await client.post(
-                    endpoint,
-                    json=run_input.model_dict(),
-                    headers=headers
-                )
+            headers = {
+                'Content-Type': 'application/json',
+                'Authorization': f'Bearer {self.access_token}',
+                # The same key is sent on every retry, so the node starts the run at most once
+                'Idempotency-Key': str(uuid.uuid4()),
+            }
+            response = await self._request(
+                "POST",
+                endpoint,
+                json=run_input.model_dict(),
+                headers=headers,
+                idempotent=True
+            )
 
-                # Try to get error details even for error responses
-                if response.status_code >= 400:
+            # Try to get error details even for error responses
+            if response.status_code >= 400:
+                try:
                     error_detail = response.json() if response.text else str(response)
-                    logger.error(f"Server error response: {error_detail}")
-                    raise Exception(f"Server returned error response: {error_detail}")
+                except ValueError:
+                    error_detail = response.text
+                logger.error(f"Server error response: {error_detail}")
+                raise Exception(f"Server returned error response: {error_detail}")
                     
-                response.raise_for_status()
+            response.raise_for_status()
                 
-                # Convert response to appropriate return type
-                return_class = {
-                    'agent': AgentRun,
-                    'orchestrator': OrchestratorRun,
-                    'environment': EnvironmentRun,
-                    'kb': KBRun,
-                    'tool': ToolRun
-                }[module_type]
-                return return_class(**json.loads(response.text))
+            # Convert response to appropriate return type
+            return_class = {
+                'agent': AgentRun,
+                'orchestrator': OrchestratorRun,
+                'environment': EnvironmentRun,
+                'kb': KBRun,
+                'tool': ToolRun
+            }[module_type]
+            return return_class(**json.loads(response.text))
         except HTTPStatusError as e:
             logger.info(f"HTTP error occurred: {e}")
             raise
@@ -487,19 +855,20 @@ class UserClient:
         endpoint = f"{self.node_url}/inference/chat"
 
         try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-                headers = {
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer {self.access_token}',
-                }
-                response = await client.post(
-                    endpoint,
-                    json=inference_input.model_dump(),
-                    headers=headers
-                )
-                print("Response: ", response.text)
-                response.raise_for_status()
-                return ModelResponse(**json.loads(response.text))
+            headers = {
+                'Content-Type': 'application/json',
+                'Authorization': f'Bearer {self.access_token}',
+            }
+            response = await self._request(
+                "POST",
+                endpoint,
+                json=inference_input.model_dump(),
+                headers=headers,
+                hedge=True
+            )
+            print("Response: ", response.text)
+            response.raise_for_status()
+            return ModelResponse(**json.loads(response.text))
         except HTTPStatusError as e:
             logger.info(f"HTTP error occurred: {e}")
             raise
@@ -511,6 +880,42 @@ class UserClient:
             print(f"An unexpected error occurred: {e}")
             raise
 
+    async def run_inference_stream(self, inference_input: Union[ChatCompletionRequest, Dict]) -> AsyncIterator[ModelResponseChunk]:
+        """
+        Run inference on a node, yielding completion deltas as they are generated
+        
+        Args:
+            inference_input: The inference input to run inference on
+        """
+        if isinstance(inference_input, dict):
+            inference_input = ChatCompletionRequest(**inference_input)
+
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {self.access_token}',
+        }
+        self.circuit_breaker.before_call()
+        try:
+            async for chunk in stream_chat_completion(self.client, self.node_url, inference_input, headers):
+                yield chunk
+        except GeneratorExit:
+            # The caller stopped reading early; the node was answering fine
+            self.circuit_breaker.record_success()
+            raise
+        except Exception as e:
+            logger.info(f"Inference stream failed: {e}")
+            if is_transient_error(e):
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_release()
+            raise
+        except BaseException:
+            # Cancelled while waiting on the node: release a half-open trial so later calls get through
+            self.circuit_breaker.record_release()
+            raise
+        else:
+            self.circuit_breaker.record_success()
+
     async def run_agent(self, agent_run_input: AgentRunInput) -> AgentRun:
         """Run an agent on a node"""
         return await self._run_module(agent_run_input, 'agent')
@@ -543,12 +948,14 @@ class UserClient:
             module_type: Either 'agent', 'orchestrator', 'environment', 'tool' or 'kb'
         """
         try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-                response = await client.post(
-                    f"{self.node_url}/{module_type}/check", 
-                    json=module_run.model_dump()
-                )
-                response.raise_for_status()
+            response = await self._request(
+                "POST",
+                f"{self.node_url}/{module_type}/check", 
+                json=module_run.model_dump(),
+                idempotent=True,
+                hedge=True
+            )
+            response.raise_for_status()
             
             return_class = {
                 'agent': AgentRun,
@@ -563,6 +970,7 @@ class UserClient:
             raise  
         except Exception as e:
             logger.info(f"An unexpected error occurred: {e}")
+            raise
 
     # Update existing methods to use the new generic one
     async def check_agent_run(self, agent_run: AgentRun) -> AgentRun:
@@ -582,11 +990,11 @@ class UserClient:
 
     async def create_agent_run(self, agent_run_input: AgentRunInput) -> AgentRun:
         try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-                response = await client.post(
-                    f"{self.node_url}/monitor/create_agent_run", json=agent_run_input.model_dump()
-                )
-                response.raise_for_status()
+            response = await self._request(
+                "POST",
+                f"{self.node_url}/monitor/create_agent_run", json=agent_run_input.model_dump()
+            )
+            response.raise_for_status()
             return AgentRun(**json.loads(response.text))
         except HTTPStatusError as e:
             logger.info(f"HTTP error occurred: {e}")
@@ -594,14 +1002,15 @@ class UserClient:
         except Exception as e:
             logger.info(f"An unexpected error occurred: {e}")
             logger.info(f"Full traceback: {traceback.format_exc()}")
+            raise
 
     async def update_agent_run(self, agent_run: AgentRun):
         try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-                response = await client.post(
-                    f"{self.node_url}/monitor/update_agent_run", json=agent_run.model_dump()
-                )
-                response.raise_for_status()
+            response = await self._request(
+                "POST",
+                f"{self.node_url}/monitor/update_agent_run", json=agent_run.model_dump()
+            )
+            response.raise_for_status()
             return AgentRun(**json.loads(response.text))
         except HTTPStatusError as e:
             logger.info(f"HTTP error occurred: {e}")
@@ -610,47 +1019,48 @@ class UserClient:
             print(f"An unexpected error occurred: {e}")
             error_details = traceback.format_exc()
             print(f"Full traceback: {error_details}")
+            raise
 
     async def read_storage(self, agent_run_id: str, output_dir: str, ipfs: bool = False) -> str:
         print("Reading from storage...")
         try:
             endpoint = f"{self.node_url}/{'storage/read_ipfs' if ipfs else 'storage/read'}/{agent_run_id}"
 
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-                response = await client.get(endpoint)
-                response.raise_for_status()
-                storage = response.content  
-                print("Retrieved storage.")
+            response = await self._request("GET", endpoint, idempotent=True)
+            response.raise_for_status()
+            storage = response.content  
+            print("Retrieved storage.")
             
-                # Temporary file handling
-                temp_file_name = None
-                with tempfile.NamedTemporaryFile(delete=False, mode='wb') as tmp_file:
-                    tmp_file.write(storage)  # storage is a bytes-like object
-                    temp_file_name = tmp_file.name
+            # Temporary file handling
+            temp_file_name = None
+            with tempfile.NamedTemporaryFile(delete=False, mode='wb') as tmp_file:
+                tmp_file.write(storage)  # storage is a bytes-like object
+                temp_file_name = tmp_file.name
         
-                # Ensure output directory exists
-                output_path = Path(output_dir)
-                output_path.mkdir(parents=True, exist_ok=True)
+            # Ensure output directory exists
+            output_path = Path(output_dir)
+            output_path.mkdir(parents=True, exist_ok=True)
         
-                # Check if the file is a zip file and extract if true
-                if zipfile.is_zipfile(temp_file_name):
-                    with zipfile.ZipFile(temp_file_name, 'r') as zip_ref:
-                        zip_ref.extractall(output_path)
-                    print(f"Extracted storage to {output_dir}.")
-                else:
-                    shutil.copy(temp_file_name, output_path)
-                    print(f"Copied storage to {output_dir}.")
-
-                # Cleanup temporary file
-                Path(temp_file_name).unlink(missing_ok=True)
+            # Check if the file is a zip file and extract if true
+            if zipfile.is_zipfile(temp_file_name):
+                with zipfile.ZipFile(temp_file_name, 'r') as zip_ref:
+                    zip_ref.extractall(output_path)
+                print(f"Extracted storage to {output_dir}.")
+            else:
+                shutil.copy(temp_file_name, output_path)
+                print(f"Copied storage to {output_dir}.")
+
+            # Cleanup temporary file
+            Path(temp_file_name).unlink(missing_ok=True)
         
-                return output_dir         
+            return output_dir         
         except HTTPStatusError as e:
             logger.info(f"HTTP error occurred: {e}")
             raise  
         except Exception as e:
             logger.info(f"An unexpected error occurred: {e}")
             logger.info(f"Full traceback: {traceback.format_exc()}")
+            raise
 
     async def write_storage(self, storage_input: str, ipfs: bool = False, publish_to_ipns: bool = False, update_ipns_name: str = None) -> Dict[str, Any]:
         """Write storage to the node."""
@@ -666,15 +1076,15 @@ class UserClient:
                 "publish_to_ipns": publish_to_ipns,
                 "update_ipns_name": update_ipns_name
             }
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-                response = await client.post(
-                    endpoint, 
-                    files=file,
-                    data=data,
-                    timeout=600
-                )
-                response.raise_for_status()
-                return response.json()
+            response = await self._request(
+                "POST",
+                endpoint, 
+                files=file,
+                data=data,
+                timeout=600
+            )
+            response.raise_for_status()
+            return response.json()
         except HTTPStatusError as e:
             logger.info(f"HTTP error occurred: {e}")
             raise  
@@ -684,57 +1094,55 @@ class UserClient:
             return {}
 
     async def create_table(self, table_name: str, schema: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            response = await client.post(
-                f"{self.node_url}/local-db/create-table",
-                json={"table_name": table_name, "schema": schema}
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._request(
+            "POST",
+            f"{self.node_url}/local-db/create-table",
+            json={"table_name": table_name, "schema": schema}
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def add_row(self, table_name: str, data: Dict[str, Any], schema: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            response = await client.post(
-                f"{self.node_url}/local-db/add-row",
-                json={"table_name": table_name, "data": data, "schema": schema}
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._request(
+            "POST",
+            f"{self.node_url}/local-db/add-row",
+            json={"table_name": table_name, "data": data, "schema": schema}
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def update_row(self, table_name: str, data: Dict[str, Any], condition: Dict[str, Any], schema: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            response = await client.post(
-                f"{self.node_url}/local-db/update-row",
-                json={
-                    "table_name": table_name,
-                    "data": data,
-                    "condition": condition,
-                    "schema": schema
-                }
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._request(
+            "POST",
+            f"{self.node_url}/local-db/update-row",
+            json={
+                "table_name": table_name,
+                "data": data,
+                "condition": condition,
+                "schema": schema
+            }
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def delete_row(self, table_name: str, condition: Dict[str, Any]) -> Dict[str, Any]:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            response = await client.post(
-                f"{self.node_url}/local-db/delete-row",
-                json={"table_name": table_name, "condition": condition}
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._request(
+            "POST",
+            f"{self.node_url}/local-db/delete-row",
+            json={"table_name": table_name, "condition": condition}
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def list_tables(self) -> Dict[str, Any]:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            response = await client.get(f"{self.node_url}/local-db/tables")
-            response.raise_for_status()
-            return response.json()
+        response = await self._request("GET", f"{self.node_url}/local-db/tables", idempotent=True)
+        response.raise_for_status()
+        return response.json()
 
     async def get_table_schema(self, table_name: str) -> Dict[str, Any]:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            response = await client.get(f"{self.node_url}/local-db/table/{table_name}")
-            response.raise_for_status()
-            return response.json()
+        response = await self._request("GET", f"{self.node_url}/local-db/table/{table_name}", idempotent=True)
+        response.raise_for_status()
+        return response.json()
 
     async def query_table(self, table_name: str, columns: Optional[str] = None, condition: Optional[Union[str, Dict]] = None, order_by: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
         params = {"table_name": table_name}
@@ -747,13 +1155,14 @@ class UserClient:
         if limit:
             params["limit"] = limit
 
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            response = await client.get(
-                f"{self.node_url}/local-db/table/{table_name}/rows",
-                params=params
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._request(
+            "GET",
+            f"{self.node_url}/local-db/table/{table_name}/rows",
+            params=params,
+            idempotent=True
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def vector_search(
         self,
@@ -775,14 +1184,22 @@ class UserClient:
             "top_k": top_k,
             "include_similarity": include_similarity,
         }
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            response = await client.post(
-                f"{self.node_url}/local-db/vector_search",
-                json=payload
-            )
-            response.raise_for_status()
-            return response.json()
-
+        response = await self._request(
+            "POST",
+            f"{self.node_url}/local-db/vector_search",
+            json=payload,
+            idempotent=True
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+def poll_intervals(min_interval: float, max_interval: float, backoff: float = POLL_BACKOFF, jitter: float = POLL_JITTER) -> Iterator[float]:
+    """Yield exponentially growing, jittered wait times between min_interval and max_interval."""
+    interval = min_interval
+    while True:
+        yield min(max_interval, interval * random.uniform(1 - jitter, 1 + jitter))
+        interval = min(max_interval, interval * backoff)
 
 def zip_directory(file_path, zip_path):
     """Utility function to zip the content of a directory while preserving the folder structure."""
@@ -0,0 +1,167 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Dict, Iterator, Optional, Set, TypeVar
+
+import grpc
+import httpx
+
+from naptha_sdk.utils import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 0.2
+RETRY_MAX_BACKOFF = 5
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_GRPC_CODES = {grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED, grpc.StatusCode.RESOURCE_EXHAUSTED}
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 30
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the node's circuit breaker is open"""
+
+
+def is_transient_error(error: BaseException, retryable_status_codes: Set[int] = RETRYABLE_STATUS_CODES) -> bool:
+    """Whether an error is worth retrying: a network failure, timeout or overloaded/unavailable server."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in retryable_status_codes
+    if isinstance(error, grpc.aio.AioRpcError):
+        return error.code() in RETRYABLE_GRPC_CODES
+    return isinstance(error, (httpx.TransportError, ConnectionError, asyncio.TimeoutError))
+
+
+class RetryPolicy:
+    """How often and how long to wait before retrying a failed call.
+
+    Waits grow exponentially from backoff up to max_backoff with full jitter.
+    Only transient errors (see is_transient_error) are retried.
+    """
+
+    def __init__(
+        self,
+        attempts: int = RETRY_ATTEMPTS,
+        backoff: float = RETRY_BACKOFF,
+        max_backoff: float = RETRY_MAX_BACKOFF,
+        retryable_status_codes: Optional[Set[int]] = None,
+    ):
+        if attempts < 1:
+            raise ValueError("Retry attempts must be at least 1")
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retryable_status_codes = retryable_status_codes if retryable_status_codes is not None else RETRYABLE_STATUS_CODES
+
+    def is_retryable(self, error: BaseException) -> bool:
+        return is_transient_error(error, self.retryable_status_codes)
+
+    def delays(self) -> Iterator[float]:
+        """Yield the wait before each retry."""
+        for attempt in range(self.attempts - 1):
+            yield random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+NO_RETRY = RetryPolicy(attempts=1)
+
+
+class CircuitBreaker:
+    """Stop calling a node that keeps failing, and probe it again after a cool-down.
+
+    After failure_threshold consecutive transient failures the circuit opens and calls
+    fail fast with CircuitOpenError. Once reset_timeout has passed a single trial call
+    is let through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_in_flight):
+            raise CircuitOpenError(f"Circuit for {self.name} is open after {self.consecutive_failures} consecutive failures")
+        if state == "half_open":
+            self._trial_in_flight = True
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(f"Opening circuit for {self.name} after {self.consecutive_failures} consecutive failures")
+            self.opened_at = time.monotonic()
+
+    def record_release(self):
+        """Release a half-open trial that ended without saying anything about node health."""
+        self._trial_in_flight = False
+
+
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Get the process-wide circuit breaker for a node."""
+    if name not in _circuit_breakers:
+        _circuit_breakers[name] = CircuitBreaker(name)
+    return _circuit_breakers[name]
+
+
+async def call_with_resilience(
+    call: Callable[[], Awaitable[T]],
+    retry_policy: RetryPolicy = NO_RETRY,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    description: str = "call",
+) -> T:
+    """Run a call through a circuit breaker, retrying transient failures per the retry policy.
+
+    Each attempt invokes call() afresh. Errors that are not transient, such as a 4xx
+    response, are raised straight away and do not count against the circuit.
+    """
+    delays = retry_policy.delays()
+    while True:
+        if circuit_breaker is not None:
+            circuit_breaker.before_call()
+        try:
+            result = await call()
+        except Exception as e:
+            transient = retry_policy.is_retryable(e)
+            if circuit_breaker is not None:
+                if transient:
+                    circuit_breaker.record_failure()
+                else:
+                    circuit_breaker.record_release()
+            delay = next(delays, None) if transient else None
+            if delay is None:
+                raise
+            logger.info(f"{description} failed with {type(e).__name__}: {e}. Retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+        except BaseException:
+            # Cancelled, e.g. by a timeout around the call: says nothing about node health,
+            # but a half-open trial must be released or the circuit never closes again
+            if circuit_breaker is not None:
+                circuit_breaker.record_release()
+            raise
+        else:
+            if circuit_breaker is not None:
+                circuit_breaker.record_success()
+            return result
@@ -0,0 +1,122 @@
+import asyncio
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from naptha_sdk.utils import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """One upstream call and the number of callers waiting on it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _StreamFlight:
+    """One upstream stream, buffered so that every subscriber sees it from the start"""
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def publish(self):
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls into a single upstream call.
+
+    Callers that ask for a key while a call for it is in flight wait on that call
+    instead of starting their own, and all of them get its result or its error.
+    A key is forgotten as soon as its call finishes, so nothing is cached. If every
+    waiter is cancelled the upstream call is cancelled too.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._streams: Dict[str, _StreamFlight] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a call for key is in flight, so that do(key, ...) would join it."""
+        return key in self._flights
+
+    async def do(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Run call() for key, or join the call for key that is already in flight."""
+        flight = self._flights.get(key)
+        if flight is None:
+            self.calls += 1
+            flight = _Flight(asyncio.ensure_future(call()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(self._flights, key, flight))
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    async def stream(self, key: str, open_stream: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """Iterate open_stream() for key, or subscribe to the stream for key that is already in flight.
+
+        A subscriber that joins late first receives every item sent so far.
+        """
+        flight = self._streams.get(key)
+        if flight is None:
+            self.calls += 1
+            flight = _StreamFlight()
+            self._streams[key] = flight
+            flight.task = asyncio.ensure_future(self._pump(key, flight, open_stream))
+        else:
+            self.coalesced += 1
+        flight.subscribers += 1
+        try:
+            index = 0
+            while True:
+                while index < len(flight.items):
+                    yield flight.items[index]
+                    index += 1
+                if flight.done:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                await flight.changed.wait()
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    async def _pump(self, key: str, flight: _StreamFlight, open_stream: Callable[[], AsyncIterator[T]]):
+        try:
+            async with aclosing(open_stream()) as items:
+                async for item in items:
+                    flight.items.append(item)
+                    flight.publish()
+        except asyncio.CancelledError:
+            flight.error = ConnectionError("Shared stream was cancelled")
+            raise
+        except Exception as e:
+            flight.error = e
+        finally:
+            flight.done = True
+            self._forget(self._streams, key, flight)
+            flight.publish()
+
+    @staticmethod
+    def _forget(flights: Dict[str, Any], key: str, flight: Any):
+        if flights.get(key) is flight:
+            del flights[key]
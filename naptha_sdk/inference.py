@@ -1,48 +1,189 @@
+import asyncio
+import inspect
 import json
-from typing import Dict, Union
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 import httpx
 from httpx import HTTPStatusError, RemoteProtocolError
-from naptha_sdk.schemas import ChatCompletionRequest, NodeConfigUser, ModelResponse
-from naptha_sdk.utils import get_logger, node_to_url
+from naptha_sdk.cache import InferenceCache, request_cache_key
+from naptha_sdk.client.balancer import PortBalancer
+from naptha_sdk.client.hedging import HedgePolicy
+from naptha_sdk.client.limiter import PRIORITY_BATCH, PRIORITY_INTERACTIVE, AIMDLimiter, InferenceScheduler
+from naptha_sdk.client.resilience import RetryPolicy, call_with_resilience, is_transient_error
+from naptha_sdk.client.singleflight import SingleFlight
+from naptha_sdk.metrics import CONNECT_TIME, TIME_TO_FIRST_BYTE, TIME_TO_FIRST_TOKEN, TOKENS_PER_SECOND, TOTAL_LATENCY, MetricsRegistry, RequestTimer, \
+    inference_metrics
+from naptha_sdk.schemas import BatchInferenceResult, CascadeAttempt, CascadeResult, ChatCompletionRequest, ChoiceDelta, EmbeddingRequest, EmbeddingResponse, NodeConfig, NodeConfigUser, LLMConfig, ModelResponse, ModelResponseChunk, StreamChoices
+from naptha_sdk.utils import aiter_sse_data, get_logger, node_to_url
 
 logger = get_logger(__name__)
 HTTP_TIMEOUT = 300
+# Connection pool sizes, shared with UserClient
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+BATCH_RETRY_POLICY = RetryPolicy(attempts=5, backoff=0.5, max_backoff=30)
+EMBED_BATCH_SIZE = 64
+EMBED_MAX_BATCH_CHARS = 32000
+EMBED_CONCURRENCY = 4
+
+SSE_DONE = "[DONE]"
+
+
+async def aiter_chat_chunks(response: httpx.Response) -> AsyncIterator[ModelResponseChunk]:
+    """Parse a streaming chat completion response into chunks as the bytes arrive.
+
+    Server-sent events and newline-delimited JSON are both accepted. A node that
+    ignores stream=True and sends back a whole completion yields it as a single chunk.
+    """
+    content_type = response.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        completion = ModelResponse(**json.loads(await response.aread()))
+        yield ModelResponseChunk(
+            id=completion.id,
+            created=completion.created,
+            model=completion.model,
+            choices=[
+                StreamChoices(
+                    delta=ChoiceDelta(
+                        role=choice.message.role,
+                        content=choice.message.content,
+                        tool_calls=[tool_call.model_dump() for tool_call in choice.message.tool_calls] if choice.message.tool_calls else None,
+                    ),
+                    finish_reason=choice.finish_reason,
+                    index=choice.index,
+                )
+                for choice in completion.choices
+            ],
+            usage=completion.usage,
+        )
+        return
+
+    if content_type.startswith("text/event-stream"):
+        payloads = aiter_sse_data(response)
+    else:
+        payloads = (line.removeprefix("data:").strip() async for line in response.aiter_lines() if line.strip())
+    async for payload in payloads:
+        if payload.strip() == SSE_DONE:
+            break
+        yield ModelResponseChunk(**json.loads(payload))
+
+
+async def stream_chat_completion(
+    client: httpx.AsyncClient,
+    node_url: str,
+    inference_input: ChatCompletionRequest,
+    headers: Dict[str, str],
+    extensions: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[ModelResponseChunk]:
+    """POST a chat completion with stream=True to a node and yield its chunks"""
+    inference_input = inference_input.model_copy(update={"stream": True})
+    async with client.stream("POST", f"{node_url}/inference/chat", json=inference_input.model_dump(), headers=headers, extensions=extensions) as response:
+        if response.is_error:
+            await response.aread()
+            response.raise_for_status()
+        async for chunk in aiter_chat_chunks(response):
+            yield chunk
+
+
+def embedding_batches(texts: Sequence[str], batch_size: int, max_batch_chars: int) -> Iterable[Sequence[str]]:
+    """Split texts into consecutive batches of at most batch_size texts and max_batch_chars characters.
+
+    A single text longer than max_batch_chars gets a batch of its own.
+    """
+    start = 0
+    chars = 0
+    for end, text in enumerate(texts):
+        if end > start and (end - start >= batch_size or chars + len(text) > max_batch_chars):
+            yield texts[start:end]
+            start = end
+            chars = 0
+        chars += len(text)
+    if start < len(texts):
+        yield texts[start:]
 
 
 class InferenceClient:
-    def __init__(self, node: NodeConfigUser):
+    def __init__(
+        self,
+        node: NodeConfigUser,
+        hedge_policy: Optional[HedgePolicy] = None,
+        hedge_nodes: Optional[List[NodeConfigUser]] = None,
+        cache: Optional[InferenceCache] = None,
+        coalesce: bool = False,
+        scheduler: Optional[InferenceScheduler] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
         self.node = node
         self.node_url = node_to_url(node)
+        # Hedging is opt-in: pass a HedgePolicy to duplicate slow inference calls
+        self.hedge_policy = hedge_policy
+        self.hedge_urls = [node_to_url(hedge_node) for hedge_node in hedge_nodes or []]
+        # Caching is opt-in and only applies to deterministic requests, see InferenceCache
+        self.cache = cache
+        # With coalesce=True identical requests in flight at the same time share one call to the node
+        self.single_flight = SingleFlight() if coalesce else None
+        # A scheduler holds requests back until they fit the model's rate budgets
+        self.scheduler = scheduler
+        # Timings are recorded per model and node in the shared inference_metrics unless another registry is given
+        self.metrics = metrics if metrics is not None else inference_metrics
+        self._client = None
         
         self.access_token = None
         logger.info(f"Node URL: {self.node_url}")
 
-    async def run_inference(self, inference_input: Union[ChatCompletionRequest, Dict]) -> Dict:
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client shared by every inference call, recreated lazily if closed"""
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS)
+            self._client = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=limits)
+        return self._client
+
+    async def aclose(self):
+        """Close the pooled HTTP client and release its connections."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def run_inference(self, inference_input: Union[ChatCompletionRequest, Dict], priority: Optional[int] = PRIORITY_INTERACTIVE) -> ModelResponse:
         """
         Run inference on a node
         
         Args:
             inference_input: The inference input to run inference on
+            priority: Queue priority when a scheduler is set, lower runs first. None skips the scheduler
         """
+        response, _ = await self._run_inference(inference_input, priority)
+        return response
+
+    async def _run_inference(self, inference_input: Union[ChatCompletionRequest, Dict], priority: Optional[int]) -> Tuple[ModelResponse, bool]:
+        """Run inference and also return whether this call sent its own request to the node,
+        rather than being served from the cache or joining an identical request in flight."""
         if isinstance(inference_input, dict):
             inference_input = ChatCompletionRequest(**inference_input)
 
-        endpoint = f"{self.node_url}/inference/chat"
+        cacheable = self.cache is not None and self.cache.is_cacheable(inference_input)
+        if cacheable:
+            cached = await self.cache.get(inference_input)
+            if cached is not None:
+                return cached, False
 
         try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-                headers = {
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer {self.access_token}',
-                }
-                response = await client.post(
-                    endpoint,
-                    json=inference_input.model_dump(),
-                    headers=headers
-                )
-                print("Response: ", response.text)
-                response.raise_for_status()
-                return ModelResponse(**json.loads(response.text))
+            if self.single_flight is None:
+                return await self._fetch_inference(inference_input, cacheable, priority), True
+            key = request_cache_key(inference_input)
+            leader = not self.single_flight.in_flight(key)
+            response = await self.single_flight.do(
+                key,
+                lambda: self._fetch_inference(inference_input, cacheable, priority)
+            )
+            return response.model_copy(deep=True), leader
         except HTTPStatusError as e:
             logger.info(f"HTTP error occurred: {e}")
             raise
@@ -52,4 +193,463 @@ class InferenceClient:
             raise
         except Exception as e:
             print(f"An unexpected error occurred: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    async def _fetch_inference(self, inference_input: ChatCompletionRequest, cacheable: bool, priority: Optional[int]) -> ModelResponse:
+        if self.scheduler is not None and priority is not None:
+            await self.scheduler.schedule(inference_input, priority)
+
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {self.access_token}',
+        }
+
+        async def send(node_url: str) -> ModelResponse:
+            timer = RequestTimer()
+            response = await self.client.post(
+                f"{node_url}/inference/chat",
+                json=inference_input.model_dump(),
+                headers=headers,
+                extensions={"trace": timer}
+            )
+            response.raise_for_status()
+            print("Response: ", response.text)
+            model_response = ModelResponse(**json.loads(response.text))
+            completion_tokens = model_response.usage.completion_tokens if model_response.usage else None
+            self._record_metrics(inference_input.model, node_url, timer, completion_tokens)
+            return model_response
+
+        if self.hedge_policy is not None:
+            hedge_url = self.hedge_urls[self.hedge_policy.calls % len(self.hedge_urls)] if self.hedge_urls else self.node_url
+            model_response = await self.hedge_policy.run([lambda: send(self.node_url), lambda: send(hedge_url)])
+        else:
+            model_response = await send(self.node_url)
+        if cacheable:
+            await self.cache.set(inference_input, model_response)
+        return model_response
+
+    async def run_inference_stream(self, inference_input: Union[ChatCompletionRequest, Dict], priority: Optional[int] = PRIORITY_INTERACTIVE) -> AsyncIterator[ModelResponseChunk]:
+        """
+        Run inference on a node, yielding completion deltas as they are generated
+        
+        Args:
+            inference_input: The inference input to run inference on
+            priority: Queue priority when a scheduler is set, lower runs first. None skips the scheduler
+        """
+        if isinstance(inference_input, dict):
+            inference_input = ChatCompletionRequest(**inference_input)
+
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {self.access_token}',
+        }
+        async def open_stream() -> AsyncIterator[ModelResponseChunk]:
+            if self.scheduler is not None and priority is not None:
+                await self.scheduler.schedule(inference_input, priority)
+            timer = RequestTimer()
+            first_token_time = None
+            content_chunks = 0
+            usage = None
+            async for chunk in stream_chat_completion(self.client, self.node_url, inference_input, headers, extensions={"trace": timer}):
+                if any(choice.delta.content for choice in chunk.choices):
+                    content_chunks += 1
+                    if first_token_time is None:
+                        first_token_time = timer.elapsed()
+                usage = chunk.usage or usage
+                yield chunk
+            # Without usage from the node, each content chunk is counted as one token
+            completion_tokens = usage.completion_tokens if usage else content_chunks
+            self._record_metrics(inference_input.model, self.node_url, timer, completion_tokens, first_token_time)
+
+        try:
+            if self.single_flight is None:
+                async for chunk in open_stream():
+                    yield chunk
+            else:
+                async for chunk in self.single_flight.stream(request_cache_key(inference_input), open_stream):
+                    yield chunk.model_copy(deep=True)
+        except HTTPStatusError as e:
+            logger.info(f"HTTP error occurred: {e}")
+            raise
+        except RemoteProtocolError as e:
+            error_msg = f"Inference failed to connect to the server at {self.node_url}. Please check if the server URL is correct and the server is running. Error details: {str(e)}"
+            logger.error(error_msg)
+            raise
+
+    async def embed(
+        self,
+        texts: Union[str, Sequence[str]],
+        model: str,
+        batch_size: int = EMBED_BATCH_SIZE,
+        max_batch_chars: int = EMBED_MAX_BATCH_CHARS,
+        concurrency: int = EMBED_CONCURRENCY,
+        dimensions: Optional[int] = None,
+    ):
+        """
+        Embed any number of texts, returning a contiguous float32 NumPy array with one row per text
+        
+        Texts are split into batches of at most batch_size texts and max_batch_chars characters,
+        and up to `concurrency` batches are sent at once. Batches that fail with a transient
+        error are retried.
+
+        Args:
+            texts: The texts to embed
+            model: The embedding model to use
+            batch_size: The most texts to send in one request
+            max_batch_chars: The most characters to send in one request
+            concurrency: The most requests in flight at once
+            dimensions: The embedding size to ask for, for models that support shortening
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError("InferenceClient.embed requires numpy. Install it with `pip install naptha-sdk[embeddings]`.") from e
+
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        batches = list(embedding_batches(texts, batch_size, max_batch_chars))
+        if not batches:
+            return np.empty((0, dimensions or 0), dtype=np.float32)
+
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {self.access_token}',
+        }
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def embed_batch(batch: Sequence[str]):
+            async def send() -> EmbeddingResponse:
+                response = await self.client.post(
+                    f"{self.node_url}/inference/embeddings",
+                    json=EmbeddingRequest(model=model, input=list(batch), dimensions=dimensions).model_dump(exclude_none=True),
+                    headers=headers
+                )
+                response.raise_for_status()
+                return EmbeddingResponse(**response.json())
+
+            async with semaphore:
+                embedding_response = await call_with_resilience(send, BATCH_RETRY_POLICY, description="Embedding batch")
+            if len(embedding_response.data) != len(batch):
+                raise ValueError(f"Node returned {len(embedding_response.data)} embeddings for a batch of {len(batch)} texts")
+            rows = sorted(embedding_response.data, key=lambda row: row.index)
+            return np.asarray([row.embedding for row in rows], dtype=np.float32)
+
+        arrays = await asyncio.gather(*[embed_batch(batch) for batch in batches])
+        return np.ascontiguousarray(np.concatenate(arrays))
+
+    def _record_metrics(self, model: str, node_url: str, timer: RequestTimer, completion_tokens: Optional[int], first_token_time: Optional[float] = None):
+        latency = timer.elapsed()
+        labels = {"model": model, "node": node_url}
+        if timer.connect_time is not None:
+            self.metrics.observe(CONNECT_TIME, timer.connect_time, **labels)
+        if timer.first_byte_time is not None:
+            self.metrics.observe(TIME_TO_FIRST_BYTE, timer.first_byte_time, **labels)
+        if first_token_time is not None:
+            self.metrics.observe(TIME_TO_FIRST_TOKEN, first_token_time, **labels)
+        self.metrics.observe(TOTAL_LATENCY, latency, **labels)
+        # Streams are timed from the first token, so the rate reflects generation rather than queueing and prefill
+        generation_time = latency - first_token_time if first_token_time is not None else latency
+        if completion_tokens and generation_time > 0:
+            self.metrics.observe(TOKENS_PER_SECOND, completion_tokens / generation_time, **labels)
+
+    async def run_batch(
+        self,
+        inference_inputs: Iterable[Union[ChatCompletionRequest, Dict]],
+        limiter: Optional[AIMDLimiter] = None,
+        retry_policy: RetryPolicy = BATCH_RETRY_POLICY,
+        priority: int = PRIORITY_BATCH,
+    ) -> List[BatchInferenceResult]:
+        """
+        Run many inference requests concurrently and return their results in input order
+        
+        Concurrency adapts to the node through an AIMD limiter: it grows while calls succeed
+        quickly and halves on 429/5xx responses, timeouts or rising latency. Overloaded calls
+        are retried per retry_policy without holding a slot while they back off. A request
+        that still fails is reported as an errored BatchInferenceResult and does not stop
+        the rest of the batch.
+
+        Args:
+            inference_inputs: The inference inputs to run, consumed lazily
+            limiter: The concurrency limiter to use, shared across batches to keep what it has learned
+            retry_policy: How to retry requests that fail with a transient error
+            priority: Queue priority when a scheduler is set, batch priority by default so interactive calls go first
+        """
+        limiter = limiter if limiter is not None else AIMDLimiter()
+        results: List[Optional[BatchInferenceResult]] = []
+
+        async def admit(inference_input: ChatCompletionRequest) -> float:
+            # Wait for the rate budget before taking a slot, so time spent queueing is not read as node latency
+            if self.scheduler is not None:
+                await self.scheduler.schedule(inference_input, priority)
+            return await limiter.acquire()
+
+        async def run_one(index: int, inference_input: ChatCompletionRequest, start: float):
+            delays = retry_policy.delays()
+            while True:
+                try:
+                    response, reached_node = await self._run_inference(inference_input, priority=None)
+                except asyncio.CancelledError:
+                    limiter.release()
+                    raise
+                except Exception as e:
+                    transient = retry_policy.is_retryable(e)
+                    if transient:
+                        limiter.record_overload(start)
+                    else:
+                        limiter.release()
+                    delay = next(delays, None) if transient else None
+                    if delay is None:
+                        logger.error(f"Inference request {index} failed: {e}")
+                        results[index] = BatchInferenceResult(index=index, error=True, error_message=f"{type(e).__name__}: {e}")
+                        return
+                    await asyncio.sleep(delay)
+                    start = await admit(inference_input)
+                else:
+                    if reached_node:
+                        limiter.record_success(start)
+                    else:
+                        # Cache hits and coalesced calls say nothing about the node's latency
+                        limiter.release()
+                    results[index] = BatchInferenceResult(index=index, response=response)
+                    return
+
+        in_flight = set()
+        try:
+            for index, inference_input in enumerate(inference_inputs):
+                if isinstance(inference_input, dict):
+                    inference_input = ChatCompletionRequest(**inference_input)
+                results.append(None)
+                start = await admit(inference_input)
+                task = asyncio.create_task(run_one(index, inference_input, start))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            await asyncio.gather(*in_flight)
+        finally:
+            for task in in_flight:
+                task.cancel()
+        return results
+
+
+class InferenceRouter:
+    """Send each inference request to one of a pool of nodes that serves its model.
+
+    Among the nodes listing request.model in NodeConfig.models, the one with the
+    lowest expected wait is picked, based on its in-flight requests and recent latency.
+    A node that fails with a transient error (connection failure, 429 or 5xx) is
+    counted against and the request fails over to the next node. Nodes that keep
+    failing are ejected for a while. Streams only fail over before their first chunk.
+
+    Args:
+        nodes: The nodes to route between
+        client_kwargs: Passed to the InferenceClient of every node, e.g. cache or scheduler
+    """
+
+    def __init__(self, nodes: List[NodeConfig], **client_kwargs: Any):
+        if len(nodes) == 0:
+            raise ValueError("No nodes to route inference to")
+        self.nodes = list(nodes)
+        self.clients = [InferenceClient(node, **client_kwargs) for node in self.nodes]
+        # The balancer tracks nodes by their index in self.nodes
+        self.balancer = PortBalancer(list(range(len(self.nodes))))
+
+    @classmethod
+    async def from_hub(cls, hub, **client_kwargs: Any) -> "InferenceRouter":
+        """Create a router over every node registered on a signed-in Hub"""
+        nodes = []
+        for node in await hub.list_nodes():
+            try:
+                nodes.append(NodeConfig(**{"ports": [], **node}))
+            except Exception as e:
+                logger.warning(f"Skipping node {node.get('id')} that could not be parsed: {e}")
+        return cls(nodes, **client_kwargs)
+
+    @property
+    def scheduler(self) -> Optional[InferenceScheduler]:
+        """The scheduler passed in client_kwargs, shared by the client of every node"""
+        return self.clients[0].scheduler
+
+    @property
+    def models(self) -> List[str]:
+        return sorted({model for node in self.nodes for model in node.models})
+
+    def nodes_for_model(self, model: str) -> List[int]:
+        candidates = [index for index, node in enumerate(self.nodes) if model in node.models]
+        if not candidates:
+            raise ValueError(f"No node serves model {model}. Available models: {self.models}")
+        return candidates
+
+    def _record(self, index: int, start: float, error: Optional[BaseException] = None):
+        if error is None:
+            self.balancer.record_success(index, time.monotonic() - start)
+        elif is_transient_error(error):
+            self.balancer.record_failure(index)
+
+    async def run_inference(self, inference_input: Union[ChatCompletionRequest, Dict], priority: Optional[int] = PRIORITY_INTERACTIVE) -> ModelResponse:
+        """
+        Run inference on the best node serving the requested model, failing over to the others
+        
+        Args:
+            inference_input: The inference input to run inference on
+            priority: Queue priority when a scheduler is set, lower runs first. None skips the scheduler
+        """
+        if isinstance(inference_input, dict):
+            inference_input = ChatCompletionRequest(**inference_input)
+
+        remaining = self.nodes_for_model(inference_input.model)
+        while True:
+            index = self.balancer.pick(remaining)
+            remaining = [candidate for candidate in remaining if candidate != index]
+            stats = self.balancer.stats[index]
+            stats.outstanding += 1
+            start = time.monotonic()
+            try:
+                response = await self.clients[index].run_inference(inference_input, priority)
+            except Exception as e:
+                self._record(index, start, e)
+                if not is_transient_error(e) or not remaining:
+                    raise
+                logger.warning(f"Inference on {self.clients[index].node_url} failed with {type(e).__name__}, failing over")
+            else:
+                self._record(index, start)
+                return response
+            finally:
+                stats.outstanding -= 1
+
+    async def run_inference_stream(self, inference_input: Union[ChatCompletionRequest, Dict], priority: Optional[int] = PRIORITY_INTERACTIVE) -> AsyncIterator[ModelResponseChunk]:
+        """
+        Stream inference from the best node serving the requested model, failing over until the first chunk arrives
+        
+        Args:
+            inference_input: The inference input to run inference on
+            priority: Queue priority when a scheduler is set, lower runs first. None skips the scheduler
+        """
+        if isinstance(inference_input, dict):
+            inference_input = ChatCompletionRequest(**inference_input)
+
+        remaining = self.nodes_for_model(inference_input.model)
+        while True:
+            index = self.balancer.pick(remaining)
+            remaining = [candidate for candidate in remaining if candidate != index]
+            stats = self.balancer.stats[index]
+            stats.outstanding += 1
+            start = time.monotonic()
+            started = False
+            try:
+                async for chunk in self.clients[index].run_inference_stream(inference_input, priority):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                self._record(index, start, e)
+                if started or not is_transient_error(e) or not remaining:
+                    raise
+                logger.warning(f"Inference stream on {self.clients[index].node_url} failed with {type(e).__name__}, failing over")
+            else:
+                self._record(index, start)
+                return
+            finally:
+                stats.outstanding -= 1
+
+    async def aclose(self):
+        """Close the pooled HTTP clients of every node."""
+        await asyncio.gather(*[client.aclose() for client in self.clients])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+
+class InferenceCascade:
+    """Try an ordered list of models, escalating from cheap and fast to large only when needed.
+
+    Each tier is an LLMConfig whose model, and max_tokens and temperature if set, override
+    the request. A tier's answer is used unless the validator rejects it, the call takes
+    longer than latency_budget seconds, or it fails; then the next tier is tried. The last
+    tier has no latency budget, and its answer is returned even if the validator rejects it.
+    Every result records which tier answered, and answered_by counts answers per tier.
+    If the client has a scheduler, each tier waits for its rate budget before the latency
+    budget starts, so time spent queueing is not taken for a slow model.
+
+    Args:
+        inference_client: The client or router to run inference with
+        tiers: The model configs to try, cheapest first
+        validator: Called with each response, returning (or resolving to) whether to accept it
+        latency_budget: Seconds to wait for the model call of each tier but the last before escalating
+    """
+
+    def __init__(
+        self,
+        inference_client: Union[InferenceClient, InferenceRouter],
+        tiers: List[LLMConfig],
+        validator: Optional[Callable[[ModelResponse], Union[bool, Awaitable[bool]]]] = None,
+        latency_budget: Optional[float] = None,
+    ):
+        if len(tiers) == 0:
+            raise ValueError("A cascade needs at least one tier")
+        if any(tier.model is None for tier in tiers):
+            raise ValueError("Every cascade tier needs a model")
+        self.inference_client = inference_client
+        self.tiers = tiers
+        self.validator = validator
+        self.latency_budget = latency_budget
+        self.answered_by = [0] * len(tiers)
+
+    def tier_request(self, request: ChatCompletionRequest, tier: LLMConfig) -> ChatCompletionRequest:
+        update = {"model": tier.model}
+        if tier.max_tokens is not None:
+            update["max_tokens"] = tier.max_tokens
+        if tier.temperature is not None:
+            update["temperature"] = tier.temperature
+        return request.model_copy(update=update)
+
+    async def _accepts(self, response: ModelResponse) -> bool:
+        if self.validator is None:
+            return True
+        accepted = self.validator(response)
+        if inspect.isawaitable(accepted):
+            accepted = await accepted
+        return bool(accepted)
+
+    async def run_inference(self, inference_input: Union[ChatCompletionRequest, Dict], priority: Optional[int] = PRIORITY_INTERACTIVE) -> CascadeResult:
+        """
+        Run inference through the cascade
+        
+        Args:
+            inference_input: The inference input to run inference on; its model is replaced by each tier's
+            priority: Queue priority when a scheduler is set, lower runs first. None skips the scheduler
+        """
+        if isinstance(inference_input, dict):
+            inference_input = ChatCompletionRequest(**inference_input)
+
+        scheduler = getattr(self.inference_client, "scheduler", None)
+        attempts = []
+        for index, tier in enumerate(self.tiers):
+            last = index == len(self.tiers) - 1
+            budget = None if last else self.latency_budget
+            request = self.tier_request(inference_input, tier)
+            call_priority = priority
+            if scheduler is not None and priority is not None:
+                await scheduler.schedule(request, priority)
+                call_priority = None
+            start = time.monotonic()
+            try:
+                response = await asyncio.wait_for(self.inference_client.run_inference(request, call_priority), budget)
+            except asyncio.TimeoutError:
+                attempts.append(CascadeAttempt(tier=index, model=tier.model, outcome="timeout", latency=time.monotonic() - start))
+                if last:
+                    raise
+                logger.info(f"Cascade tier {index} ({tier.model}) exceeded {budget}s, escalating")
+                continue
+            except Exception as e:
+                attempts.append(CascadeAttempt(tier=index, model=tier.model, outcome="error", latency=time.monotonic() - start, error_message=str(e)))
+                if last:
+                    raise
+                logger.info(f"Cascade tier {index} ({tier.model}) failed with {type(e).__name__}, escalating")
+                continue
+
+            accepted = await self._accepts(response)
+            attempts.append(CascadeAttempt(tier=index, model=tier.model, outcome="accepted" if accepted else "rejected", latency=time.monotonic() - start))
+            if accepted or last:
+                self.answered_by[index] += 1
+                return CascadeResult(response=response, tier=index, model=tier.model, accepted=accepted, attempts=attempts)
+            logger.info(f"Cascade tier {index} ({tier.model}) answer was rejected, escalating")
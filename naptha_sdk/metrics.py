@@ -0,0 +1,150 @@
+import asyncio
+import bisect
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from naptha_sdk.utils import get_logger
+
+logger = get_logger(__name__)
+
+# Upper bounds of the latency buckets in seconds, doubling from 5ms to about 5 minutes
+LATENCY_BUCKETS = [0.005 * 2 ** i for i in range(17)]
+# Upper bounds of the throughput buckets in tokens per second
+THROUGHPUT_BUCKETS = [1, 2, 5, 10, 20, 35, 50, 75, 100, 150, 200, 300, 500, 1000, 2000]
+METRICS_DUMP_INTERVAL = 60
+
+CONNECT_TIME = "connect_seconds"
+TIME_TO_FIRST_BYTE = "time_to_first_byte_seconds"
+TIME_TO_FIRST_TOKEN = "time_to_first_token_seconds"
+TOTAL_LATENCY = "latency_seconds"
+TOKENS_PER_SECOND = "completion_tokens_per_second"
+
+METRIC_BUCKETS = {TOKENS_PER_SECOND: THROUGHPUT_BUCKETS}
+
+
+class Histogram:
+    """Counts of observed values in fixed buckets, with percentiles estimated from the buckets"""
+
+    def __init__(self, buckets: List[float]):
+        self.bounds = sorted(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile, capped by the largest value seen."""
+        if self.count == 0:
+            return None
+        rank = self.count * percentile / 100
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": {str(bound): count for bound, count in zip(self.bounds + ["+Inf"], self.counts)},
+        }
+
+
+class MetricsRegistry:
+    """In-process histograms keyed by metric name and labels such as model and node"""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._dump_task: Optional[asyncio.Task] = None
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(METRIC_BUCKETS.get(name, LATENCY_BUCKETS))
+        histogram.observe(value)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Current state of every histogram, one entry per metric name and label set."""
+        return [
+            {"name": name, "labels": dict(labels), **histogram.snapshot()}
+            for (name, labels), histogram in sorted(self._histograms.items())
+        ]
+
+    def reset(self):
+        self._histograms.clear()
+
+    def dump(self, path: Union[str, Path]):
+        """Write a snapshot to a JSON file, replacing it atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps({"timestamp": time.time(), "metrics": self.snapshot()}, indent=2))
+        tmp_path.replace(path)
+
+    def start_periodic_dump(self, path: Union[str, Path], interval: float = METRICS_DUMP_INTERVAL) -> asyncio.Task:
+        """Dump a snapshot to path every interval seconds in the background until stop_periodic_dump."""
+        if self._dump_task is None or self._dump_task.done():
+            async def run():
+                while True:
+                    await asyncio.sleep(interval)
+                    try:
+                        await asyncio.to_thread(self.dump, path)
+                    except OSError as e:
+                        logger.warning(f"Failed to dump metrics to {path}: {e}")
+
+            self._dump_task = asyncio.create_task(run())
+        return self._dump_task
+
+    async def stop_periodic_dump(self):
+        if self._dump_task is not None:
+            self._dump_task.cancel()
+            await asyncio.gather(self._dump_task, return_exceptions=True)
+            self._dump_task = None
+
+
+class RequestTimer:
+    """Timings of one HTTP request, collected through the httpx trace extension.
+
+    Pass extensions={"trace": timer} on the request. Connect time is only known when
+    the request opened a new connection rather than reusing a pooled one.
+    """
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.connect_started: Optional[float] = None
+        self.connect_time: Optional[float] = None
+        self.first_byte_time: Optional[float] = None
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]):
+        now = time.monotonic()
+        if event_name == "connection.connect_tcp.started":
+            self.connect_started = now
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete") and self.connect_started is not None:
+            self.connect_time = now - self.connect_started
+        elif event_name.endswith("receive_response_headers.complete") and self.first_byte_time is None:
+            self.first_byte_time = now - self.start
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+
+inference_metrics = MetricsRegistry()
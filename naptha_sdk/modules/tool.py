@@ -1,12 +1,16 @@
+import asyncio
 from naptha_sdk.client.node import NodeClient
-from naptha_sdk.schemas import AgentRun, ToolRunInput
+from naptha_sdk.inference import InferenceClient, InferenceRouter
+from naptha_sdk.schemas import AgentRun, ChatCompletionRequest, ChatMessage, ModelResponse, ToolCall, ToolDeployment, ToolRun, ToolRunInput
 from naptha_sdk.utils import get_logger
-from typing import Union
+from typing import AsyncIterator, Dict, List, Optional, Union
 from dotenv import load_dotenv
 import os
 
 logger = get_logger(__name__)
 load_dotenv(override=True)
+MAX_TOOL_ROUNDS = 5
+
 class Tool:
     def __init__(self, 
         tool_deployment,
@@ -19,4 +23,120 @@ class Tool:
     async def call_tool_func(self, module_run: Union[AgentRun, ToolRunInput]):
         logger.info(f"Running tool on worker node {self.tool_node}")
         tool_run = await self.tool_node.run_module(module_type="tool", run_input=module_run.model_dict())
-        return tool_run
\ No newline at end of file
+        return tool_run
+
+    async def call_tool_func_stream(self, module_run: Union[AgentRun, ToolRunInput]) -> AsyncIterator[ToolRun]:
+        """Run the tool and yield each update of the tool run, including partial results, as it arrives"""
+        logger.info(f"Streaming tool run on worker node {self.tool_node}")
+        async for tool_run in self.tool_node.run_module_stream(module_type="tool", run_input=module_run.model_dict()):
+            yield tool_run
+
+async def run_tool_call(
+    tool_call: ToolCall,
+    tool_deployments: Dict[str, ToolDeployment],
+    consumer_id: str,
+    signature: str,
+    agent_run: Optional[AgentRun] = None,
+) -> ChatMessage:
+    """
+    Run one tool call returned by a model on the tool deployment registered for its function name
+
+    Failures are returned as the content of the tool message rather than raised, so the model
+    can see what went wrong and react in its next turn.
+
+    Args:
+        tool_call: The tool call from the model response
+        tool_deployments: Tool deployments keyed by the function name the model calls
+        consumer_id: The consumer running the tools
+        signature: The consumer's signature
+        agent_run: The agent run the tool calls belong to, if any
+    """
+    name = tool_call.function.name
+    tool_deployment = tool_deployments.get(name)
+    if tool_deployment is None:
+        content = f"Error: unknown tool {name}"
+    else:
+        try:
+            # Tools take tool_input_data as a string, so the model's JSON arguments are passed through as is
+            tool_run_input = ToolRunInput(
+                consumer_id=consumer_id,
+                inputs={"tool_name": name, "tool_input_data": tool_call.function.arguments},
+                deployment=tool_deployment,
+                agent_run=agent_run,
+                signature=signature,
+            )
+            tool_run = await Tool(tool_deployment).call_tool_func(tool_run_input)
+            if tool_run.error:
+                content = f"Error: {tool_run.error_message}"
+            else:
+                content = "\n".join(tool_run.results)
+        except Exception as e:
+            logger.error(f"Tool call {tool_call.id} to {name} failed: {e}")
+            content = f"Error: {type(e).__name__}: {e}"
+    return ChatMessage(role="tool", content=content, tool_call_id=tool_call.id, name=name)
+
+async def run_tool_calls(
+    model_response: ModelResponse,
+    tool_deployments: Dict[str, ToolDeployment],
+    consumer_id: str,
+    signature: str,
+    agent_run: Optional[AgentRun] = None,
+) -> List[ChatMessage]:
+    """
+    Run every tool call in a model response concurrently
+
+    A turn with several tool calls takes as long as the slowest tool instead of the sum of all of them.
+    Returns one tool message per call, in the order the model made the calls.
+
+    Args:
+        model_response: The model response containing tool calls in its first choice
+        tool_deployments: Tool deployments keyed by the function name the model calls
+        consumer_id: The consumer running the tools
+        signature: The consumer's signature
+        agent_run: The agent run the tool calls belong to, if any
+    """
+    tool_calls = model_response.choices[0].message.tool_calls or []
+    return list(await asyncio.gather(*[
+        run_tool_call(tool_call, tool_deployments, consumer_id, signature, agent_run)
+        for tool_call in tool_calls
+    ]))
+
+def add_tool_results(
+    request: ChatCompletionRequest,
+    model_response: ModelResponse,
+    tool_messages: List[ChatMessage],
+) -> ChatCompletionRequest:
+    """Build the follow-up request: the conversation so far, the model's tool calls and their results"""
+    return request.model_copy(update={"messages": [*request.messages, model_response.choices[0].message, *tool_messages]})
+
+async def run_inference_with_tools(
+    inference_client: Union[InferenceClient, InferenceRouter],
+    request: Union[ChatCompletionRequest, Dict],
+    tool_deployments: Dict[str, ToolDeployment],
+    consumer_id: str,
+    signature: str,
+    agent_run: Optional[AgentRun] = None,
+    max_rounds: int = MAX_TOOL_ROUNDS,
+) -> ModelResponse:
+    """
+    Run inference, executing the tool calls of each turn concurrently and feeding their results back until the model answers
+
+    Args:
+        inference_client: The client or router to run inference with
+        request: The chat completion request, with tools set
+        tool_deployments: Tool deployments keyed by the function name the model calls
+        consumer_id: The consumer running the tools
+        signature: The consumer's signature
+        agent_run: The agent run the tool calls belong to, if any
+        max_rounds: The most rounds of tool calls to run before returning the last response as is
+    """
+    if isinstance(request, dict):
+        request = ChatCompletionRequest(**request)
+    model_response = await inference_client.run_inference(request)
+    for _ in range(max_rounds):
+        if not model_response.choices or not model_response.choices[0].message.tool_calls:
+            break
+        tool_messages = await run_tool_calls(model_response, tool_deployments, consumer_id, signature, agent_run)
+        request = add_tool_results(request, model_response, tool_messages)
+        model_response = await inference_client.run_inference(request)
+    return model_response
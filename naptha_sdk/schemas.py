@@ -49,6 +49,10 @@ class LLMConfig(BaseModel):
     temperature: Optional[float] = None
     api_base: Optional[str] = None
 
+class RateLimits(BaseModel):
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+
 class AgentModuleType(str, Enum):
     package = "package"
     docker = "docker"
@@ -343,9 +347,27 @@ class KBRun(BaseModel):
     duration: Optional[float] = None
     signature: str
 
+class BatchRunResult(BaseModel):
+    index: int
+    run: Optional[Union[AgentRun, OrchestratorRun, EnvironmentRun, KBRun, ToolRun]] = None
+    error: bool = False
+    error_message: Optional[str] = None
+
+class FunctionCall(BaseModel):
+    name: str
+    arguments: str
+
+class ToolCall(BaseModel):
+    id: str
+    type: str = "function"
+    function: FunctionCall
+
 class ChatMessage(BaseModel):
     role: str
-    content: str
+    content: Optional[str] = None
+    tool_calls: Optional[List[ToolCall]] = None
+    tool_call_id: Optional[str] = None
+    name: Optional[str] = None
 
 class ChatCompletionRequest(BaseModel):
     model: str
@@ -370,9 +392,70 @@ class Choices(BaseModel):
     finish_reason: str
     index: int
 
+class Usage(BaseModel):
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+
 class ModelResponse(BaseModel):
     id: str
     choices: List[Choices]
     created: int
     model: str
     object: str
+    usage: Optional[Usage] = None
+
+class ChoiceDelta(BaseModel):
+    role: Optional[str] = None
+    content: Optional[str] = None
+    tool_calls: Optional[List[Dict]] = None
+
+class StreamChoices(BaseModel):
+    delta: ChoiceDelta
+    finish_reason: Optional[str] = None
+    index: int = 0
+
+class ModelResponseChunk(BaseModel):
+    id: str
+    choices: List[StreamChoices]
+    created: int
+    model: str
+    object: str = "chat.completion.chunk"
+    usage: Optional[Usage] = None
+
+class EmbeddingRequest(BaseModel):
+    model: str
+    input: Union[str, List[str]]
+    dimensions: Optional[int] = None
+    encoding_format: Optional[str] = None
+
+class EmbeddingData(BaseModel):
+    index: int
+    embedding: List[float]
+    object: str = "embedding"
+
+class EmbeddingResponse(BaseModel):
+    data: List[EmbeddingData]
+    model: str
+    object: str = "list"
+    usage: Optional[Usage] = None
+
+class CascadeAttempt(BaseModel):
+    tier: int
+    model: str
+    outcome: str
+    latency: float
+    error_message: Optional[str] = None
+
+class CascadeResult(BaseModel):
+    response: ModelResponse
+    tier: int
+    model: str
+    accepted: bool
+    attempts: List[CascadeAttempt]
+
+class BatchInferenceResult(BaseModel):
+    index: int
+    response: Optional[ModelResponse] = None
+    error: bool = False
+    error_message: Optional[str] = None
@@ -0,0 +1,175 @@
+import asyncio
+import base64
+import copy
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from naptha_sdk.cache import CacheStats, LRUCache, SQLiteCache
+from naptha_sdk.storage.schemas import ReadStorageRequest, StorageLocation, StorageMetadata, StorageObject, StorageType
+from naptha_sdk.utils import get_logger
+
+logger = get_logger(__name__)
+
+STORAGE_CACHE_MAX_ENTRIES = 4096
+STORAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+STORAGE_CACHE_DISK_PATH = Path.home() / ".naptha" / "storage_cache.sqlite"
+
+
+class StorageCacheStats(CacheStats):
+    """Hit and miss counters for a storage read cache, counting revalidated hits separately"""
+
+    def __init__(self):
+        super().__init__()
+        self.revalidations = 0
+
+    def as_dict(self) -> Dict[str, Union[int, float]]:
+        return {**super().as_dict(), "revalidations": self.revalidations}
+
+
+class CachedRead:
+    """The body of a read with the validators needed to revalidate it"""
+
+    def __init__(
+        self,
+        data: Any,
+        content_type: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        stored_at: Optional[float] = None,
+    ):
+        self.data = data
+        self.content_type = content_type
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at if stored_at is not None else time.time()
+
+    @property
+    def size(self) -> int:
+        if isinstance(self.data, bytes):
+            return len(self.data)
+        return len(json.dumps(self.data, default=str))
+
+    @property
+    def validated(self) -> bool:
+        return self.etag is not None or self.last_modified is not None
+
+    def to_object(self, location: StorageLocation) -> StorageObject:
+        metadata = StorageMetadata(content_type=self.content_type, size=self.size, checksum=self.etag, modified_at=self.last_modified)
+        # A copy, so callers that modify the data they read do not change the cached entry
+        return StorageObject(location=location, data=copy.deepcopy(self.data), metadata=metadata)
+
+    def to_json(self) -> str:
+        if isinstance(self.data, bytes):
+            body = {"bytes": base64.b64encode(self.data).decode()}
+        else:
+            body = {"json": self.data}
+        return json.dumps({
+            **body,
+            "content_type": self.content_type,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "stored_at": self.stored_at,
+        }, default=str)
+
+    @classmethod
+    def from_json(cls, value: str) -> "CachedRead":
+        entry = json.loads(value)
+        data = base64.b64decode(entry["bytes"]) if "bytes" in entry else entry.get("json")
+        return cls(data, entry.get("content_type"), entry.get("etag"), entry.get("last_modified"), entry.get("stored_at"))
+
+
+def storage_cache_prefix(storage_type: StorageType, path: str) -> str:
+    """Key prefix shared by every cached read of one location"""
+    return f"{StorageLocation(storage_type=storage_type, path=path).uri}?"
+
+
+def storage_cache_key(request: ReadStorageRequest) -> str:
+    """The location URI of a read request plus its canonical options"""
+    options = request.options.model_dump(exclude_none=True) if hasattr(request.options, "model_dump") else request.options or {}
+    return storage_cache_prefix(request.storage_type, request.path) + json.dumps(options, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class StorageCache:
+    """Read-through cache of storage reads, revalidated with the node.
+
+    Entries live in a byte-bounded in-memory LRU and, if a SQLite tier is given, on disk
+    as well. A cached entry younger than max_age seconds is served as is; an older one is
+    revalidated with a conditional request using the ETag and Last-Modified the node sent,
+    and only re-downloaded if it changed. Reads without either validator are only cached
+    when max_age is set. Writes and deletes through the provider invalidate every cached
+    read of their location.
+
+    Args:
+        memory: The in-memory tier, bounded to STORAGE_CACHE_MAX_BYTES by default
+        disk: The on-disk tier, or True for one at STORAGE_CACHE_DISK_PATH
+        max_age: Seconds a cached read is served without revalidation
+    """
+
+    def __init__(
+        self,
+        memory: Optional[LRUCache] = None,
+        disk: Union[SQLiteCache, bool, None] = None,
+        max_age: float = 0,
+    ):
+        self.memory = memory if memory is not None else LRUCache(STORAGE_CACHE_MAX_ENTRIES, STORAGE_CACHE_MAX_BYTES)
+        # Its own file, so clearing this cache leaves the inference cache alone
+        self.disk = SQLiteCache(STORAGE_CACHE_DISK_PATH) if disk is True else disk or None
+        self.max_age = max_age
+        self.stats = StorageCacheStats()
+        self._generations: Dict[str, int] = {}
+
+    def is_fresh(self, entry: CachedRead) -> bool:
+        return time.time() - entry.stored_at < self.max_age
+
+    def is_cacheable(self, entry: CachedRead) -> bool:
+        return entry.validated or self.max_age > 0
+
+    def generation(self, prefix: str) -> int:
+        """Counter bumped by every invalidation of a location, to drop reads that raced with a write"""
+        return self._generations.get(prefix, 0)
+
+    async def get(self, key: str) -> Optional[CachedRead]:
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.stats.memory_hits += 1
+            return entry
+        if self.disk is not None:
+            try:
+                value = await asyncio.to_thread(self.disk.get, key)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to read storage cache entry from disk: {e}")
+                value = None
+            if value is not None:
+                self.stats.disk_hits += 1
+                entry = CachedRead.from_json(value)
+                self.stats.evictions += self.memory.set(key, entry, entry.size)
+                return entry
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, entry: CachedRead):
+        self.stats.evictions += self.memory.set(key, entry, entry.size)
+        if self.disk is not None:
+            try:
+                self.stats.evictions += await asyncio.to_thread(self.disk.set, key, entry.to_json())
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to write storage cache entry to disk: {e}")
+
+    async def invalidate(self, storage_type: StorageType, path: str):
+        """Drop every cached read of a location, whatever its options."""
+        prefix = storage_cache_prefix(storage_type, path)
+        self._generations[prefix] = self.generation(prefix) + 1
+        self.memory.delete_prefix(prefix)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.delete_prefix, prefix)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to invalidate storage cache entries on disk: {e}")
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
@@ -38,6 +38,13 @@ class StorageObject(BaseModel):
     data: Optional[Any] = None
     metadata: StorageMetadata = Field(default_factory=StorageMetadata)
 
+class StorageBatchResult(BaseModel):
+    index: int
+    result: Optional[Union[StorageObject, List[StorageObject], bool]] = None
+    error: bool = False
+    error_message: Optional[str] = None
+    status_code: Optional[int] = None
+
 class DatabaseReadOptions(BaseModel):
     """Options specific to database reads"""
     columns: Optional[List[str]] = None
@@ -1,12 +1,23 @@
+import asyncio
+import hashlib
 import httpx
 import json
+import os
+import re
+import time
+from contextlib import aclosing
+from pathlib import Path
 from pydantic import BaseModel
-from typing import Union, Dict, Any, Optional, List, BinaryIO
+from typing import Union, Dict, Any, Optional, List, AsyncIterator, BinaryIO, Iterable, Set, Tuple
+from naptha_sdk.client.resilience import is_transient_error
 from naptha_sdk.schemas import NodeConfigUser
+from naptha_sdk.storage.cache import CachedRead, StorageCache, storage_cache_key, storage_cache_prefix
 from naptha_sdk.storage.schemas import (
     StorageLocation,
+    StorageMetadata,
     StorageType,
     StorageObject,
+    StorageBatchResult,
     BaseStorageRequest,
     CreateStorageRequest,
     ReadStorageRequest,
@@ -18,24 +29,50 @@ from naptha_sdk.storage.schemas import (
 from naptha_sdk.utils import get_logger, node_to_url
 
 HTTP_TIMEOUT = 300
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_PARALLEL_RANGES = 4
+DOWNLOAD_MIN_PARALLEL_SIZE = 64 * 1024 * 1024
+DOWNLOAD_RETRIES = 5
+DOWNLOAD_RETRY_BACKOFF = 0.5
+CONTENT_RANGE_PATTERN = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_CONCURRENCY = 4
+UPLOAD_MIN_CHUNKED_SIZE = 64 * 1024 * 1024
+UPLOAD_RETRIES = 5
+UPLOAD_RETRY_BACKOFF = 0.5
+# Statuses from nodes that do not implement the chunked upload or bulk create endpoints
+UNSUPPORTED_ENDPOINT_STATUSES = {404, 405, 501}
+EXECUTE_MANY_CONCURRENCY = 8
+BULK_CREATE_SIZE = 500
+PAGE_SIZE = 1000
+# Keys under which nodes may return the items of a read or list page
+PAGE_ITEM_KEYS = ("rows", "data", "items", "results")
+# Keys under which nodes may report the total number of items a paged read or list has
+PAGE_TOTAL_KEYS = ("total", "total_count", "count")
 
 logger = get_logger(__name__)
 
 class StorageProvider:
-    def __init__(self, node: NodeConfigUser):
+    def __init__(self, node: NodeConfigUser, cache: Optional[StorageCache] = None):
         self.node = node
+        self.cache = cache
         self.node_url = node_to_url(node)
         self.client = httpx.AsyncClient(timeout=HTTP_TIMEOUT)
+        self.bulk_create_supported = True
+        self._prefetches: Set[asyncio.Task] = set()
         logger.info(f"Storage Provider URL: {self.node_url}")
 
 
+    def _endpoint(self, request: BaseStorageRequest) -> str:
+        return f"{self.node_url}/storage/{request.storage_type.value}/{request.request_type.value}/{request.path}"
+
     async def _make_request(
         self,
         request: BaseStorageRequest,
         files: Optional[Dict] = None
     ) -> Any:
         """Make HTTP request to storage endpoint"""
-        endpoint = f"{self.node_url}/storage/{request.storage_type.value}/{request.request_type.value}/{request.path}"
+        endpoint = self._endpoint(request)
         print(f"Request: {request}")
         try:
             response = None
@@ -112,9 +149,27 @@ class StorageProvider:
             raise StorageError(f"Storage operation failed: {str(e)}")
 
     async def execute(self, request: BaseStorageRequest) -> Union[StorageObject, List[StorageObject], bool]:
-        """Execute storage request and return appropriate response"""
+        """Execute storage request and return appropriate response
+
+        With a cache, reads go through it and creates, updates and deletes invalidate the
+        cached reads of their location, even if they fail part way.
+        """
+        if self.cache is not None:
+            if isinstance(request, ReadStorageRequest):
+                return await self._cached_read(request)
+            if isinstance(request, (CreateStorageRequest, UpdateStorageRequest, DeleteStorageRequest)):
+                try:
+                    return await self._execute(request)
+                finally:
+                    await self.cache.invalidate(request.storage_type, request.path)
+        return await self._execute(request)
+
+    async def _execute(self, request: BaseStorageRequest) -> Union[StorageObject, List[StorageObject], bool]:
         files = None
         if isinstance(request, CreateStorageRequest) and request.file:
+            size = _file_size(request.file)
+            if size is not None and size >= UPLOAD_MIN_CHUNKED_SIZE:
+                return await self.upload(request)
             files = {"file": request.file}
             
         result = await self._make_request(request, files=files)
@@ -164,12 +219,665 @@ class StorageProvider:
                     data=result
                 )
 
+    async def _cached_read(self, request: ReadStorageRequest) -> StorageObject:
+        """Serve a read from the cache, revalidating it with a conditional request once it is older than max_age."""
+        location = StorageLocation(storage_type=request.storage_type, path=request.path)
+        key = storage_cache_key(request)
+        generation = self.cache.generation(storage_cache_prefix(request.storage_type, request.path))
+        entry = await self.cache.get(key)
+        if entry is not None and self.cache.is_fresh(entry):
+            return entry.to_object(location)
+
+        headers = {}
+        if entry is not None and entry.etag is not None:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified is not None:
+            headers["If-Modified-Since"] = entry.last_modified
+        params = None
+        if request.storage_type == StorageType.DATABASE and request.options:
+            params = {"options": json.dumps(request.model_dict()["options"])}
+        try:
+            response = await self.client.get(self._endpoint(request), params=params, headers=headers)
+            if response.status_code == 304 and entry is not None:
+                self.cache.stats.revalidations += 1
+                entry.stored_at = time.time()
+                await self.cache.set(key, entry)
+                return entry.to_object(location)
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error occurred: {e.response.text}")
+            raise StorageError(f"HTTP error occurred: {str(e)}", status_code=e.response.status_code)
+        except httpx.HTTPError as e:
+            logger.error(f"Storage operation failed: {str(e)}")
+            raise StorageError(f"Storage operation failed: {str(e)}")
+
+        content_type = response.headers.get("content-type")
+        data = response.json() if "json" in (content_type or "") else response.content
+        entry = CachedRead(data, content_type, response.headers.get("etag"), response.headers.get("last-modified"))
+        # A write that finished while this read was in flight may have made the response stale
+        if self.cache.is_cacheable(entry) and self.cache.generation(storage_cache_prefix(request.storage_type, request.path)) == generation:
+            await self.cache.set(key, entry)
+        return entry.to_object(location)
+
+    async def execute_many(
+        self,
+        requests: Iterable[BaseStorageRequest],
+        concurrency: int = EXECUTE_MANY_CONCURRENCY,
+        bulk_size: int = BULK_CREATE_SIZE,
+    ) -> List[StorageBatchResult]:
+        """Execute many storage requests and return their results in input order
+
+        Database creates without a file that target the same table with the same options are
+        sent together as bulk creates of up to bulk_size rows. Every other request is executed
+        on its own. Up to concurrency calls are in flight at once, so requests are not ordered
+        against each other: a read is not guaranteed to see a create from the same call. A
+        failed request is reported as an errored StorageBatchResult and does not stop the rest.
+        If the node has no bulk create endpoint the rows are created one by one.
+
+        Args:
+            requests: The storage requests to execute
+            concurrency: The most calls to have in flight at once
+            bulk_size: The most rows to send in one bulk create
+        """
+        requests = list(requests)
+        results: List[Optional[StorageBatchResult]] = [None] * len(requests)
+        slots = asyncio.Semaphore(concurrency)
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        singles: List[int] = []
+        for index, request in enumerate(requests):
+            if isinstance(request, CreateStorageRequest) and request.storage_type == StorageType.DATABASE and not request.file:
+                key = (request.path, json.dumps(request.options or {}, sort_keys=True, default=str))
+                groups.setdefault(key, []).append(index)
+            else:
+                singles.append(index)
+
+        def fail(index: int, e: Exception):
+            logger.error(f"Storage request {index} failed: {e}")
+            results[index] = StorageBatchResult(
+                index=index,
+                error=True,
+                error_message=f"{type(e).__name__}: {e}",
+                status_code=e.status_code if isinstance(e, StorageError) else None,
+            )
+
+        async def run_one(index: int):
+            async with slots:
+                try:
+                    results[index] = StorageBatchResult(index=index, result=await self.execute(requests[index]))
+                except Exception as e:
+                    fail(index, e)
+
+        async def run_bulk(indices: List[int]):
+            async with slots:
+                if not self.bulk_create_supported:
+                    bulk = None
+                else:
+                    try:
+                        bulk = await self._bulk_create([requests[index] for index in indices])
+                    except Exception as e:
+                        for index in indices:
+                            fail(index, e)
+                        return
+                    finally:
+                        if self.cache is not None:
+                            await self.cache.invalidate(requests[indices[0]].storage_type, requests[indices[0]].path)
+            if bulk is None:
+                await asyncio.gather(*[run_one(index) for index in indices])
+                return
+            for index, (data, error) in zip(indices, bulk):
+                if error is not None:
+                    fail(index, StorageError(error))
+                else:
+                    location = StorageLocation(storage_type=requests[index].storage_type, path=requests[index].path)
+                    results[index] = StorageBatchResult(index=index, result=StorageObject(location=location, data=data))
+
+        jobs = [run_one(index) for index in singles]
+        for indices in groups.values():
+            if len(indices) == 1:
+                jobs.append(run_one(indices[0]))
+                continue
+            jobs.extend(run_bulk(indices[start:start + bulk_size]) for start in range(0, len(indices), bulk_size))
+        await asyncio.gather(*jobs)
+        return results
+
+    async def _bulk_create(self, requests: List[CreateStorageRequest]) -> Optional[List[Tuple[Any, Optional[str]]]]:
+        """Create the rows of several database creates against one table in a single call.
+
+        The node answers with {"results": [...], "errors": {index: message}}, one result per row.
+        Returns a (result, error) pair per request, or None if the node has no bulk create endpoint.
+        """
+        first = requests[0]
+        endpoint = f"{self.node_url}/storage/{first.storage_type.value}/create_many/{first.path}"
+        try:
+            response = await self.client.post(
+                endpoint,
+                json={"data": [request.data or {} for request in requests], "options": first.options or {}},
+            )
+            if response.status_code in UNSUPPORTED_ENDPOINT_STATUSES:
+                logger.info("Node does not support bulk creates, creating rows one by one")
+                self.bulk_create_supported = False
+                return None
+            response.raise_for_status()
+            body = response.json()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error occurred: {e.response.text}")
+            raise StorageError(f"HTTP error occurred: {str(e)}", status_code=e.response.status_code)
+        except (httpx.HTTPError, ValueError) as e:
+            raise StorageError(f"Bulk create failed: {str(e)}")
+
+        rows = body.get("results") or []
+        errors = body.get("errors") or {}
+        return [
+            (rows[index] if index < len(rows) else None, errors.get(str(index)))
+            for index in range(len(requests))
+        ]
+
+    async def upload(
+        self,
+        request: CreateStorageRequest,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+        concurrency: int = UPLOAD_CONCURRENCY,
+        manifest_path: Optional[Union[str, Path]] = None,
+        retries: int = UPLOAD_RETRIES,
+    ) -> StorageObject:
+        """Upload the file of a create request in fixed-size chunks, several at a time
+
+        The upload is opened with an init call, each chunk is sent with its SHA-256 checksum,
+        and a final commit call assembles the object from the checksums of all chunks and of
+        the whole file. Chunks that fail transiently are retried. Uploaded chunks are recorded
+        in a manifest file, by default next to the source file, so a failed upload resumes by
+        sending only the missing chunks; the manifest is removed once the upload is committed.
+        If the manifest cannot be written, e.g. in a read-only directory, the upload goes ahead
+        without being resumable.
+        Nodes without the chunked upload endpoints get a single multipart upload instead.
+
+        Args:
+            request: The create request, whose file must be seekable
+            chunk_size: The size of each chunk in bytes
+            concurrency: The most chunks to upload at once
+            manifest_path: Where to record progress; defaults to <file>.upload.json for files opened from a path
+            retries: How many times to retry each chunk after a transient failure
+        """
+        file = request.file
+        size = _file_size(file) if file is not None else None
+        if size is None:
+            raise StorageError("Chunked uploads need a seekable file")
+        if manifest_path is None and isinstance(getattr(file, "name", None), str):
+            manifest_path = file.name + ".upload.json"
+        manifest_path = Path(manifest_path) if manifest_path is not None else None
+        location = StorageLocation(storage_type=request.storage_type, path=request.path)
+        base_url = f"{self.node_url}/storage/{request.storage_type.value}/upload"
+        chunk_count = max(1, -(-size // chunk_size))
+
+        def persist():
+            # Best effort: losing the manifest only costs the ability to resume
+            nonlocal manifest_path
+            if not _save_manifest(manifest_path, manifest):
+                manifest_path = None
+
+        try:
+            manifest = _load_manifest(manifest_path, request, size, chunk_size)
+            if manifest is None:
+                data = {**(request.data or {}), **(request.options or {})}
+                response = await self.client.post(
+                    f"{base_url}/init/{request.path}",
+                    json={"size": size, "chunk_size": chunk_size, "chunks": chunk_count, "data": data},
+                )
+                if response.status_code in UNSUPPORTED_ENDPOINT_STATUSES:
+                    logger.info("Node does not support chunked uploads, sending the file in one request")
+                    file.seek(0)
+                    result = await self._make_request(request, files={"file": file})
+                    return StorageObject(location=location, data=result, metadata=StorageMetadata(size=size))
+                response.raise_for_status()
+                manifest = {
+                    "upload_id": response.json()["upload_id"],
+                    "storage_type": request.storage_type.value,
+                    "path": request.path,
+                    "size": size,
+                    "chunk_size": chunk_size,
+                    "chunks": {},
+                }
+                persist()
+            else:
+                logger.info(f"Resuming upload {manifest['upload_id']} with {len(manifest['chunks'])} of {chunk_count} chunks done")
+
+            upload_id = manifest["upload_id"]
+            file_hash = hashlib.sha256()
+            checksums: List[str] = []
+            slots = asyncio.Semaphore(concurrency)
+            tasks: List[asyncio.Task] = []
+            failed = asyncio.Event()
+
+            async def send(index: int, chunk: bytes, checksum: str):
+                try:
+                    await self._upload_chunk(f"{base_url}/{upload_id}/chunk/{index}", chunk, checksum, retries)
+                    manifest["chunks"][str(index)] = checksum
+                    persist()
+                except Exception:
+                    failed.set()
+                    raise
+                finally:
+                    slots.release()
+
+            try:
+                # Chunks are read in order so the whole-file checksum is computed in the same pass;
+                # the semaphore bounds how many chunks are held in memory at once
+                file.seek(0)
+                for index in range(chunk_count):
+                    await slots.acquire()
+                    if failed.is_set():
+                        slots.release()
+                        break
+                    chunk = file.read(chunk_size)
+                    file_hash.update(chunk)
+                    checksum = hashlib.sha256(chunk).hexdigest()
+                    checksums.append(checksum)
+                    if manifest["chunks"].get(str(index)) == checksum:
+                        slots.release()
+                        continue
+                    tasks.append(asyncio.create_task(send(index, chunk, checksum)))
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+            checksum = file_hash.hexdigest()
+            response = await self.client.post(
+                f"{base_url}/{upload_id}/commit",
+                json={"size": size, "checksum": checksum, "chunks": checksums},
+            )
+            response.raise_for_status()
+            result = response.json() if "json" in response.headers.get("content-type", "") else response.content
+            _remove_manifest(manifest_path)
+            if self.cache is not None:
+                await self.cache.invalidate(request.storage_type, request.path)
+            logger.info(f"Uploaded {size} bytes to {request.path} in {chunk_count} chunks")
+            return StorageObject(location=location, data=result, metadata=StorageMetadata(size=size, checksum=f"sha256:{checksum}"))
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                # The node no longer knows the upload, so the next attempt must start a new one
+                _remove_manifest(manifest_path)
+            logger.error(f"HTTP error occurred: {e}")
+            raise StorageError(f"HTTP error occurred: {str(e)}", status_code=e.response.status_code)
+        except (httpx.HTTPError, OSError) as e:
+            logger.error(f"Upload failed: {str(e)}")
+            raise StorageError(f"Upload failed: {str(e)}")
+
+    async def _upload_chunk(self, url: str, chunk: bytes, checksum: str, retries: int):
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.put(
+                    url,
+                    content=chunk,
+                    headers={"Content-Type": "application/octet-stream", "X-Checksum-SHA256": checksum},
+                )
+                response.raise_for_status()
+                return
+            except httpx.HTTPError as e:
+                if attempt >= retries or not is_transient_error(e):
+                    raise
+                attempt += 1
+                logger.info(f"Chunk upload to {url} failed ({e}), retrying")
+                await asyncio.sleep(UPLOAD_RETRY_BACKOFF * attempt)
+
+    async def download(
+        self,
+        request: ReadStorageRequest,
+        destination: Union[str, Path, BinaryIO],
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        parallel_ranges: int = DOWNLOAD_PARALLEL_RANGES,
+        min_parallel_size: int = DOWNLOAD_MIN_PARALLEL_SIZE,
+        retries: int = DOWNLOAD_RETRIES,
+    ) -> StorageObject:
+        """Stream a filesystem or IPFS object to a path or file object without holding it in memory
+
+        Interrupted transfers are resumed with HTTP Range requests, both within a call and,
+        when downloading to a path, across calls: progress is kept in a .part file (plus a
+        .part.json state file for parallel downloads) next to the destination, which is only
+        renamed into place once complete. Objects of at least min_parallel_size bytes are
+        fetched as parallel_ranges ranges at once if the node supports Range requests.
+
+        Args:
+            request: The read request for the object
+            destination: The path or writable binary file object to write to
+            chunk_size: The size of the chunks read from the response
+            parallel_ranges: The most ranges to fetch at once
+            min_parallel_size: The smallest object to fetch in parallel ranges
+            retries: How many times to resume each transfer after a transient failure
+        """
+        if request.storage_type not in [StorageType.FILESYSTEM, StorageType.IPFS]:
+            raise StorageError(f"Streaming downloads are only supported for filesystem and IPFS storage, not {request.storage_type.value}")
+        endpoint = self._endpoint(request)
+        params = {"options": json.dumps(request.options)} if request.options else None
+        location = StorageLocation(storage_type=request.storage_type, path=request.path)
+
+        try:
+            if not isinstance(destination, (str, Path)):
+                size, content_type = await self._download_range(endpoint, params, destination, 0, None, chunk_size, retries)
+                return StorageObject(location=location, metadata=StorageMetadata(size=size, content_type=content_type))
+
+            path = Path(destination)
+            part_path = path.with_name(path.name + ".part")
+            state_path = path.with_name(path.name + ".part.json")
+            total, content_type = await self._probe_size(endpoint, params)
+            if total is not None and total >= min_parallel_size and parallel_ranges > 1:
+                await self._download_parallel(endpoint, params, part_path, state_path, total, chunk_size, parallel_ranges, retries)
+            else:
+                offset = part_path.stat().st_size if part_path.exists() and not state_path.exists() else 0
+                if offset and total is not None and offset > total:
+                    offset = 0
+                with open(part_path, "r+b" if offset else "wb") as file:
+                    file.seek(offset)
+                    _, content_type = await self._download_range(endpoint, params, file, offset, None, chunk_size, retries, truncate=True)
+            size = part_path.stat().st_size
+            os.replace(part_path, path)
+            state_path.unlink(missing_ok=True)
+            logger.info(f"Downloaded {size} bytes to {path}")
+            return StorageObject(location=location, data=str(path), metadata=StorageMetadata(size=size, content_type=content_type))
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error occurred: {e}")
+            raise StorageError(f"HTTP error occurred: {str(e)}", status_code=e.response.status_code)
+        except (httpx.HTTPError, OSError) as e:
+            logger.error(f"Download failed: {str(e)}")
+            raise StorageError(f"Download failed: {str(e)}")
+
+    async def _probe_size(self, endpoint: str, params: Optional[Dict]) -> Tuple[Optional[int], Optional[str]]:
+        """Ask for the first byte to learn the object size; None if the node does not support Range requests."""
+        async with self.client.stream("GET", endpoint, params=params, headers={"Range": "bytes=0-0"}) as response:
+            if response.status_code == 416:
+                # Not even the first byte exists: the object is empty
+                return 0, response.headers.get("content-type")
+            response.raise_for_status()
+            content_type = response.headers.get("content-type")
+            match = CONTENT_RANGE_PATTERN.match(response.headers.get("content-range", ""))
+            if response.status_code == 206 and match and match.group(3) != "*":
+                return int(match.group(3)), content_type
+            return None, content_type
+
+    async def _download_range(
+        self,
+        endpoint: str,
+        params: Optional[Dict],
+        file: BinaryIO,
+        start: int,
+        end: Optional[int],
+        chunk_size: int,
+        retries: int,
+        truncate: bool = False,
+        progress: Optional[List[int]] = None,
+    ) -> Tuple[int, Optional[str]]:
+        """Write bytes start..end (inclusive, or to the end of the object) to file, resuming after transient failures.
+
+        If the node ignores the Range header and sends the whole object, the file is rewritten
+        from the beginning when truncate is set, and an error is raised otherwise.
+        Returns the number of bytes written and the content type.
+        """
+        written = 0
+        content_type = None
+        attempt = 0
+        while True:
+            offset = start + written
+            headers = {"Range": f"bytes={offset}-{'' if end is None else end}"} if offset or end is not None else None
+            try:
+                async with self.client.stream("GET", endpoint, params=params, headers=headers) as response:
+                    if response.status_code == 416 and end is None:
+                        # Nothing left after offset: the previous attempt already got everything
+                        return written, content_type
+                    response.raise_for_status()
+                    content_type = response.headers.get("content-type")
+                    if headers is not None and response.status_code != 206:
+                        if not truncate:
+                            raise StorageError("Node ignored the Range request")
+                        logger.info("Node does not support Range requests, downloading from the start")
+                        file.seek(0)
+                        file.truncate()
+                        start = 0
+                        written = 0
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        file.write(chunk)
+                        written += len(chunk)
+                        if progress is not None:
+                            progress[0] = written
+                return written, content_type
+            except (httpx.HTTPError, OSError) as e:
+                if attempt >= retries or not (is_transient_error(e) or isinstance(e, httpx.RemoteProtocolError)):
+                    raise
+                attempt += 1
+                logger.info(f"Download interrupted ({e}), resuming from byte {start + written}")
+                await asyncio.sleep(DOWNLOAD_RETRY_BACKOFF * attempt)
+
+    async def _download_parallel(
+        self,
+        endpoint: str,
+        params: Optional[Dict],
+        part_path: Path,
+        state_path: Path,
+        total: int,
+        chunk_size: int,
+        parallel_ranges: int,
+        retries: int,
+    ):
+        range_size = -(-total // parallel_ranges)
+        ranges = [(start, min(start + range_size, total) - 1) for start in range(0, total, range_size)]
+        progress = None
+        if part_path.exists() and state_path.exists():
+            state = json.loads(state_path.read_text())
+            if state.get("size") == total and len(state.get("progress", [])) == len(ranges):
+                progress = [[done] for done in state["progress"]]
+        if progress is None:
+            progress = [[0] for _ in ranges]
+            with open(part_path, "wb") as file:
+                file.truncate(total)
+
+        async def fetch(index: int):
+            start, end = ranges[index]
+            done = progress[index][0]
+            if start + done > end:
+                return
+            range_progress = [0]
+            try:
+                with open(part_path, "r+b") as file:
+                    file.seek(start + done)
+                    await self._download_range(endpoint, params, file, start + done, end, chunk_size, retries, progress=range_progress)
+            finally:
+                progress[index][0] = done + range_progress[0]
+
+        try:
+            await asyncio.gather(*[fetch(index) for index in range(len(ranges))])
+        finally:
+            # Saved even on failure or cancellation so the next call resumes every range where it stopped
+            state_path.write_text(json.dumps({"size": total, "progress": [done for done, in progress]}))
+
+    async def iter_rows(
+        self,
+        request: ReadStorageRequest,
+        page_size: int = PAGE_SIZE,
+        key_column: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate the rows of a database read page by page, fetching the next page while the current one is consumed
+
+        By default pages are read with limit and offset, which needs the node to report the total
+        number of rows alongside them, since a node that ignores the offset would otherwise send the
+        first page forever. With key_column, which should be a unique indexed column, pages are read
+        by keyset instead: ordered by that column and starting after its value in the last row, which
+        stays fast deep into large tables and does not skip or repeat rows when earlier rows change.
+        At most two pages are held in memory. A limit and offset in the request options bound the
+        rows returned overall. The next page is fetched in the background; it is cancelled when the
+        iterator is closed or the provider exits, so stopping early needs no cleanup.
+
+        Args:
+            request: The database read request
+            page_size: The number of rows to fetch per request
+            key_column: The column to page by keyset, instead of by offset
+        """
+        if request.storage_type != StorageType.DATABASE:
+            raise StorageError(f"Row iteration is only supported for database storage, not {request.storage_type.value}")
+        async with aclosing(self._pages(request, page_size, key_column)) as pages:
+            async for page in pages:
+                for row in page:
+                    yield row
+
+    async def iter_list(self, request: ListStorageRequest, page_size: int = PAGE_SIZE) -> AsyncIterator[StorageObject]:
+        """Iterate the items of a list request page by page, fetching the next page while the current one is consumed
+
+        If the node ignores the limit and offset options the single full listing it returns is iterated.
+        Otherwise the node must report the total number of items, as for iter_rows.
+
+        Args:
+            request: The list request
+            page_size: The number of items to fetch per request
+        """
+        location = StorageLocation(storage_type=request.storage_type, path=request.path)
+        async with aclosing(self._pages(request, page_size)) as pages:
+            async for page in pages:
+                for item in page:
+                    yield StorageObject(location=location, data=item)
+
+    async def _pages(
+        self,
+        request: Union[ReadStorageRequest, ListStorageRequest],
+        page_size: int,
+        key_column: Optional[str] = None,
+    ) -> AsyncIterator[List[Any]]:
+        options = request.options.model_dump(exclude_none=True) if isinstance(request.options, BaseModel) else dict(request.options or {})
+        remaining = options.pop("limit", None)
+        offset = options.pop("offset", None) or 0
+        conditions = list(options.get("conditions") or [])
+        if key_column is not None:
+            options["order_by"] = key_column
+        operator = "lt" if options.get("order_direction") == "desc" else "gt"
+
+        async def fetch(offset: int, after: Any, size: int) -> Tuple[List[Any], Optional[int]]:
+            page_options = {**options, "limit": size}
+            if after is None:
+                page_options["offset"] = offset
+            else:
+                page_options["conditions"] = conditions + [{key_column: {operator: after}}]
+            result = await self._make_request(request.model_copy(update={"options": page_options}))
+            return _page_items(result), _page_total(result)
+
+        def prefetch(offset: int, after: Any, size: int) -> asyncio.Task:
+            # Tracked by the provider, so exiting it cancels pages an abandoned iterator was still fetching
+            task = asyncio.create_task(fetch(offset, after, size))
+            self._prefetches.add(task)
+            task.add_done_callback(self._prefetches.discard)
+            return task
+
+        size = page_size if remaining is None else min(page_size, remaining)
+        task: Optional[asyncio.Task] = prefetch(offset, None, size)
+        after = None
+        try:
+            while task is not None:
+                page, total = await task
+                task = None
+                if len(page) > size:
+                    # The node ignored the page size and sent everything
+                    yield page if remaining is None else page[:remaining]
+                    return
+                if key_column is None and total is not None:
+                    # Bounds the rows of a node that ignores the offset, as well as stopping on time
+                    page = page[:max(0, total - offset)]
+                offset += len(page)
+                if remaining is not None:
+                    remaining -= len(page)
+                more = len(page) == size and (remaining is None or remaining > 0)
+                if more and key_column is None:
+                    if total is None:
+                        raise StorageError(f"Node did not report a total for {request.path}, so offset paging cannot tell when to stop")
+                    more = offset < total
+                if more:
+                    if key_column is not None:
+                        previous, after = after, page[-1].get(key_column) if isinstance(page[-1], dict) else None
+                        if after is None:
+                            raise StorageError(f"Row has no value for key column {key_column}")
+                        if previous is not None and not (after > previous if operator == "gt" else after < previous):
+                            raise StorageError(f"Node ignored the keyset condition when paging {request.path}")
+                    size = page_size if remaining is None else min(page_size, remaining)
+                    task = prefetch(offset, after, size)
+                if page:
+                    yield page
+        finally:
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        for task in self._prefetches:
+            task.cancel()
+        await asyncio.gather(*self._prefetches, return_exceptions=True)
         await self.client.aclose()
 
+def _page_items(result: Any) -> List[Any]:
+    """The items of a read or list page, whether the node sent a bare list or wrapped it."""
+    if isinstance(result, list):
+        return result
+    if isinstance(result, dict):
+        for key in PAGE_ITEM_KEYS:
+            if isinstance(result.get(key), list):
+                return result[key]
+    raise StorageError(f"Unexpected page format: {type(result).__name__}")
+
+def _page_total(result: Any) -> Optional[int]:
+    """The total number of items a wrapped page reports, if any."""
+    if isinstance(result, dict):
+        for key in PAGE_TOTAL_KEYS:
+            value = result.get(key)
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+    return None
+
+def _file_size(file: BinaryIO) -> Optional[int]:
+    """Bytes in a seekable file object, or None if it cannot seek."""
+    try:
+        if not file.seekable():
+            return None
+        position = file.tell()
+        size = file.seek(0, os.SEEK_END)
+        file.seek(position)
+        return size
+    except (AttributeError, OSError):
+        return None
+
+def _load_manifest(path: Optional[Path], request: CreateStorageRequest, size: int, chunk_size: int) -> Optional[Dict[str, Any]]:
+    """The manifest of an earlier upload of the same file to the same path, if there is one."""
+    if path is None or not path.exists():
+        return None
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable upload manifest {path}: {e}")
+        return None
+    expected = {"storage_type": request.storage_type.value, "path": request.path, "size": size, "chunk_size": chunk_size}
+    if any(manifest.get(key) != value for key, value in expected.items()) or "upload_id" not in manifest:
+        return None
+    return manifest
+
+def _save_manifest(path: Optional[Path], manifest: Dict[str, Any]) -> bool:
+    """Write the manifest atomically, returning False if it cannot be written."""
+    if path is None:
+        return False
+    try:
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(manifest))
+        tmp_path.replace(path)
+        return True
+    except OSError as e:
+        logger.warning(f"Cannot write upload manifest {path}, the upload will not be resumable: {e}")
+        return False
+
+def _remove_manifest(path: Optional[Path]):
+    if path is None:
+        return
+    try:
+        path.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Cannot remove upload manifest {path}: {e}")
+
 class StorageError(Exception):
     """Custom exception for storage operations"""
     def __init__(self, message: str, status_code: Optional[int] = None):
@@ -107,6 +107,20 @@ class AsyncMixin:
     def __await__(self):
         return self.__initobj().__await__()
     
+async def aiter_sse_data(response):
+    """Yield the data payload of each server-sent event in a streaming httpx response"""
+    data_lines = []
+    async for line in response.aiter_lines():
+        if line == "":
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+        elif line.startswith("data:"):
+            data = line[5:]
+            data_lines.append(data[1:] if data.startswith(" ") else data)
+    if data_lines:
+        yield "\n".join(data_lines)
+
 def node_to_url(node_schema: NodeConfigUser):
     return f"http://{node_schema.ip}:{node_schema.http_port}"
     
@@ -0,0 +1,57 @@
+import httpx
+import pytest
+
+from naptha_sdk.client.node import UserClient
+from naptha_sdk.inference import InferenceClient
+from naptha_sdk.schemas import NodeConfigUser
+from naptha_sdk.storage.storage_provider import StorageProvider
+
+
+@pytest.fixture
+def node() -> NodeConfigUser:
+    return NodeConfigUser(ip="localhost", http_port=7001, server_type="http")
+
+
+@pytest.fixture
+def completion():
+    """Build a chat completion response body with one assistant message."""
+    def make(content="Hello", model="test-model", finish_reason="stop", **message):
+        return {
+            "id": "chatcmpl-1", "created": 1, "model": model, "object": "chat.completion",
+            "choices": [{"message": {"role": "assistant", "content": content, **message}, "finish_reason": finish_reason, "index": 0}],
+        }
+
+    return make
+
+
+@pytest.fixture
+def make_user_client(node):
+    """Build a UserClient whose pooled client is backed by a mock transport."""
+    def make(handler, **kwargs) -> UserClient:
+        user_client = UserClient(node, **kwargs)
+        user_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return user_client
+
+    return make
+
+
+@pytest.fixture
+def make_inference_client(node):
+    """Build an InferenceClient whose pooled client is backed by a mock transport."""
+    def make(handler, **kwargs) -> InferenceClient:
+        inference_client = InferenceClient(node, **kwargs)
+        inference_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return inference_client
+
+    return make
+
+
+@pytest.fixture
+def make_provider(node):
+    """Build a StorageProvider whose client is backed by a mock transport."""
+    def make(handler, **kwargs) -> StorageProvider:
+        provider = StorageProvider(node, **kwargs)
+        provider.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return provider
+
+    return make
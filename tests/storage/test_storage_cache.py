@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+
+from naptha_sdk.cache import LRUCache, SQLiteCache
+from naptha_sdk.storage import cache as storage_cache
+from naptha_sdk.storage.cache import StorageCache
+from naptha_sdk.storage.schemas import ReadStorageRequest, StorageType, UpdateStorageRequest
+
+READ = ReadStorageRequest(storage_type=StorageType.FILESYSTEM, path="notes.txt")
+
+
+def versioned_handler():
+    """Serve notes.txt with an ETag that changes on every update, answering matching conditional reads with 304."""
+    state = {"version": 1, "requests": []}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        state["requests"].append((request.method, request.headers.get("if-none-match")))
+        if request.method == "PUT":
+            state["version"] += 1
+            return httpx.Response(200, json={"ok": True})
+        etag = f'"v{state["version"]}"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"etag": etag, "content-type": "text/plain"}, content=f"version {state['version']}".encode())
+
+    return handler, state
+
+
+def test_cached_read_is_revalidated_with_etag(make_provider):
+    """Test that a repeated read sends If-None-Match and serves the cached body on 304."""
+    handler, state = versioned_handler()
+    cache = StorageCache()
+
+    async def run():
+        async with make_provider(handler, cache=cache) as provider:
+            return [await provider.execute(READ) for _ in range(2)]
+
+    first, second = asyncio.run(run())
+    assert first.data == second.data == b"version 1"
+    assert second.metadata.checksum == '"v1"'
+    assert state["requests"] == [("GET", None), ("GET", '"v1"')]
+    assert cache.stats.revalidations == 1
+
+
+def test_write_invalidates_cached_reads(make_provider):
+    """Test that an update through the provider drops the cached read so the next read fetches it again."""
+    handler, state = versioned_handler()
+
+    async def run():
+        async with make_provider(handler, cache=StorageCache()) as provider:
+            await provider.execute(READ)
+            await provider.execute(UpdateStorageRequest(storage_type=StorageType.FILESYSTEM, path="notes.txt", data={"text": "new"}))
+            return await provider.execute(READ)
+
+    assert asyncio.run(run()).data == b"version 2"
+    assert state["requests"][-1] == ("GET", None)
+
+
+def test_cached_read_spills_to_disk(tmp_path, make_provider):
+    """Test that a read cached on disk by one provider is revalidated, not re-downloaded, by another."""
+    handler, state = versioned_handler()
+
+    async def run():
+        for _ in range(2):
+            disk = SQLiteCache(tmp_path / "storage.sqlite")
+            cache = StorageCache(memory=LRUCache(max_entries=8, max_bytes=4), disk=disk)
+            async with make_provider(handler, cache=cache) as provider:
+                result = await provider.execute(READ)
+            disk.close()
+        return result, cache
+
+    result, cache = asyncio.run(run())
+    assert result.data == b"version 1"
+    assert cache.stats.disk_hits == 1 and cache.stats.revalidations == 1
+    assert len(cache.memory) == 0
+
+
+def test_cached_data_is_not_shared_with_callers(make_provider):
+    """Test that mutating a returned read does not change what the cache serves next."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"etag": '"v1"'}, json=[{"id": 1}])
+
+    async def run():
+        async with make_provider(handler, cache=StorageCache()) as provider:
+            request = ReadStorageRequest(storage_type=StorageType.DATABASE, path="rows")
+            first = await provider.execute(request)
+            first.data.append({"id": 2})
+            return await provider.execute(request)
+
+    assert asyncio.run(run()).data == [{"id": 1}]
+
+
+def test_default_disk_tier_has_its_own_file(tmp_path, monkeypatch):
+    """Test that disk=True uses the storage cache file, not the inference one."""
+    monkeypatch.setattr(storage_cache, "STORAGE_CACHE_DISK_PATH", tmp_path / "storage.sqlite")
+    cache = StorageCache(disk=True)
+    assert cache.disk.path == tmp_path / "storage.sqlite"
+    cache.disk.close()
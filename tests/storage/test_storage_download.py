@@ -0,0 +1,114 @@
+import asyncio
+import io
+import re
+
+import httpx
+import pytest
+
+from naptha_sdk.storage.schemas import ReadStorageRequest, StorageType
+from naptha_sdk.storage.storage_provider import StorageError
+
+DATA = bytes(range(256)) * 40
+
+
+def ranged_handler(data: bytes, fail_after=None, supports_range=True):
+    """Serve data with Range support, optionally dropping the connection once after fail_after bytes."""
+    state = {"ranges": [], "failed": False}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        range_header = request.headers.get("range")
+        state["ranges"].append(range_header)
+        start, end = 0, len(data) - 1
+        if range_header and supports_range:
+            match = re.match(r"bytes=(\d+)-(\d*)", range_header)
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+            if start >= len(data):
+                return httpx.Response(416)
+        body = data[start:end + 1]
+
+        async def content():
+            if fail_after is not None and not state["failed"] and len(body) > fail_after:
+                state["failed"] = True
+                yield body[:fail_after]
+                raise httpx.RemoteProtocolError("peer closed connection")
+            yield body
+
+        if range_header and supports_range:
+            headers = {"content-range": f"bytes {start}-{end}/{len(data)}", "content-type": "application/octet-stream"}
+            return httpx.Response(206, headers=headers, content=content())
+        return httpx.Response(200, headers={"content-type": "application/octet-stream"}, content=content())
+
+    return handler, state
+
+
+@pytest.fixture
+def download(make_provider):
+    def run_download(handler, destination, **kwargs):
+        async def run():
+            async with make_provider(handler) as provider:
+                return await provider.download(ReadStorageRequest(storage_type=StorageType.FILESYSTEM, path="data.bin"), destination, **kwargs)
+
+        return asyncio.run(run())
+
+    return run_download
+
+
+def test_download_resumes_after_interruption(tmp_path, download):
+    """Test that a dropped connection is resumed with a Range request and the file is complete."""
+    handler, state = ranged_handler(DATA, fail_after=1000)
+    result = download(handler, tmp_path / "data.bin", chunk_size=250)
+    assert (tmp_path / "data.bin").read_bytes() == DATA
+    assert not (tmp_path / "data.bin.part").exists()
+    assert result.metadata.size == len(DATA)
+    assert state["ranges"][-1] == "bytes=1000-"
+
+
+def test_download_continues_partial_file_from_earlier_call(tmp_path, download):
+    """Test that an existing .part file is continued rather than downloaded again."""
+    (tmp_path / "data.bin.part").write_bytes(DATA[:3000])
+    handler, state = ranged_handler(DATA)
+    download(handler, tmp_path / "data.bin")
+    assert (tmp_path / "data.bin").read_bytes() == DATA
+    assert state["ranges"] == ["bytes=0-0", "bytes=3000-"]
+
+
+def test_download_restarts_when_range_is_unsupported(tmp_path, download):
+    """Test that a node ignoring Range causes a clean restart instead of a corrupt file."""
+    (tmp_path / "data.bin.part").write_bytes(b"stale")
+    handler, _ = ranged_handler(DATA, supports_range=False)
+    download(handler, tmp_path / "data.bin")
+    assert (tmp_path / "data.bin").read_bytes() == DATA
+
+
+def test_parallel_ranges_and_resume_state(tmp_path, download):
+    """Test that large objects are fetched as parallel ranges, resuming each range after a failure."""
+    handler, state = ranged_handler(DATA, fail_after=500)
+    download(handler, tmp_path / "data.bin", parallel_ranges=4, min_parallel_size=1024)
+    assert (tmp_path / "data.bin").read_bytes() == DATA
+    assert not (tmp_path / "data.bin.part.json").exists()
+    assert {"bytes=0-2559", "bytes=2560-5119", "bytes=5120-7679", "bytes=7680-10239"} <= set(state["ranges"])
+
+
+def test_download_empty_object(tmp_path, download):
+    """Test that a zero-byte object is fetched with a plain GET after the size probe."""
+    handler, state = ranged_handler(b"")
+    result = download(handler, tmp_path / "empty.bin")
+    assert (tmp_path / "empty.bin").read_bytes() == b""
+    assert result.metadata.size == 0
+    assert state["ranges"] == ["bytes=0-0", None]
+
+
+def test_download_to_file_object(download, make_provider):
+    """Test streaming into a file object, and that database reads are rejected."""
+    handler, _ = ranged_handler(DATA)
+    buffer = io.BytesIO()
+    result = download(handler, buffer)
+    assert buffer.getvalue() == DATA and result.metadata.size == len(DATA)
+
+    async def run():
+        async with make_provider(handler) as provider:
+            await provider.download(ReadStorageRequest(storage_type=StorageType.DATABASE, path="table"), buffer)
+
+    with pytest.raises(StorageError):
+        asyncio.run(run())
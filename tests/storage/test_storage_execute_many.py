@@ -0,0 +1,66 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from naptha_sdk.storage.schemas import CreateStorageRequest, ReadStorageRequest, StorageType
+
+
+@pytest.fixture
+def execute_many(make_provider):
+    def run_execute_many(handler, requests, **kwargs):
+        async def run():
+            async with make_provider(handler) as provider:
+                return await provider.execute_many(requests, **kwargs)
+
+        return asyncio.run(run())
+
+    return run_execute_many
+
+
+def rows(count, path="events"):
+    return [CreateStorageRequest(storage_type=StorageType.DATABASE, path=path, data={"id": i}) for i in range(count)]
+
+
+def test_execute_many_groups_database_creates(execute_many):
+    """Test that creates against one table become bulk calls and results keep input order."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if "/create_many/" in request.url.path:
+            body = json.loads(request.content)
+            errors = {str(i): "duplicate key" for i, row in enumerate(body["data"]) if row["id"] == 3}
+            return httpx.Response(200, json={"results": [row for row in body["data"]], "errors": errors})
+        return httpx.Response(200, json={"path": request.url.path})
+
+    read = ReadStorageRequest(storage_type=StorageType.DATABASE, path="other")
+    results = execute_many(handler, rows(5) + [read], bulk_size=2)
+
+    assert sorted(calls) == ["/storage/db/create_many/events"] * 3 + ["/storage/db/read/other"]
+    assert [result.index for result in results] == list(range(6))
+    assert [result.result.data["id"] for result in results[:3]] == [0, 1, 2]
+    assert results[3].error and "duplicate key" in results[3].error_message
+    assert results[4].result.data == {"id": 4}
+    assert results[5].result.data == {"path": "/storage/db/read/other"}
+
+
+def test_execute_many_falls_back_to_single_creates(execute_many):
+    """Test that a node without bulk creates gets one create per row, with per-item errors."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if "/create_many/" in request.url.path:
+            return httpx.Response(404)
+        if json.loads(parse_qs(request.content.decode())["data"][0]) == {"id": 1}:
+            return httpx.Response(400, json={"detail": "bad row"})
+        return httpx.Response(200, json={"ok": True})
+
+    results = execute_many(handler, rows(3), concurrency=2)
+
+    assert calls.count("/storage/db/create/events") == 3
+    assert [result.error for result in results] == [False, True, False]
+    assert results[1].status_code == 400
@@ -0,0 +1,152 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from naptha_sdk.storage.schemas import DatabaseReadOptions, ListStorageRequest, ReadStorageRequest, StorageType
+from naptha_sdk.storage.storage_provider import StorageError
+
+ROWS = [{"id": i, "text": f"row {i}"} for i in range(2500)]
+
+
+def table_handler(rows, honour_offset=True, honour_conditions=True, report_total=True):
+    """Serve rows honouring limit, offset and {"id": {"gt": value}} conditions, recording the options of each request."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        options = json.loads(request.url.params.get("options", "{}"))
+        seen.append(options)
+        selected = rows
+        for condition in options.get("conditions") or []:
+            if "id" in condition and honour_conditions:
+                selected = [row for row in selected if row["id"] > condition["id"]["gt"]]
+        offset = options.get("offset", 0) if honour_offset else 0
+        body = {"rows": selected[offset:offset + options["limit"]]}
+        if report_total:
+            body["total"] = len(selected)
+        return httpx.Response(200, json=body)
+
+    return handler, seen
+
+
+def test_iter_rows_pages_by_offset_and_prefetches(make_provider):
+    """Test that every row is yielded in order and the next page is requested before the current one is consumed."""
+    handler, seen = table_handler(ROWS)
+
+    async def run():
+        rows = []
+        async with make_provider(handler) as provider:
+            request = ReadStorageRequest(storage_type=StorageType.DATABASE, path="events")
+            async for row in provider.iter_rows(request, page_size=1000):
+                if not rows:
+                    await asyncio.sleep(0.01)
+                    requests_after_first_row = len(seen)
+                rows.append(row)
+        return rows, requests_after_first_row
+
+    rows, requests_after_first_row = asyncio.run(run())
+    assert rows == ROWS
+    assert requests_after_first_row == 2
+    assert [options["offset"] for options in seen] == [0, 1000, 2000]
+
+
+def test_iter_rows_pages_by_keyset_within_limit(make_provider):
+    """Test that keyset paging continues after the last key and stops at the requested limit."""
+    handler, seen = table_handler(ROWS)
+
+    async def run():
+        async with make_provider(handler) as provider:
+            request = ReadStorageRequest(storage_type=StorageType.DATABASE, path="events", options=DatabaseReadOptions(limit=1500))
+            return [row async for row in provider.iter_rows(request, page_size=1000, key_column="id")]
+
+    rows = asyncio.run(run())
+    assert rows == ROWS[:1500]
+    assert seen[1]["conditions"] == [{"id": {"gt": 999}}]
+    assert seen[1]["limit"] == 500 and seen[1]["order_by"] == "id"
+
+
+def test_iter_list_handles_node_without_paging(make_provider):
+    """Test that a node returning the whole listing regardless of limit is iterated once."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(200, json=[f"file{i}" for i in range(25)])
+
+    async def run():
+        async with make_provider(handler) as provider:
+            request = ListStorageRequest(storage_type=StorageType.FILESYSTEM, path="docs")
+            return [item.data async for item in provider.iter_list(request, page_size=10)]
+
+    assert asyncio.run(run()) == [f"file{i}" for i in range(25)]
+    assert calls == ["/storage/fs/list/docs"]
+
+
+def test_iter_rows_keeps_duplicate_rows(make_provider):
+    """Test that offset paging returns every row of a table whose pages repeat the same rows."""
+    rows = [{"text": "same"}] * 25
+    handler, seen = table_handler(rows)
+
+    async def run():
+        async with make_provider(handler) as provider:
+            request = ReadStorageRequest(storage_type=StorageType.DATABASE, path="events")
+            return [row async for row in provider.iter_rows(request, page_size=10)]
+
+    assert asyncio.run(run()) == rows
+    assert [options["offset"] for options in seen] == [0, 10, 20]
+
+
+def read_rows(make_provider, handler, **kwargs):
+    async def run():
+        async with make_provider(handler) as provider:
+            request = ReadStorageRequest(storage_type=StorageType.DATABASE, path="events")
+            return [row async for row in provider.iter_rows(request, page_size=10, **kwargs)]
+
+    return asyncio.run(run())
+
+
+def test_iter_rows_stops_at_total_when_node_ignores_offset(make_provider):
+    """Test that a node repeating the first page for every offset is read only up to the total it reports."""
+    handler, seen = table_handler(ROWS[:25], honour_offset=False)
+    assert len(read_rows(make_provider, handler)) == 25
+    assert len(seen) == 3
+
+
+def test_iter_rows_needs_total_to_page_by_offset(make_provider):
+    """Test that offset paging fails instead of looping when the node does not report a total."""
+    handler, seen = table_handler(ROWS[:25], honour_offset=False, report_total=False)
+    with pytest.raises(StorageError):
+        read_rows(make_provider, handler)
+    assert len(seen) == 1
+
+
+def test_iter_rows_fails_when_node_ignores_keyset(make_provider):
+    """Test that keyset paging fails instead of looping when the key column stops advancing."""
+    handler, seen = table_handler(ROWS[:25], honour_conditions=False, report_total=False)
+    with pytest.raises(StorageError):
+        read_rows(make_provider, handler, key_column="id")
+    assert len(seen) == 2
+
+
+def test_exiting_provider_cancels_prefetch_of_abandoned_iterator(make_provider):
+    """Test that leaving iter_rows early and closing the provider cancels the page it was fetching ahead."""
+    served = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.05)
+        served.append(request.url.params["options"])
+        return httpx.Response(200, json={"rows": ROWS[:10], "total": len(ROWS)})
+
+    async def run():
+        async with make_provider(handler) as provider:
+            request = ReadStorageRequest(storage_type=StorageType.DATABASE, path="events")
+            async for _ in provider.iter_rows(request, page_size=10):
+                await asyncio.sleep(0.01)
+                break
+        await asyncio.sleep(0.1)
+        return provider
+
+    provider = asyncio.run(run())
+    assert len(served) == 1
+    assert not provider._prefetches
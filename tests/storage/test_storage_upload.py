@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import json
+
+import httpx
+import pytest
+
+from naptha_sdk.storage.schemas import CreateStorageRequest, StorageType
+from naptha_sdk.storage.storage_provider import StorageError
+
+DATA = bytes(range(256)) * 40
+
+
+def upload_handler(fail_chunks=(), chunked=True):
+    """Serve the chunked upload endpoints, refusing the connection once for each chunk in fail_chunks."""
+    state = {"chunks": {}, "puts": [], "commits": [], "multipart": 0, "failed": set()}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if "/upload/" in path and not chunked:
+            return httpx.Response(404)
+        if "/upload/init/" in path:
+            return httpx.Response(200, json={"upload_id": "up-1"})
+        if "/chunk/" in path:
+            index = int(path.rsplit("/", 1)[1])
+            state["puts"].append(index)
+            if index in fail_chunks and index not in state["failed"]:
+                state["failed"].add(index)
+                raise httpx.ConnectError("connection refused")
+            assert hashlib.sha256(request.content).hexdigest() == request.headers["x-checksum-sha256"]
+            state["chunks"][index] = request.content
+            return httpx.Response(200)
+        if path.endswith("/commit"):
+            body = json.loads(request.content)
+            state["commits"].append(body)
+            assembled = b"".join(state["chunks"][index] for index in sorted(state["chunks"]))
+            assert hashlib.sha256(assembled).hexdigest() == body["checksum"]
+            return httpx.Response(200, json={"path": "data.bin", "size": len(assembled)})
+        state["multipart"] += 1
+        return httpx.Response(200, json={"path": "data.bin"})
+
+    return handler, state
+
+
+@pytest.fixture
+def upload(make_provider):
+    def run_upload(handler, source, **kwargs):
+        async def run():
+            async with make_provider(handler) as provider:
+                with open(source, "rb") as file:
+                    request = CreateStorageRequest(storage_type=StorageType.FILESYSTEM, path="data.bin", file=file)
+                    return await provider.upload(request, **kwargs)
+
+        return asyncio.run(run())
+
+    return run_upload
+
+
+def test_chunked_upload_populates_checksum_and_size(tmp_path, upload):
+    """Test that the file is sent in checksummed chunks and committed with the whole-file checksum."""
+    source = tmp_path / "data.bin"
+    source.write_bytes(DATA)
+    handler, state = upload_handler()
+
+    result = upload(handler, source, chunk_size=1000, concurrency=3)
+
+    assert sorted(state["puts"]) == list(range(11))
+    assert len(state["commits"]) == 1
+    assert result.metadata.size == len(DATA)
+    assert result.metadata.checksum == f"sha256:{hashlib.sha256(DATA).hexdigest()}"
+    assert not (tmp_path / "data.bin.upload.json").exists()
+
+
+def test_chunked_upload_resumes_from_manifest(tmp_path, upload):
+    """Test that a failed upload leaves a manifest and the next attempt only sends missing chunks."""
+    source = tmp_path / "data.bin"
+    source.write_bytes(DATA)
+    handler, state = upload_handler(fail_chunks={5})
+
+    with pytest.raises(StorageError):
+        upload(handler, source, chunk_size=1000, concurrency=1, retries=0)
+    manifest = json.loads((tmp_path / "data.bin.upload.json").read_text())
+    assert sorted(map(int, manifest["chunks"])) == [0, 1, 2, 3, 4]
+
+    state["puts"].clear()
+    result = upload(handler, source, chunk_size=1000, concurrency=1, retries=0)
+
+    assert state["puts"] == list(range(5, 11))
+    assert result.metadata.checksum == f"sha256:{hashlib.sha256(DATA).hexdigest()}"
+    assert not (tmp_path / "data.bin.upload.json").exists()
+
+
+def test_upload_falls_back_to_multipart(tmp_path, upload):
+    """Test that a node without the chunked endpoints gets the file in a single request."""
+    source = tmp_path / "data.bin"
+    source.write_bytes(DATA)
+    handler, state = upload_handler(chunked=False)
+
+    result = upload(handler, source, chunk_size=1000)
+
+    assert state["multipart"] == 1
+    assert result.metadata.size == len(DATA)
+
+
+def test_upload_continues_when_manifest_cannot_be_written(tmp_path, upload):
+    """Test that an unwritable manifest path does not abort the upload."""
+    source = tmp_path / "data.bin"
+    source.write_bytes(DATA)
+    handler, state = upload_handler()
+
+    result = upload(handler, source, chunk_size=1000, manifest_path=tmp_path / "missing" / "data.upload.json")
+
+    assert len(state["commits"]) == 1
+    assert result.metadata.checksum == f"sha256:{hashlib.sha256(DATA).hexdigest()}"
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from naptha_sdk.cache import InferenceCache, LRUCache, SQLiteCache, request_cache_key
+from naptha_sdk.schemas import ChatCompletionRequest
+
+def make_request(**kwargs) -> ChatCompletionRequest:
+    return ChatCompletionRequest(model="test-model", messages=[{"role": "user", "content": "hi"}], **kwargs)
+
+
+@pytest.fixture
+def make_cached_client(make_inference_client, completion):
+    def make(cache: InferenceCache):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(json.loads(request.content))
+            return httpx.Response(200, json=completion())
+
+        return make_inference_client(handler, cache=cache), calls
+
+    return make
+
+
+def test_cache_key_ignores_delivery_fields():
+    """Test that requests differing only in streaming options share a key."""
+    assert request_cache_key(make_request(temperature=0)) == request_cache_key(make_request(temperature=0, stream=False))
+    assert request_cache_key(make_request(temperature=0)) != request_cache_key(make_request(temperature=0, max_tokens=5))
+
+
+def test_deterministic_requests_are_served_from_cache(make_cached_client):
+    """Test that a repeated temperature=0 request does not reach the node, and sampled ones do."""
+    cache = InferenceCache()
+    inference_client, calls = make_cached_client(cache)
+
+    async def run():
+        first = await inference_client.run_inference(make_request(temperature=0))
+        second = await inference_client.run_inference(make_request(temperature=0))
+        await inference_client.run_inference(make_request(temperature=0.7))
+        await inference_client.run_inference(make_request(temperature=0.7))
+        await inference_client.aclose()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert len(calls) == 3
+    assert cache.stats.memory_hits == 1 and cache.stats.misses == 1
+
+
+def test_disk_tier_survives_new_memory_tier(tmp_path, make_cached_client):
+    """Test that a fresh cache over the same SQLite file hits on disk and promotes to memory."""
+    path = tmp_path / "cache.sqlite"
+    request = make_request(seed=1)
+
+    async def run():
+        inference_client, _ = make_cached_client(InferenceCache(disk=SQLiteCache(path)))
+        await inference_client.run_inference(request)
+        await inference_client.aclose()
+
+        cache = InferenceCache(disk=SQLiteCache(path))
+        inference_client, calls = make_cached_client(cache)
+        await inference_client.run_inference(request)
+        await inference_client.run_inference(request)
+        await inference_client.aclose()
+        return cache, calls
+
+    cache, calls = asyncio.run(run())
+    assert calls == []
+    assert cache.stats.disk_hits == 1 and cache.stats.memory_hits == 1
+
+
+def test_disk_tier_expires_and_evicts(tmp_path):
+    """Test the SQLite tier's TTL and size limit."""
+    disk = SQLiteCache(tmp_path / "cache.sqlite", ttl=0.05, max_bytes=10)
+    disk.set("a", "12345")
+    disk.set("b", "12345")
+    assert disk.set("c", "12345") == 1
+    assert disk.get("a") is None and disk.get("c") == "12345"
+    time.sleep(0.06)
+    assert disk.get("c") is None
+
+
+def test_lru_evicts_least_recently_used():
+    """Test that the memory tier drops the entry read least recently."""
+    lru = LRUCache(max_entries=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+    assert lru.get("b") is None and lru.get("a") == 1
+
+
+def test_lru_evicts_to_stay_under_max_bytes():
+    """Test that the memory tier evicts by total size when max_bytes is set."""
+    lru = LRUCache(max_entries=10, max_bytes=10)
+    lru.set("a", b"aaaa", 4)
+    lru.set("b", b"bbbb", 4)
+    assert lru.set("c", b"cccc", 4) == 1
+    assert lru.get("a") is None and lru.total_bytes == 8
+    lru.delete_prefix("b")
+    assert len(lru) == 1 and lru.total_bytes == 4
@@ -0,0 +1,199 @@
+import asyncio
+import json
+import threading
+import time
+
+import grpc
+import pytest
+
+from naptha_sdk.client.connections import WS_MAX_IN_FLIGHT, GrpcChannelPool, WebSocketConnection, WebSocketPool
+
+
+def test_grpc_channel_pool_shares_stubs_per_address():
+    """Test that stubs are cached per node address and reopened after close."""
+    async def run():
+        pool = GrpcChannelPool()
+        stub = pool.get_stub("localhost:7002")
+        assert pool.get_stub("localhost:7002") is stub
+        assert pool.get_stub("localhost:7003") is not stub
+        await pool.close("localhost:7002")
+        assert pool.get_stub("localhost:7002") is not stub
+        await pool.close()
+        assert pool._channels == {}
+
+    asyncio.run(run())
+
+
+def test_grpc_channel_pool_replaces_channels_from_other_loops():
+    """Test that a channel created on a finished event loop is not reused."""
+    pool = GrpcChannelPool()
+
+    async def get_stub():
+        stub = pool.get_stub("localhost:7002")
+        await asyncio.gather(*pool._closing)
+        return stub
+
+    first = asyncio.run(get_stub())
+    first_channel = pool._channels["localhost:7002"][0]
+    second = asyncio.run(get_stub())
+    assert first is not second
+    assert first_channel.get_state() == grpc.ChannelConnectivity.SHUTDOWN
+
+    asyncio.run(pool.close())
+
+
+class FakeWebSocket:
+    """In-memory WebSocket that replies to each message through a handler."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.sent = []
+        self.replies = asyncio.Queue()
+        self.closed = False
+
+    async def send(self, raw):
+        message = json.loads(raw)
+        self.sent.append(message)
+        asyncio.get_running_loop().call_later(message.get("delay", 0), self.replies.put_nowait, self.reply(message))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raw = await self.replies.get()
+        if raw is None:
+            raise StopAsyncIteration
+        return raw
+
+    async def close(self):
+        self.closed = True
+        self.replies.put_nowait(None)
+
+
+def make_connection(reply, max_in_flight=WS_MAX_IN_FLIGHT):
+    sockets = []
+
+    async def connect(url):
+        sockets.append(FakeWebSocket(reply))
+        return sockets[-1]
+
+    return WebSocketConnection("ws://localhost:7002/ws/tool/run/client", max_in_flight=max_in_flight, connect=connect), sockets
+
+
+def test_websocket_connection_matches_replies_by_request_id():
+    """Test that concurrent requests share one connection and get their own replies out of order."""
+    connection, sockets = make_connection(lambda message: json.dumps({"request_id": message["request_id"], "n": message["n"]}))
+
+    async def run():
+        replies = await asyncio.gather(*[connection.request({"n": n, "delay": 0.03 - n * 0.01}) for n in range(3)])
+        await connection.close()
+        return replies
+
+    assert asyncio.run(run()) == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert len(sockets) == 1
+
+
+def test_websocket_connection_matches_replies_in_order_without_ids():
+    """Test that replies without a request_id are matched to the oldest outstanding request."""
+    connection, _ = make_connection(lambda message: json.dumps({"n": message["n"]}))
+
+    async def run():
+        replies = await asyncio.gather(*[connection.request({"n": n}) for n in range(3)])
+        await connection.close()
+        return replies
+
+    assert asyncio.run(run()) == [{"n": 0}, {"n": 1}, {"n": 2}]
+
+
+def test_websocket_connection_reconnects_after_close():
+    """Test that outstanding requests fail when the connection drops and the next request reconnects."""
+    connection, sockets = make_connection(lambda message: json.dumps({"n": message["n"]}))
+
+    async def run():
+        pending = asyncio.create_task(connection.request({"n": 0, "delay": 10}))
+        await asyncio.sleep(0.01)
+        await sockets[0].close()
+        with pytest.raises(ConnectionError):
+            await pending
+        reply = await connection.request({"n": 1})
+        await connection.close()
+        return reply
+
+    assert asyncio.run(run()) == {"n": 1}
+    assert len(sockets) == 2
+
+
+def test_websocket_connection_drops_replies_to_cancelled_requests():
+    """Test that a late reply to a timed-out request is dropped, not delivered to the next one."""
+    connection, _ = make_connection(lambda message: json.dumps({"request_id": message["request_id"], "n": message["n"]}))
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(connection.request({"n": 0, "delay": 0.02}), 0.01)
+        reply = await connection.request({"n": 1, "delay": 0.03})
+        await connection.close()
+        return reply
+
+    assert asyncio.run(run()) == {"n": 1}
+
+
+def test_websocket_connection_resets_when_request_without_id_is_cancelled():
+    """Test that the late reply to a cancelled request is not taken as the answer to the next one when the node sends no ids."""
+    connection, sockets = make_connection(lambda message: json.dumps({"n": message["n"]}))
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(connection.request({"n": 0, "delay": 0.02}), 0.01)
+        reply = await connection.request({"n": 1, "delay": 0.03})
+        await connection.close()
+        return reply
+
+    assert asyncio.run(run()) == {"n": 1}
+    assert len(sockets) == 2
+
+
+def test_websocket_connection_skips_frames_that_are_not_json():
+    """Test that a malformed frame is skipped without failing the connection."""
+    connection, sockets = make_connection(lambda message: json.dumps({"request_id": message["request_id"], "n": message["n"]}))
+
+    async def run():
+        await connection.request({"n": 0})
+        sockets[0].replies.put_nowait("not json")
+        reply = await connection.request({"n": 1})
+        await connection.close()
+        return reply
+
+    assert asyncio.run(run()) == {"n": 1}
+    assert len(sockets) == 1
+
+
+def test_websocket_pool_closes_connections_replaced_from_other_loops():
+    """Test that a connection replaced by one for another event loop is closed on its own loop, and that finished loops close theirs."""
+    pool = WebSocketPool()
+    sockets = []
+
+    async def connect(url):
+        sockets.append(FakeWebSocket(lambda message: json.dumps({"n": message["n"]})))
+        return sockets[-1]
+
+    async def request():
+        connection = pool.get_connection("http://localhost:7002", "tool/run")
+        connection._connect = connect
+        return await connection.request({"n": 0})
+
+    thread_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=thread_loop.run_forever)
+    thread.start()
+    try:
+        asyncio.run_coroutine_threadsafe(request(), thread_loop).result(5)
+        asyncio.run(request())
+        deadline = time.monotonic() + 5
+        while not sockets[0].closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        thread_loop.call_soon_threadsafe(thread_loop.stop)
+        thread.join()
+        thread_loop.close()
+
+    assert sockets[0].closed
+    assert sockets[1].closed
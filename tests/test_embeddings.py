@@ -0,0 +1,42 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from naptha_sdk.inference import embedding_batches
+
+
+def test_batches_respect_count_and_size():
+    """Test that batches are capped by count and characters, and oversized texts go alone."""
+    texts = ["a" * 10, "b" * 10, "c" * 10, "d" * 100, "e"]
+    assert [len(batch) for batch in embedding_batches(texts, batch_size=2, max_batch_chars=25)] == [2, 1, 1, 1]
+    assert list(embedding_batches([], batch_size=2, max_batch_chars=25)) == []
+
+
+def test_embed_batches_concurrently_and_keeps_order(make_inference_client):
+    """Test that embed splits texts into concurrent batches and returns rows in input order."""
+    np = pytest.importorskip("numpy")
+    state = {"active": 0, "max_active": 0, "batches": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        state["batches"] += 1
+        state["active"] += 1
+        state["max_active"] = max(state["max_active"], state["active"])
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        # Reply out of order to check rows are placed by index
+        data = [{"index": i, "embedding": [float(text), 0.5]} for i, text in enumerate(body["input"])]
+        return httpx.Response(200, json={"data": data[::-1], "model": body["model"]})
+
+    async def run():
+        async with make_inference_client(handler) as inference_client:
+            return await inference_client.embed([str(n) for n in range(50)], model="embed-model", batch_size=8, concurrency=3)
+
+    embeddings = asyncio.run(run())
+    assert embeddings.shape == (50, 2)
+    assert embeddings.dtype == np.float32 and embeddings.flags["C_CONTIGUOUS"]
+    assert embeddings[:, 0].tolist() == list(range(50))
+    assert state["batches"] == 7
+    assert state["max_active"] <= 3
@@ -0,0 +1,71 @@
+import asyncio
+
+from naptha_sdk.client.hedging import HedgePolicy
+
+
+def warm_policy(**kwargs) -> HedgePolicy:
+    """Create a hedge policy with enough fast latency samples to start hedging."""
+    policy = HedgePolicy(min_delay=0.01, min_samples=5, **kwargs)
+    for _ in range(5):
+        policy.latencies.record(0.001)
+    return policy
+
+
+def test_slow_primary_is_hedged():
+    """Test that a hedge is sent after the delay and its answer is used."""
+    policy = warm_policy(budget_ratio=1)
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append("primary")
+            raise
+        return "primary"
+
+    async def fast():
+        return "hedge"
+
+    result = asyncio.run(policy.run([slow, fast]))
+    assert result == "hedge"
+    assert policy.hedges == 1 and policy.hedge_wins == 1
+    assert cancelled == ["primary"]
+
+
+def test_no_hedge_before_enough_samples():
+    """Test that nothing is hedged until the latency window has min_samples."""
+    policy = HedgePolicy(min_delay=0.01, min_samples=5, budget_ratio=1)
+    calls = []
+
+    async def primary():
+        await asyncio.sleep(0.03)
+        calls.append("primary")
+        return "primary"
+
+    async def hedge():
+        calls.append("hedge")
+        return "hedge"
+
+    assert asyncio.run(policy.run([primary, hedge])) == "primary"
+    assert calls == ["primary"]
+    assert policy.hedges == 0
+
+
+def test_hedges_are_capped_by_budget():
+    """Test that the token bucket limits how many calls get hedged."""
+    policy = warm_policy(budget_ratio=0.5, max_tokens=1, percentile=50)
+
+    async def slow():
+        await asyncio.sleep(0.03)
+        return "primary"
+
+    async def fast():
+        return "hedge"
+
+    async def run():
+        return [await policy.run([slow, fast]) for _ in range(4)]
+
+    results = asyncio.run(run())
+    assert policy.hedges == 2
+    assert results.count("hedge") == 2
@@ -0,0 +1,142 @@
+import asyncio
+import heapq
+import json
+import random
+import types
+
+import httpx
+
+from naptha_sdk.cache import InferenceCache
+from naptha_sdk.client import limiter as limiter_module
+from naptha_sdk.client.limiter import AIMDLimiter
+from naptha_sdk.client.resilience import RetryPolicy
+
+
+def make_requests(count: int):
+    for n in range(count):
+        yield {"model": "test-model", "messages": [{"role": "user", "content": str(n)}]}
+
+
+def test_run_batch_backs_off_on_overload_and_keeps_order(make_inference_client, completion):
+    """Test that 429s shrink the concurrency limit, are retried, and results come back in order."""
+    state = {"active": 0, "rejected": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if state["active"] >= 3:
+            state["rejected"] += 1
+            return httpx.Response(429)
+        state["active"] += 1
+        await asyncio.sleep(0.005)
+        state["active"] -= 1
+        return httpx.Response(200, json=completion(json.loads(request.content)["messages"][0]["content"]))
+
+    async def run():
+        inference_client = make_inference_client(handler)
+        limiter = AIMDLimiter(initial_limit=8)
+        async with inference_client:
+            results = await inference_client.run_batch(make_requests(30), limiter=limiter, retry_policy=RetryPolicy(attempts=20, backoff=0.001, max_backoff=0.01))
+        return results, limiter
+
+    results, limiter = asyncio.run(run())
+    assert [result.index for result in results] == list(range(30))
+    assert not any(result.error for result in results)
+    assert [result.response.choices[0].message.content for result in results] == [str(n) for n in range(30)]
+    assert state["rejected"] > 0
+    assert limiter.limit < 8
+    assert limiter.in_flight == 0
+
+
+def test_run_batch_reports_client_errors_without_retrying(make_inference_client, completion):
+    """Test that a 400 is reported per item and does not change the limit."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        content = json.loads(request.content)["messages"][0]["content"]
+        calls.append(content)
+        if content == "1":
+            return httpx.Response(400, json={"detail": "bad request"})
+        return httpx.Response(200, json=completion(content))
+
+    async def run():
+        inference_client = make_inference_client(handler)
+        limiter = AIMDLimiter(initial_limit=4)
+        async with inference_client:
+            return await inference_client.run_batch(make_requests(3), limiter=limiter), limiter
+
+    results, limiter = asyncio.run(run())
+    assert [result.error for result in results] == [False, True, False]
+    assert calls.count("1") == 1
+    assert limiter.limit >= 4
+
+
+def test_limiter_grows_additively_and_shrinks_once_per_round():
+    """Test AIMD: +1/limit per success, one halving for a burst of overloads."""
+    async def run():
+        limiter = AIMDLimiter(initial_limit=4, latency_tolerance=1000)
+        starts = [await limiter.acquire() for _ in range(4)]
+        for start in starts:
+            limiter.record_success(start)
+        grown = limiter._limit
+        starts = [await limiter.acquire() for _ in range(4)]
+        for start in starts:
+            limiter.record_overload(start)
+        return grown, limiter.limit
+
+    grown, limit = asyncio.run(run())
+    assert 4.9 < grown < 5
+    assert limit == 2
+
+
+def test_run_batch_ignores_cache_hits_for_latency(make_inference_client, completion):
+    """Test that instant cache hits do not feed the limiter's latency baseline."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.005)
+        return httpx.Response(200, json=completion(json.loads(request.content)["messages"][0]["content"]))
+
+    cached_request = {"model": "test-model", "messages": [{"role": "user", "content": "cached"}], "temperature": 0}
+
+    async def run():
+        inference_client = make_inference_client(handler, cache=InferenceCache())
+        limiter = AIMDLimiter(initial_limit=4)
+        async with inference_client:
+            await inference_client.run_inference(cached_request)
+            await inference_client.run_batch([cached_request, *make_requests(40)], limiter=limiter)
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter.baseline_latency > 0.004
+    assert limiter.limit > 4
+    assert limiter.in_flight == 0
+
+
+def simulate_limiter(monkeypatch, latency, calls=2000):
+    """Run calls through an AIMDLimiter on a simulated clock, where latency(in_flight) gives each call's duration."""
+    clock = types.SimpleNamespace(now=0.0)
+    monkeypatch.setattr(limiter_module, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+
+    async def run():
+        limiter = AIMDLimiter(initial_limit=8)
+        running, started = [], 0
+        while started < calls or running:
+            while started < calls and limiter.in_flight < limiter.limit:
+                start = await limiter.acquire()
+                heapq.heappush(running, (start + latency(limiter.in_flight), start))
+                started += 1
+            clock.now, start = heapq.heappop(running)
+            limiter.record_success(start)
+        return limiter
+
+    return asyncio.run(run())
+
+
+def test_limiter_is_not_cut_by_varied_latency(monkeypatch):
+    """Test that a mix of short and long prompts on an idle node does not read as overload."""
+    sizes = random.Random(0)
+    limiter = simulate_limiter(monkeypatch, lambda in_flight: sizes.choice([0.005, 0.05]))
+    assert limiter.limit > 8
+
+
+def test_limiter_stays_near_capacity_of_queueing_node(monkeypatch):
+    """Test that a node which slows down past 16 concurrent calls keeps the limit from growing beyond it."""
+    limiter = simulate_limiter(monkeypatch, lambda in_flight: 0.01 if in_flight <= 16 else 0.1)
+    assert limiter.limit <= 16
@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from naptha_sdk.client.limiter import InferenceScheduler
+from naptha_sdk.inference import InferenceCascade
+from naptha_sdk.schemas import LLMConfig, RateLimits
+
+TIERS = [LLMConfig(model="small", max_tokens=100), LLMConfig(model="large")]
+REQUEST = {"model": "any", "messages": [{"role": "user", "content": "hi"}], "max_tokens": 500}
+
+
+@pytest.fixture
+def make_cascade(make_inference_client, completion):
+    """Build a cascade over a mock node that answers with the model name after a per-model delay."""
+    def make(delays, client_kwargs=None, **kwargs):
+        bodies = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            bodies.append(body)
+            await asyncio.sleep(delays.get(body["model"], 0))
+            return httpx.Response(200, json=completion(body["model"], model=body["model"]))
+
+        return InferenceCascade(make_inference_client(handler, **(client_kwargs or {})), TIERS, **kwargs), bodies
+
+    return make
+
+
+def test_small_model_answers_when_accepted(make_cascade):
+    """Test that an accepted answer from the first tier is returned without escalating."""
+    cascade, bodies = make_cascade({}, validator=lambda response: True)
+    result = asyncio.run(cascade.run_inference(REQUEST))
+    assert (result.tier, result.model, result.accepted) == (0, "small", True)
+    assert [body["model"] for body in bodies] == ["small"]
+    assert bodies[0]["max_tokens"] == 100
+    assert cascade.answered_by == [1, 0]
+
+
+def test_rejected_answer_escalates(make_cascade):
+    """Test that an answer rejected by an async validator escalates to the next tier."""
+    async def validator(response):
+        return response.choices[0].message.content == "large"
+
+    cascade, bodies = make_cascade({}, validator=validator)
+    result = asyncio.run(cascade.run_inference(REQUEST))
+    assert (result.tier, result.model) == (1, "large")
+    assert [attempt.outcome for attempt in result.attempts] == ["rejected", "accepted"]
+    assert bodies[1]["max_tokens"] == 500
+
+
+def test_slow_tier_escalates_after_latency_budget(make_cascade):
+    """Test that a tier exceeding the latency budget is abandoned for the next one."""
+    cascade, _ = make_cascade({"small": 1}, latency_budget=0.02)
+    result = asyncio.run(cascade.run_inference(REQUEST))
+    assert result.model == "large"
+    assert result.attempts[0].outcome == "timeout"
+    assert cascade.answered_by == [0, 1]
+
+
+def test_rate_limit_wait_does_not_count_against_latency_budget(make_cascade):
+    """Test that a tier queued by the client's scheduler is given its full latency budget once let through."""
+    scheduler = InferenceScheduler({"small": RateLimits(requests_per_minute=600)})
+    scheduler._queue("small").requests.level = 0
+    cascade, bodies = make_cascade({}, client_kwargs={"scheduler": scheduler}, latency_budget=0.05)
+    result = asyncio.run(cascade.run_inference(REQUEST))
+    assert result.model == "small"
+    assert [body["model"] for body in bodies] == ["small"]
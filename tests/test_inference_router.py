@@ -0,0 +1,85 @@
+import asyncio
+
+import httpx
+import pytest
+
+from naptha_sdk.inference import InferenceRouter
+from naptha_sdk.schemas import NodeConfig
+
+
+def make_node(port: int, models) -> NodeConfig:
+    return NodeConfig(
+        id=f"node:{port}", owner="owner", public_key="key", ip="localhost", http_port=port,
+        server_type="http", servers=[], models=models, docker_jobs=False, ports=[],
+    )
+
+
+def make_router(handlers, models) -> InferenceRouter:
+    """Create a router whose node clients are backed by mock transports."""
+    router = InferenceRouter([make_node(7001 + i, node_models) for i, node_models in enumerate(models)])
+    for client, handler in zip(router.clients, handlers):
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return router
+
+
+@pytest.fixture
+def answer(completion):
+    def make(content: str):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json=completion(content, model="m"))
+        return handler
+
+    return make
+
+
+def fail(status_code: int):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status_code, json={"detail": "failed"})
+    return handler
+
+
+def request(model: str) -> dict:
+    return {"model": model, "messages": [{"role": "user", "content": "hi"}]}
+
+
+def test_routes_to_node_serving_model(answer):
+    """Test that requests only go to nodes that list the requested model."""
+    async def run():
+        async with make_router([answer("a"), answer("b")], [["model-a"], ["model-b"]]) as router:
+            return [(await router.run_inference(request(model))).choices[0].message.content for model in ["model-b", "model-a", "model-b"]]
+
+    assert asyncio.run(run()) == ["b", "a", "b"]
+
+
+def test_fails_over_on_transient_error(answer):
+    """Test that a 503 from one node fails over to another node serving the model."""
+    async def run():
+        async with make_router([fail(503), answer("ok")], [["m"], ["m"]]) as router:
+            router.balancer.stats[1].latency = 10
+            response = await router.run_inference(request("m"))
+            return response, router
+
+    response, router = asyncio.run(run())
+    assert response.choices[0].message.content == "ok"
+    assert router.balancer.stats[0].consecutive_failures == 1
+    assert router.balancer.stats[0].outstanding == 0
+
+
+def test_client_errors_and_unknown_models_are_not_failed_over():
+    """Test that a 400 is raised without trying other nodes, and unknown models are rejected."""
+    calls = []
+
+    def counting(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200)
+
+    async def run():
+        async with make_router([fail(400), counting], [["m"], ["m"]]) as router:
+            router.balancer.stats[1].latency = 10
+            with pytest.raises(httpx.HTTPStatusError):
+                await router.run_inference(request("m"))
+            with pytest.raises(ValueError):
+                await router.run_inference(request("missing"))
+
+    asyncio.run(run())
+    assert calls == []
@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+import httpx
+
+
+REQUEST = {"model": "test-model", "messages": [{"role": "user", "content": "hi"}]}
+
+
+def make_chunk(content=None, role=None, finish_reason=None) -> str:
+    delta = {key: value for key, value in {"role": role, "content": content}.items() if value is not None}
+    chunk = {"id": "chatcmpl-1", "created": 1, "model": "test-model", "choices": [{"delta": delta, "finish_reason": finish_reason, "index": 0}]}
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+def test_stream_yields_deltas_before_completion_finishes(make_inference_client):
+    """Test that each delta is yielded as soon as it arrives, not after the whole body."""
+    bodies = []
+    first_seen = asyncio.Event()
+
+    async def events():
+        yield make_chunk(role="assistant", content="Hel").encode()
+        await first_seen.wait()
+        yield make_chunk(content="lo").encode()
+        yield make_chunk(finish_reason="stop").encode()
+        yield b"data: [DONE]\n\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=events())
+
+    async def run():
+        deltas = []
+        async with make_inference_client(handler) as inference_client:
+            async for chunk in inference_client.run_inference_stream(REQUEST):
+                first_seen.set()
+                deltas.append(chunk.choices[0].delta.content)
+        return deltas
+
+    assert asyncio.run(run()) == ["Hel", "lo", None]
+    assert bodies[0]["stream"] is True
+
+
+def test_stream_accepts_non_streaming_response(make_inference_client, completion):
+    """Test that a node answering with a whole completion yields a single chunk."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=completion("Hello"))
+
+    async def run():
+        async with make_inference_client(handler) as inference_client:
+            return [chunk async for chunk in inference_client.run_inference_stream(REQUEST)]
+
+    chunks = asyncio.run(run())
+    assert len(chunks) == 1
+    assert chunks[0].choices[0].delta.content == "Hello"
+    assert chunks[0].choices[0].finish_reason == "stop"
@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import httpx
+
+from naptha_sdk.metrics import Histogram, MetricsRegistry, RequestTimer
+
+REQUEST = {"model": "test-model", "messages": [{"role": "user", "content": "hi"}]}
+
+
+def metric(metrics: MetricsRegistry, name: str) -> dict:
+    return next(entry for entry in metrics.snapshot() if entry["name"] == name)
+
+
+def test_records_latency_and_throughput_by_model_and_node(make_inference_client, completion):
+    """Test that a completion records latency and tokens/sec labeled with model and node."""
+    metrics = MetricsRegistry()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        usage = {"prompt_tokens": 3, "completion_tokens": 12, "total_tokens": 15}
+        return httpx.Response(200, json={**completion(), "usage": usage})
+
+    async def run():
+        async with make_inference_client(handler, metrics=metrics) as inference_client:
+            return await inference_client.run_inference(REQUEST)
+
+    response = asyncio.run(run())
+    assert response.usage.completion_tokens == 12
+    latency = metric(metrics, "latency_seconds")
+    assert latency["labels"] == {"model": "test-model", "node": "http://localhost:7001"}
+    assert latency["count"] == 1
+    assert metric(metrics, "completion_tokens_per_second")["count"] == 1
+
+
+def test_stream_records_time_to_first_token(make_inference_client):
+    """Test that streaming records TTFT and counts content chunks as tokens without usage."""
+    metrics = MetricsRegistry()
+
+    async def events():
+        yield b'data: {"id": "c", "created": 1, "model": "m", "choices": [{"delta": {"content": "Hel"}, "index": 0}]}\n\n'
+        await asyncio.sleep(0.02)
+        yield b'data: {"id": "c", "created": 1, "model": "m", "choices": [{"delta": {"content": "lo"}, "index": 0}]}\n\n'
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=events())
+
+    async def run():
+        async with make_inference_client(handler, metrics=metrics) as inference_client:
+            async for _ in inference_client.run_inference_stream(REQUEST):
+                pass
+
+    asyncio.run(run())
+    ttft = metric(metrics, "time_to_first_token_seconds")
+    latency = metric(metrics, "latency_seconds")
+    assert ttft["count"] == 1 and ttft["max"] < latency["max"]
+    assert metric(metrics, "completion_tokens_per_second")["max"] < 2 / 0.02
+
+
+def test_request_timer_reads_trace_events():
+    """Test that connect time and first byte come from httpx trace events."""
+    async def run():
+        timer = RequestTimer()
+        await timer("connection.connect_tcp.started", {})
+        await timer("connection.start_tls.complete", {})
+        await timer("http11.receive_response_headers.complete", {})
+        return timer
+
+    timer = asyncio.run(run())
+    assert timer.connect_time is not None
+    assert timer.first_byte_time >= timer.connect_time
+
+
+def test_histogram_percentiles_and_dump(tmp_path):
+    """Test bucket percentiles and that dump writes a JSON snapshot."""
+    histogram = Histogram([1, 2, 4, 8])
+    for value in [0.5, 1.5, 3, 3, 7, 100]:
+        histogram.observe(value)
+    assert histogram.percentile(50) == 4
+    assert histogram.percentile(100) == 100
+
+    metrics = MetricsRegistry()
+    metrics.observe("latency_seconds", 0.1, model="m", node="n")
+    metrics.dump(tmp_path / "metrics.json")
+    dumped = json.loads((tmp_path / "metrics.json").read_text())
+    assert dumped["metrics"][0]["labels"] == {"model": "m", "node": "n"}
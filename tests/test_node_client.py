@@ -0,0 +1,172 @@
+import asyncio
+
+import grpc
+import pytest
+
+from naptha_sdk.client import grpc_server_pb2
+from naptha_sdk.client.balancer import PortBalancer
+from naptha_sdk.client.connections import grpc_channel_pool
+from naptha_sdk.client.node import NodeClient
+from naptha_sdk.client.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+from naptha_sdk.schemas import NodeConfig, NodeConfigUser, ToolDeployment, ToolRunInput
+
+
+def make_node(server_type: str = "grpc", ports=None) -> NodeConfig:
+    return NodeConfig(
+        id="node:test",
+        owner="owner",
+        public_key="public_key",
+        ip="localhost",
+        http_port=7001,
+        server_type=server_type,
+        servers=[],
+        models=[],
+        docker_jobs=False,
+        ports=ports or [7002],
+    )
+
+
+def make_tool_run_input() -> ToolRunInput:
+    deployment = ToolDeployment(
+        name="tool_deployment_1",
+        module={"name": "test_tool", "module_type": "tool"},
+        node=NodeConfigUser(ip="localhost", http_port=7001, server_type="grpc")
+    )
+    return ToolRunInput(consumer_id="user:test", inputs={"tool_name": "test_tool"}, deployment=deployment, signature="sig")
+
+
+class StreamingStub:
+    """Fake gRPC stub that streams a run through several updates, after failing the first `failures` calls."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.requests = []
+        self.metadata = []
+
+    def RunModule(self, request, metadata=None):
+        self.requests.append(request)
+        self.metadata.append(dict(metadata or ()))
+        failed = len(self.requests) <= self.failures
+
+        async def updates():
+            if failed:
+                raise grpc.aio.AioRpcError(grpc.StatusCode.UNAVAILABLE, grpc.aio.Metadata(), grpc.aio.Metadata(), "node restarting")
+            yield grpc_server_pb2.ModuleRun(id="tool_run:1", status="running")
+            yield grpc_server_pb2.ModuleRun(id="tool_run:1", status="running", results=["partial"])
+            yield grpc_server_pb2.ModuleRun(id="tool_run:1", status="completed", results=["partial", "final"])
+
+        return updates()
+
+
+def test_run_module_stream_yields_each_update(monkeypatch):
+    """Test that every streamed ModuleRun update is yielded with its partial results."""
+    stub = StreamingStub()
+    monkeypatch.setattr(grpc_channel_pool, "get_stub", lambda address: stub)
+
+    async def run():
+        node_client = NodeClient(make_node())
+        return [tool_run async for tool_run in node_client.run_module_stream("tool", make_tool_run_input())]
+
+    updates = asyncio.run(run())
+    assert [update.status for update in updates] == ["running", "running", "completed"]
+    assert [update.results for update in updates] == [[], ["partial"], ["partial", "final"]]
+    assert stub.requests[0].tool_deployment.module.name == "test_tool"
+
+
+def test_run_module_grpc_returns_final_update(monkeypatch):
+    """Test that run_module_grpc still returns only the finished run."""
+    monkeypatch.setattr(grpc_channel_pool, "get_stub", lambda address: StreamingStub())
+
+    async def run():
+        node_client = NodeClient(make_node())
+        return await node_client.run_module("tool", make_tool_run_input().model_dict())
+
+    tool_run = asyncio.run(run())
+    assert tool_run.status == "completed"
+    assert tool_run.results == ["partial", "final"]
+
+
+def test_run_module_stream_retries_with_idempotency_key(monkeypatch):
+    """Test that a stream failing before its first update is retried with the same idempotency key."""
+    stub = StreamingStub(failures=1)
+    monkeypatch.setattr(grpc_channel_pool, "get_stub", lambda address: stub)
+
+    async def run():
+        node_client = NodeClient(make_node(), retry_policy=RetryPolicy(backoff=0))
+        node_client.circuit_breaker = CircuitBreaker("node")
+        updates = [tool_run async for tool_run in node_client.run_module_stream("tool", make_tool_run_input())]
+        return updates, node_client.circuit_breaker
+
+    updates, breaker = asyncio.run(run())
+    assert [update.status for update in updates] == ["running", "running", "completed"]
+    assert len(stub.metadata) == 2
+    assert stub.metadata[0]["idempotency-key"] == stub.metadata[1]["idempotency-key"]
+    assert breaker.consecutive_failures == 0
+
+
+def test_run_module_stream_goes_through_circuit_breaker(monkeypatch):
+    """Test that streaming a run fails fast while the node's circuit is open."""
+    stub = StreamingStub()
+    monkeypatch.setattr(grpc_channel_pool, "get_stub", lambda address: stub)
+
+    async def run():
+        node_client = NodeClient(make_node())
+        node_client.circuit_breaker = CircuitBreaker("node", failure_threshold=1)
+        node_client.circuit_breaker.record_failure()
+        return [tool_run async for tool_run in node_client.run_module_stream("tool", make_tool_run_input())]
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(run())
+    assert stub.requests == []
+
+
+def test_balancer_routes_to_least_loaded_port():
+    """Test that requests go to the port with the fewest outstanding requests and lowest latency."""
+    balancer = PortBalancer([7002, 7003])
+    balancer.record_success(7002, 0.5)
+    balancer.record_success(7003, 0.1)
+    assert balancer.pick() == 7003
+
+    balancer.stats[7003].outstanding = 10
+    assert balancer.pick() == 7002
+
+
+def test_balancer_ejects_failing_ports_until_healthy():
+    """Test that repeated failures eject a port and a passing health check restores it."""
+    balancer = PortBalancer([7002, 7003], failure_threshold=2)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                async with balancer.track(7002):
+                    raise ConnectionError("down")
+        assert {balancer.pick() for _ in range(20)} == {7003}
+
+        await balancer.check_health(lambda port: asyncio.sleep(0, result=port == 7002))
+        assert {balancer.pick() for _ in range(20)} == {7002}
+
+    asyncio.run(run())
+
+
+def test_node_client_health_check_uses_is_alive(monkeypatch):
+    """Test that NodeClient health checks call is_alive on every port."""
+    checked = []
+
+    class AliveStub:
+        def __init__(self, address):
+            self.address = address
+
+        async def is_alive(self, request, timeout=None):
+            checked.append(self.address)
+            return grpc_server_pb2.GeneralResponse(ok=self.address.endswith("7002"))
+
+    monkeypatch.setattr(grpc_channel_pool, "get_stub", AliveStub)
+
+    async def run():
+        node_client = NodeClient(make_node(ports=[7002, 7003, 7004]))
+        await node_client.check_health()
+        return node_client.balancer
+
+    balancer = asyncio.run(run())
+    assert sorted(checked) == ["localhost:7002", "localhost:7003", "localhost:7004"]
+    assert {balancer.pick() for _ in range(20)} == {7002}
@@ -0,0 +1,130 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from naptha_sdk.client.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, call_with_resilience
+from naptha_sdk.schemas import ToolDeployment, ToolRunInput
+
+
+def test_transient_errors_are_retried():
+    """Test that transient errors are retried until the call succeeds."""
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise httpx.ConnectError("refused")
+        return "ok"
+
+    result = asyncio.run(call_with_resilience(flaky, RetryPolicy(attempts=3, backoff=0)))
+    assert result == "ok"
+    assert len(attempts) == 3
+
+
+def test_non_transient_errors_are_not_retried():
+    """Test that client errors are raised straight away."""
+    attempts = []
+
+    async def bad_request():
+        attempts.append(1)
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        asyncio.run(call_with_resilience(bad_request, RetryPolicy(attempts=3, backoff=0)))
+    assert len(attempts) == 1
+
+
+def test_circuit_breaker_opens_and_half_opens(node):
+    """Test that the circuit fails fast after repeated failures and lets a trial through after the timeout."""
+    breaker = CircuitBreaker("node", failure_threshold=2, reset_timeout=0.05)
+
+    async def down():
+        raise httpx.ConnectError("refused")
+
+    async def up():
+        return "ok"
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(httpx.ConnectError):
+                await call_with_resilience(down, circuit_breaker=breaker)
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            await call_with_resilience(up, circuit_breaker=breaker)
+        await asyncio.sleep(0.06)
+        assert breaker.state == "half_open"
+        assert await call_with_resilience(up, circuit_breaker=breaker) == "ok"
+        assert breaker.state == "closed"
+
+    asyncio.run(run())
+
+
+def test_run_submission_retries_reuse_idempotency_key(make_user_client, node):
+    """Test that a retried run submission carries the same idempotency key."""
+    keys = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        keys.append(request.headers["Idempotency-Key"])
+        if len(keys) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={**json.loads(request.content), "id": "tool_run:1", "status": "pending"})
+
+    deployment = ToolDeployment(module={"name": "test_tool"}, node=node)
+    run_input = ToolRunInput(consumer_id="user:test", inputs={}, deployment=deployment, signature="sig")
+
+    async def run():
+        async with make_user_client(handler, retry_policy=RetryPolicy(backoff=0)) as user_client:
+            return await user_client.run_tool(run_input)
+
+    tool_run = asyncio.run(run())
+    assert tool_run.id == "tool_run:1"
+    assert len(keys) == 2 and keys[0] == keys[1]
+
+
+def test_cancelled_half_open_trial_releases_circuit(node):
+    """Test that cancelling the trial call of a half-open circuit lets the next call through."""
+    breaker = CircuitBreaker("node", failure_threshold=1, reset_timeout=0)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def up():
+        return "ok"
+
+    async def run():
+        breaker.record_failure()
+        assert breaker.state == "half_open"
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(call_with_resilience(hang, circuit_breaker=breaker), 0.01)
+        assert await call_with_resilience(up, circuit_breaker=breaker) == "ok"
+        assert breaker.state == "closed"
+
+    asyncio.run(run())
+
+
+def test_cancelled_inference_stream_releases_circuit(make_user_client, node):
+    """Test that cancelling an inference stream while it waits on the node releases the half-open trial."""
+    async def events():
+        await asyncio.sleep(10)
+        yield b"data: [DONE]\n\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=events())
+
+    async def run():
+        user_client = make_user_client(handler)
+        user_client.circuit_breaker = CircuitBreaker("node", failure_threshold=1, reset_timeout=0)
+        user_client.circuit_breaker.record_failure()
+
+        async def consume():
+            request = {"model": "test-model", "messages": [{"role": "user", "content": "hi"}]}
+            return [chunk async for chunk in user_client.run_inference_stream(request)]
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(consume(), 0.05)
+        user_client.circuit_breaker.before_call()
+        await user_client.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,57 @@
+import asyncio
+
+from naptha_sdk.client.limiter import PRIORITY_BATCH, PRIORITY_INTERACTIVE, InferenceScheduler, TokenBucket, estimate_tokens
+from naptha_sdk.schemas import ChatCompletionRequest, RateLimits
+
+
+def grant_order(scheduler: InferenceScheduler, priorities):
+    """Queue one request per priority on an exhausted budget and return the order they are let through."""
+    async def run():
+        scheduler._queue("m").requests.level = 0
+        order = []
+
+        async def request(name, priority):
+            await scheduler.acquire("m", priority=priority)
+            order.append(name)
+
+        tasks = []
+        for name, priority in priorities:
+            tasks.append(asyncio.create_task(request(name, priority)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return order
+
+    return asyncio.run(run())
+
+
+def test_interactive_requests_overtake_queued_batch():
+    """Test that a later interactive request is let through before earlier batch requests."""
+    scheduler = InferenceScheduler({"m": RateLimits(requests_per_minute=1200)})
+    order = grant_order(scheduler, [("batch1", PRIORITY_BATCH), ("batch2", PRIORITY_BATCH), ("interactive", PRIORITY_INTERACTIVE)])
+    assert order == ["interactive", "batch1", "batch2"]
+
+
+def test_long_waiting_requests_are_not_starved():
+    """Test that requests past max_wait are served in arrival order regardless of priority."""
+    scheduler = InferenceScheduler({"m": RateLimits(requests_per_minute=1200)}, max_wait=0)
+    order = grant_order(scheduler, [("batch1", PRIORITY_BATCH), ("interactive", PRIORITY_INTERACTIVE)])
+    assert order == ["batch1", "interactive"]
+
+
+def test_unlimited_models_are_not_delayed():
+    """Test that a model without limits is let through straight away."""
+    async def run():
+        scheduler = InferenceScheduler({"m": RateLimits(requests_per_minute=1)})
+        await asyncio.wait_for(asyncio.gather(*[scheduler.acquire("other", 10**6) for _ in range(100)]), 0.1)
+
+    asyncio.run(run())
+
+
+def test_token_budget_uses_estimates():
+    """Test token estimation and that an oversized take puts the bucket in debt."""
+    request = ChatCompletionRequest(model="m", messages=[{"role": "user", "content": "x" * 400}], max_tokens=50)
+    assert estimate_tokens(request) == 150
+    bucket = TokenBucket(rate_per_minute=6000, capacity=100)
+    assert bucket.time_until(150) == 0
+    bucket.take(150)
+    assert 0.9 < bucket.time_until(50) < 1.1
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import httpx
+
+from naptha_sdk.client.singleflight import SingleFlight
+
+REQUEST = {"model": "test-model", "messages": [{"role": "system", "content": "Be brief"}, {"role": "user", "content": "hi"}]}
+
+
+def test_identical_requests_share_one_call(make_inference_client, completion):
+    """Test that concurrent identical requests reach the node once and all get the answer."""
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content))
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=completion())
+
+    async def run():
+        async with make_inference_client(handler, coalesce=True) as inference_client:
+            responses = await asyncio.gather(*[inference_client.run_inference(REQUEST) for _ in range(10)])
+            await inference_client.run_inference(REQUEST)
+        return responses
+
+    responses = asyncio.run(run())
+    assert len(calls) == 2
+    assert all(response.choices[0].message.content == "Hello" for response in responses)
+    assert responses[0] is not responses[1]
+
+
+def test_stream_subscribers_share_and_replay_deltas(make_inference_client):
+    """Test that a subscriber joining mid-stream receives every delta from the start."""
+    calls = []
+    release = asyncio.Event()
+
+    async def events():
+        yield b'data: {"id": "c", "created": 1, "model": "m", "choices": [{"delta": {"content": "Hel"}, "index": 0}]}\n\n'
+        await release.wait()
+        yield b'data: {"id": "c", "created": 1, "model": "m", "choices": [{"delta": {"content": "lo"}, "index": 0}]}\n\n'
+        yield b"data: [DONE]\n\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=events())
+
+    async def run():
+        async with make_inference_client(handler, coalesce=True) as inference_client:
+            async def collect(on_first=None):
+                deltas = []
+                async for chunk in inference_client.run_inference_stream(REQUEST):
+                    deltas.append(chunk.choices[0].delta.content)
+                    if on_first is not None:
+                        await on_first()
+                        on_first = None
+                return deltas
+
+            async def join_late():
+                late.append(asyncio.create_task(collect()))
+                await asyncio.sleep(0.01)
+                release.set()
+
+            late = []
+            first = await collect(on_first=join_late)
+            return first, await late[0]
+
+    first, second = asyncio.run(run())
+    assert first == second == ["Hel", "lo"]
+    assert len(calls) == 1
+
+
+def test_upstream_is_cancelled_when_all_waiters_leave():
+    """Test that cancelling the only waiter cancels the shared call."""
+    cancelled = asyncio.Event()
+
+    async def call():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def run():
+        single_flight = SingleFlight()
+        waiter = asyncio.create_task(single_flight.do("key", call))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return single_flight
+
+    single_flight = asyncio.run(run())
+    assert single_flight._flights == {}
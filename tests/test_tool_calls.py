@@ -0,0 +1,82 @@
+import asyncio
+import json
+import time
+
+import httpx
+
+from naptha_sdk.modules import tool as tool_module
+from naptha_sdk.modules.tool import run_inference_with_tools, run_tool_calls
+from naptha_sdk.schemas import ModelResponse, NodeConfig, ToolDeployment, ToolRun
+
+TOOL_NODE = NodeConfig(
+    id="node:tools", owner="owner", public_key="key", ip="localhost", http_port=7001,
+    server_type="grpc", servers=[], models=[], docker_jobs=False, ports=[7002],
+)
+DEPLOYMENTS = {name: ToolDeployment(node=TOOL_NODE, module={"name": name}) for name in ["weather", "stocks"]}
+
+
+def tool_call_response(*calls) -> dict:
+    return {
+        "id": "chatcmpl-1", "created": 1, "model": "m", "object": "chat.completion",
+        "choices": [{
+            "message": {"role": "assistant", "content": None, "tool_calls": [
+                {"id": f"call_{i}", "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+                for i, (name, arguments) in enumerate(calls)
+            ]},
+            "finish_reason": "tool_calls",
+            "index": 0,
+        }],
+    }
+
+
+def fake_tool(monkeypatch, delay: float = 0.05):
+    """Replace remote tool runs with a local one that echoes its input after a delay."""
+    async def call_tool_func(self, tool_run_input):
+        await asyncio.sleep(delay)
+        data = tool_run_input.inputs["tool_input_data"]
+        assert isinstance(data, str)
+        data = json.loads(data)
+        return ToolRun(**tool_run_input.model_dict(), status="completed", results=[f"{tool_run_input.inputs['tool_name']}:{data['q']}"])
+
+    monkeypatch.setattr(tool_module.Tool, "call_tool_func", call_tool_func)
+
+
+def test_tool_calls_run_concurrently_and_keep_order(monkeypatch):
+    """Test that a turn takes as long as one tool, and results keep the order of the calls."""
+    fake_tool(monkeypatch)
+    response = ModelResponse(**tool_call_response(("weather", {"q": "a"}), ("stocks", {"q": "b"}), ("weather", {"q": "c"}), ("missing", {})))
+
+    start = time.monotonic()
+    messages = asyncio.run(run_tool_calls(response, DEPLOYMENTS, "user:test", "sig"))
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.12
+    assert [message.content for message in messages] == ["weather:a", "stocks:b", "weather:c", "Error: unknown tool missing"]
+    assert [message.tool_call_id for message in messages] == ["call_0", "call_1", "call_2", "call_3"]
+    assert all(message.role == "tool" for message in messages)
+
+
+def test_tool_results_are_fed_back_to_the_model(monkeypatch, make_inference_client, completion):
+    """Test that tool results are sent in a follow-up request and the final answer is returned."""
+    fake_tool(monkeypatch, delay=0)
+    bodies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        if len(bodies) == 1:
+            return httpx.Response(200, json=tool_call_response(("weather", {"q": "a"})))
+        return httpx.Response(200, json=completion("It is sunny", model="m"))
+
+    async def run():
+        async with make_inference_client(handler) as inference_client:
+            return await run_inference_with_tools(
+                inference_client,
+                {"model": "m", "messages": [{"role": "user", "content": "weather?"}], "tools": [{"type": "function"}]},
+                DEPLOYMENTS, "user:test", "sig",
+            )
+
+    response = asyncio.run(run())
+    assert response.choices[0].message.content == "It is sunny"
+    follow_up = bodies[1]["messages"]
+    assert [message["role"] for message in follow_up] == ["user", "assistant", "tool"]
+    assert follow_up[2]["content"] == "weather:a" and follow_up[2]["tool_call_id"] == "call_0"
@@ -0,0 +1,202 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from naptha_sdk.client.node import UserClient, poll_intervals
+from naptha_sdk.schemas import NodeConfigUser, ToolDeployment, ToolRunInput
+
+
+def test_client_is_reused_until_closed(node):
+    """Test that the pooled client is shared between calls and recreated after close."""
+    async def run():
+        user_client = UserClient(node)
+        client = user_client.client
+        assert user_client.client is client
+        await user_client.aclose()
+        assert client.is_closed
+        assert user_client.client is not client
+        await user_client.aclose()
+
+    asyncio.run(run())
+
+
+def test_requests_share_pooled_client(make_user_client):
+    """Test that several requests go through the same pooled client."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        return httpx.Response(200, json={"is_registered": True, "public_key": json.loads(request.content)["public_key"]})
+
+    async def run():
+        async with make_user_client(handler) as user_client:
+            client = user_client.client
+            first = await user_client.check_user({"public_key": "abc"})
+            second = await user_client.check_user({"public_key": "def"})
+            assert user_client.client is client
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["public_key"] == "abc"
+    assert second["public_key"] == "def"
+    assert seen == ["/user/check", "/user/check"]
+
+
+def make_tool_run_input() -> ToolRunInput:
+    deployment = ToolDeployment(
+        module={"name": "test_tool", "module_type": "tool"},
+        node=NodeConfigUser(ip="localhost", http_port=7001, server_type="http")
+    )
+    return ToolRunInput(consumer_id="user:test", inputs={"tool_name": "test_tool"}, deployment=deployment, signature="sig")
+
+
+def tool_run_handler(checks_until_complete: int, events=None):
+    """Serve /tool/run and /tool/check, completing the run after a number of checks, and run events if given."""
+    state = {"checks": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.startswith("/tool/events/"):
+            if events is None:
+                return httpx.Response(404)
+            return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=events)
+        body = json.loads(request.content)
+        if request.url.path == "/tool/run":
+            return httpx.Response(200, json={**body, "id": "tool_run:1", "status": "pending"})
+        state["checks"] += 1
+        if state["checks"] >= checks_until_complete:
+            return httpx.Response(200, json={**body, "status": "completed", "results": ["done"]})
+        return httpx.Response(200, json={**body, "status": "running"})
+
+    return handler, state
+
+
+def test_run_and_poll_does_not_block_event_loop(make_user_client):
+    """Test that polling uses short async waits and lets other tasks run."""
+    handler, state = tool_run_handler(checks_until_complete=3)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        ticker_task = asyncio.create_task(ticker())
+        async with make_user_client(handler) as user_client:
+            tool_run = await user_client.run_tool_and_poll(make_tool_run_input(), poll_min_interval=0.01, poll_max_interval=0.02)
+        ticker_task.cancel()
+        return tool_run, ticks
+
+    tool_run, ticks = asyncio.run(run())
+    assert tool_run.status == "completed"
+    assert tool_run.results == ["done"]
+    assert state["checks"] == 3
+    assert ticks > 1
+
+
+def test_run_and_poll_deadline(make_user_client):
+    """Test that polling stops with a timeout error once the deadline passes."""
+    handler, _ = tool_run_handler(checks_until_complete=10**6)
+
+    async def run():
+        async with make_user_client(handler) as user_client:
+            await user_client.run_tool_and_poll(make_tool_run_input(), poll_min_interval=0.01, poll_max_interval=0.01, timeout=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+
+
+def test_poll_intervals_back_off_to_maximum():
+    """Test that poll intervals grow exponentially and stay within bounds."""
+    intervals = poll_intervals(0.1, 1.0, backoff=2, jitter=0)
+    assert [next(intervals) for _ in range(6)] == [0.1, 0.2, 0.4, 0.8, 1.0, 1.0]
+
+
+def test_run_and_poll_follows_pushed_events(make_user_client):
+    """Test that run completion is taken from the node's event stream without polling."""
+    paths = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        if request.url.path == "/tool/run":
+            return httpx.Response(200, json={**json.loads(request.content), "id": "tool_run:1", "status": "pending"})
+        events = (
+            'event: status\ndata: {"status": "running"}\n\n'
+            'event: result\ndata: {"status": "completed", "results": ["done"]}\n\n'
+        )
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=events)
+
+    async def run():
+        async with make_user_client(handler) as user_client:
+            return await user_client.run_tool_and_poll(make_tool_run_input())
+
+    tool_run = asyncio.run(run())
+    assert tool_run.status == "completed"
+    assert tool_run.results == ["done"]
+    assert paths == ["/tool/run", "/tool/events/tool_run:1"]
+
+
+def test_run_and_poll_falls_back_when_events_unsupported(make_user_client):
+    """Test that a node without run events is polled, and not asked for events again."""
+    handler, state = tool_run_handler(checks_until_complete=1)
+
+    async def run():
+        async with make_user_client(handler) as user_client:
+            await user_client.run_tool_and_poll(make_tool_run_input())
+            assert user_client._run_events_supported is False
+
+    asyncio.run(run())
+    assert state["checks"] == 1
+
+
+@pytest.mark.parametrize("data", ["not json", '{"results": "not a list"}'])
+def test_run_and_poll_falls_back_when_event_cannot_be_read(make_user_client, data):
+    """Test that an event whose data is not JSON or not a valid run switches to polling instead of failing the run."""
+    handler, state = tool_run_handler(checks_until_complete=1, events=f"event: status\ndata: {data}\n\n")
+
+    async def run():
+        async with make_user_client(handler) as user_client:
+            return await user_client.run_tool_and_poll(make_tool_run_input())
+
+    tool_run = asyncio.run(run())
+    assert tool_run.status == "completed"
+    assert state["checks"] == 1
+
+
+def test_run_many_caps_in_flight_runs_and_reports_failures(make_user_client):
+    """Test that run_many bounds concurrency, keeps input order and isolates failures."""
+    state = {"active": 0, "max_active": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.startswith("/tool/events/"):
+            return httpx.Response(404)
+        body = json.loads(request.content)
+        if request.url.path == "/tool/run":
+            if body["inputs"]["n"] == 2:
+                return httpx.Response(500, json={"detail": "boom"})
+            state["active"] += 1
+            state["max_active"] = max(state["max_active"], state["active"])
+            return httpx.Response(200, json={**body, "id": f"tool_run:{body['inputs']['n']}", "status": "pending"})
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        return httpx.Response(200, json={**body, "status": "completed", "results": [str(body["inputs"]["n"])]})
+
+    def run_inputs():
+        for n in range(6):
+            run_input = make_tool_run_input()
+            run_input.inputs = {"n": n}
+            yield run_input
+
+    async def run():
+        async with make_user_client(handler) as user_client:
+            return [result async for result in user_client.run_many(run_inputs(), "tool", concurrency=2, ordered=True)]
+
+    results = asyncio.run(run())
+    assert [result.index for result in results] == list(range(6))
+    assert results[2].error and "boom" in results[2].error_message
+    assert [result.run.results for result in results if not result.error] == [["0"], ["1"], ["3"], ["4"], ["5"]]
+    assert state["max_active"] <= 2